@@ -0,0 +1,327 @@
+"""
+SYNTHETIC BIN TABLES
+--------------------
+Deterministic generators of BIN tables in the formats supported by the parsers, to
+benchmark the pipeline on files of any size. The same seed always produces the same
+file, so results can be compared across releases.
+
+* Redsys 3.8: fixed-width lines laid out as `redsys_v3_8.colspecs`, between a header
+  record and a `90` totalization record with the line count.
+* Mastercard simplified: CSV with the columns of `mastercard_simplified.column_mappings`.
+
+Like in the real tables, ranges draw their attributes from a small pool of issuer
+profiles (an issuer, brand, card name, country... combination), so many ranges share
+the same payload.
+
+Usage:
+    python -m benchmarks.generators redsys_3.8 redsys.txt --records 2000000
+"""
+
+import argparse
+import csv
+import random
+from typing import Dict, Iterator, List, Tuple
+
+from bin_lookup_indexer.parsers.versions import mastercard_simplified, redsys_v3_8
+
+# Redsys lines are padded to a fixed width after the last column
+REDSYS_LINE_WIDTH = 200
+REDSYS_DIGITS = 18
+MASTERCARD_DIGITS = 16
+# Number of distinct issuer profiles the ranges are drawn from
+PROFILES = 2000
+
+COUNTRIES = [
+    ("724", "ESP", "978"),
+    ("840", "USA", "840"),
+    ("826", "GBR", "826"),
+    ("250", "FRA", "978"),
+    ("276", "DEU", "978"),
+    ("380", "ITA", "978"),
+    ("620", "PRT", "978"),
+    ("484", "MEX", "484"),
+    ("076", "BRA", "986"),
+    ("156", "CHN", "156"),
+    ("392", "JPN", "392"),
+    ("020", "AND", "978"),
+]
+
+# Brands of the Redsys tables by the leading digit of the BIN
+REDSYS_BRANDS = {
+    "3": ["06", "08", "09"],
+    "4": ["01"],
+    "5": ["02"],
+    "6": ["04", "05", "22"],
+}
+
+ISSUER_WORDS = [
+    "BANCO",
+    "CAJA",
+    "RURAL",
+    "CREDIT",
+    "UNION",
+    "SAVINGS",
+    "NATIONAL",
+    "FIRST",
+    "RIVER",
+    "VALLEY",
+    "CAPITAL",
+    "TRUST",
+]
+
+
+def issuer_names(rng: random.Random, count: int) -> List[str]:
+    """
+    Generate a pool of issuer names. Issuers own many ranges, so records draw their
+    issuer from a pool much smaller than the table.
+
+    Args:
+        rng (random.Random): The seeded generator.
+        count (int): The number of issuers.
+
+    Returns:
+        List[str]: The issuer names.
+    """
+    return [
+        f"{' '.join(rng.sample(ISSUER_WORDS, 3))} {number:04d}"
+        for number in range(count)
+    ]
+
+
+def account_ranges(
+    rng: random.Random, records: int, digits: int, first_digits: str
+) -> Iterator[Tuple[str, str]]:
+    """
+    Generate sorted, non-overlapping account ranges padded to a fixed width.
+
+    Ranges cover a 9-digit BIN, or a slice of it, with gaps between them, like the
+    account ranges of the real tables.
+
+    Args:
+        rng (random.Random): The seeded generator.
+        records (int): The number of ranges.
+        digits (int): The width of the range bounds.
+        first_digits (str): The leading digits the BINs are drawn from (e.g., '45').
+
+    Yields:
+        Tuple[str, str]: The low and high bounds of every range.
+    """
+    span = 10 ** (digits - 9)
+    leading = [int(digit) for digit in first_digits]
+    bins_per_digit = 10**8
+    # Spread the ranges over the BINs of the leading digits, with random gaps
+    step = max(bins_per_digit * len(leading) // max(records, 1), 1)
+
+    position = -1
+    for _ in range(records):
+        position += rng.randint(1, step)
+        bin_number = (
+            leading[position // bins_per_digit] * bins_per_digit
+            + position % bins_per_digit
+        )
+        low = bin_number * span
+        if rng.random() < 0.2:
+            # Split BINs only cover part of their accounts
+            high = low + rng.randint(1, 9) * span // 10 - 1
+        else:
+            high = low + span - 1
+        yield str(low).zfill(digits), str(high).zfill(digits)
+
+
+def redsys_profiles(
+    rng: random.Random, count: int, issuers: List[str]
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Generate pools of issuer profiles, the attributes shared by the ranges an issuer
+    registers for a product. The brand of a profile follows the leading digit of the
+    ranges it is drawn for, so profiles are pooled by leading digit.
+
+    Args:
+        rng (random.Random): The seeded generator.
+        count (int): The number of profiles, split between the leading digits.
+        issuers (List[str]): The pool of issuer names.
+
+    Returns:
+        Dict[str, List[Dict[str, str]]]: The profiles of every leading digit, as the
+        values of their columns.
+    """
+    profiles = {}
+    for digit, brands in REDSYS_BRANDS.items():
+        pool = profiles[digit] = []
+        for _ in range(max(count // len(REDSYS_BRANDS), 1)):
+            brand = rng.choice(brands)
+            country, _, currency = rng.choice(COUNTRIES)
+            issuer = rng.randrange(len(issuers))
+            issuer_type = rng.choice(["00", "00", "10", "20", str(rng.randint(50, 99))])
+            regions = redsys_v3_8.regions_by_brand.get(int(brand), {"1": None})
+            bin_prefix = f"{digit}{rng.randrange(10**5):05d}"
+            pool.append(
+                {
+                    "MinimumLength": "16",
+                    "MaximumLength": rng.choice(["16", "16", "19"]),
+                    "Brand": brand,
+                    "CardName": rng.choice(list(redsys_v3_8.card_names)),
+                    "CardDescription": rng.choice(
+                        list(redsys_v3_8.card_description_types)
+                    ),
+                    "Country": country,
+                    "Region": rng.choice(list(regions)),
+                    # Some products are restricted, e.g., ATM only cards
+                    "Usage": rng.choice(["1", "1", "1", "3", "3", "2"]),
+                    "FundingSource": rng.choice(list(redsys_v3_8.funding_sources)),
+                    "CheckDigit": rng.choice(["1", "1", "0"]),
+                    "UsageScope": rng.choice(list(redsys_v3_8.usage_scopes)),
+                    "IssuerType": issuer_type,
+                    "IssuerCode": f"{issuer:04d}",
+                    "IssuerName": issuers[issuer],
+                    "ProcessingEntityType": issuer_type,
+                    "ProcessorCode": f"{issuer:04d}",
+                    "GroupType": "01",
+                    "Group": f"{rng.choice(list(redsys_v3_8.groups)):04d}",
+                    "Organism": "00",
+                    "BINPrefix": bin_prefix,
+                    "BINProcessorPrefix": bin_prefix,
+                    "ICA": f"{issuer:06d}" if brand == "02" else "",
+                    "ICAProcessor": "",
+                    "ChipTechnology": rng.choice(["1", "1", "0"]),
+                    "Prepaid": rng.choice(["0", "0", "0", "1"]),
+                    "Currency": currency,
+                    "CardType": rng.choice(["C ", "C ", "E ", "CR"]),
+                    "Contactless": rng.choice(list(redsys_v3_8.contactless)),
+                    "Token": rng.choice(["0", "0", "1"]),
+                }
+            )
+    return profiles
+
+
+def redsys_line(
+    rng: random.Random, low: str, high: str, profiles: Dict[str, List[Dict[str, str]]]
+) -> str:
+    """
+    Generate a `10` record of a Redsys 3.8 table.
+
+    Args:
+        rng (random.Random): The seeded generator.
+        low (str): The low bound of the range.
+        high (str): The high bound of the range.
+        profiles (Dict[str, List[Dict[str, str]]]): The issuer profiles by leading digit.
+
+    Returns:
+        str: The fixed-width line, with its line break.
+    """
+    values = {
+        "StructureCode": "10",
+        "LowAccountRange": low,
+        "HighAccountRange": high,
+        **rng.choice(profiles[low[0]]),
+    }
+
+    line = "".join(
+        values[name].ljust(end - start)[: end - start]
+        for start, end, name in redsys_v3_8.colspecs
+    )
+    return line.ljust(REDSYS_LINE_WIDTH) + "\n"
+
+
+def generate_redsys(
+    file_path: str, records: int, seed: int = 0, profiles: int = PROFILES
+) -> int:
+    """
+    Write a synthetic Redsys 3.8 table.
+
+    Args:
+        file_path (str): The path of the generated file.
+        records (int): The number of `10` records.
+        seed (int): The seed of the generator.
+        profiles (int): The number of issuer profiles the records are drawn from.
+
+    Returns:
+        int: The number of lines written, including the header and totalization records.
+    """
+    rng = random.Random(seed)
+    issuers = issuer_names(rng, max(profiles // 10, 1))
+    pools = redsys_profiles(rng, profiles, issuers)
+
+    with open(file_path, "w", encoding="cp1252", newline="") as file:
+        file.write("00".ljust(REDSYS_LINE_WIDTH) + "\n")
+        for low, high in account_ranges(rng, records, REDSYS_DIGITS, "3456"):
+            file.write(redsys_line(rng, low, high, pools))
+
+        # The totalization record counts every line of the file
+        lines = records + 2
+        file.write(("90" + " " * 26 + f"{lines:010d}").ljust(REDSYS_LINE_WIDTH) + "\n")
+
+    return lines
+
+
+def generate_mastercard(
+    file_path: str, records: int, seed: int = 0, profiles: int = PROFILES
+) -> int:
+    """
+    Write a synthetic Mastercard simplified table.
+
+    Args:
+        file_path (str): The path of the generated file.
+        records (int): The number of rows.
+        seed (int): The seed of the generator.
+        profiles (int): The number of issuer profiles the rows are drawn from.
+
+    Returns:
+        int: The number of lines written, including the header.
+    """
+    rng = random.Random(seed)
+    issuers = issuer_names(rng, max(profiles // 10, 1))
+    brands = list(mastercard_simplified.brands)
+    products = list(mastercard_simplified.card_names.items())
+
+    # Issuer, product, brand and country of every profile
+    pool = []
+    for _ in range(max(profiles, 1)):
+        issuer = rng.randrange(len(issuers))
+        code, name = rng.choice(products)
+        pool.append(
+            [
+                issuers[issuer],
+                f"{issuer:06d}",
+                code,
+                name,
+                rng.choice(brands),
+                rng.choice(COUNTRIES)[1],
+            ]
+        )
+
+    with open(file_path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(mastercard_simplified.column_mappings)
+        for low, high in account_ranges(rng, records, MASTERCARD_DIGITS, "25"):
+            issuer_name, ica, code, name, brand, country = rng.choice(pool)
+            writer.writerow([issuer_name, ica, low, high, code, name, brand, country])
+
+    return records + 1
+
+
+generators = {
+    "redsys_3.8": generate_redsys,
+    "mastercard_simplified": generate_mastercard,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic BIN tables.")
+    parser.add_argument("format", choices=list(generators))
+    parser.add_argument("file_path", help="The path of the generated file.")
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--profiles",
+        type=int,
+        default=PROFILES,
+        help="Number of issuer profiles the records are drawn from, i.e., of distinct payloads.",
+    )
+    args = parser.parse_args()
+
+    generators[args.format](args.file_path, args.records, args.seed, args.profiles)
+
+
+if __name__ == "__main__":
+    main()
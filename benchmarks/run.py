@@ -0,0 +1,419 @@
+"""
+PIPELINE BENCHMARKS
+-------------------
+Measure every stage of the pipeline on synthetic tables and emit the results as JSON,
+so regressions can be tracked across releases:
+
+* parse: records per second of every parsing mode, for both formats.
+* index_build: time to insert the parsed ranges into every index backend and to
+  serialize them.
+* index_load: time to load every index file.
+* lookup: latency percentiles of index searches, and of full lookups from the SQLite
+  storage and from the lookup artifact.
+* storage_write: records per second written to SQLite, and to Redis when a server is
+  selected with `--redis` or fakeredis is installed.
+
+Usage:
+    python -m benchmarks.run --records 2000000 --output results.json
+"""
+
+import argparse
+import datetime
+import itertools
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from importlib import metadata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+try:
+    import fakeredis
+except ImportError:  # fakeredis is optional, Redis writes need a server without it
+    fakeredis = None
+
+from benchmarks.generators import generators
+from bin_lookup_indexer.artifact import ArtifactWriter, LookupArtifact
+from bin_lookup_indexer.config import Config
+from bin_lookup_indexer.indexes.index_factory import IndexFactory
+from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.lookup import BinLookup
+from bin_lookup_indexer.parsers.parser_factory import ParserFactory
+from bin_lookup_indexer.storage.codecs import JsonCodec
+from bin_lookup_indexer.storage.redis_storage import RedisStorage
+from bin_lookup_indexer.storage.sqlite_storage import SQLiteStorage
+from bin_lookup_indexer.storage.storage_factory import StorageFactory
+
+PERCENTILES = [50, 90, 99, 99.9]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarize latency samples.
+
+    Args:
+        samples (List[float]): The latencies in microseconds.
+
+    Returns:
+        Dict[str, float]: The mean, the percentiles and the maximum of the samples.
+    """
+    samples = sorted(samples)
+    summary = {"mean": sum(samples) / len(samples)}
+    for percentile in PERCENTILES:
+        position = min(int(len(samples) * percentile / 100), len(samples) - 1)
+        summary[f"p{percentile:g}"] = samples[position]
+    summary["max"] = samples[-1]
+    return {name: round(value, 3) for name, value in summary.items()}
+
+
+def latencies(function: Callable[[Any], Any], arguments: Iterable[Any]) -> List[float]:
+    """
+    Time every call of a function.
+
+    Args:
+        function (Callable[[Any], Any]): The function to time.
+        arguments (Iterable[Any]): The argument of every call.
+
+    Returns:
+        List[float]: The latency of every call in microseconds.
+    """
+    samples = []
+    clock = time.perf_counter_ns
+    for argument in arguments:
+        start = clock()
+        function(argument)
+        samples.append((clock() - start) / 1000)
+    return samples
+
+
+def throughput(count: int, seconds: float) -> Dict[str, float]:
+    return {
+        "seconds": round(seconds, 4),
+        "count": count,
+        "per_second": round(count / seconds, 1) if seconds else None,
+    }
+
+
+def bench_parse(
+    format_name: str, file_path: str, processes: int
+) -> Tuple[Dict[str, Any], List[Tuple[int, int]]]:
+    """
+    Parse a table with every mode, collecting the ranges of the sequential run.
+
+    Returns:
+        Tuple[Dict[str, Any], List[Tuple[int, int]]]: The results by mode and the ranges.
+    """
+    parser = ParserFactory.create_parser(format_name)
+    size = os.path.getsize(file_path)
+    modes = {
+        "sequential": parser.parse,
+        "parallel": lambda path: parser.parse_parallel(path, processes),
+    }
+
+    results = {}
+    ranges = []
+    for mode, parse in modes.items():
+        count = 0
+        start = time.perf_counter()
+        if mode == "sequential":
+            for record in parse(file_path):
+                ranges.append((record["LowAccountRange"], record["HighAccountRange"]))
+            count = len(ranges)
+        else:
+            for _ in parse(file_path):
+                count += 1
+        seconds = time.perf_counter() - start
+
+        results[mode] = throughput(count, seconds)
+        results[mode]["megabytes_per_second"] = round(size / seconds / 1e6, 2)
+
+    return results, ranges
+
+
+def bench_index(
+    ranges: List[Tuple[int, int]], directory: str, rng: random.Random, lookups: int
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    Build, serialize, load and search every index format.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The build, load and
+        search results by index format.
+    """
+    build, load, search = {}, {}, {}
+    points = sample_points(ranges, rng, lookups)
+    for index_format in ["json", "binary", "paged"]:
+        index = IndexFactory.create_index(index_format)
+
+        start = time.perf_counter()
+        for position, (low, high) in enumerate(ranges):
+            index.insert(low, high, f"bin:bench:gen:{position}")
+        inserted = time.perf_counter()
+        data = index.serialize()
+        serialized = time.perf_counter()
+
+        file_path = os.path.join(directory, f"bench.{index_format}.index")
+        with open(file_path, "wb") as file:
+            file.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+        build[index_format] = {
+            "insert_seconds": round(inserted - start, 4),
+            "serialize_seconds": round(serialized - inserted, 4),
+            "bytes": os.path.getsize(file_path),
+        }
+
+        start = time.perf_counter()
+        loaded = IndexFactory.load_index(file_path)
+        load[index_format] = {"seconds": round(time.perf_counter() - start, 4)}
+
+        search[index_format] = percentiles(latencies(loaded.search, points))
+        if hasattr(loaded, "close"):
+            loaded.close()
+
+    return build, load, search
+
+
+def sample_points(
+    ranges: List[Tuple[int, int]], rng: random.Random, count: int
+) -> List[int]:
+    """
+    Sample points to search, 90% inside a range and the rest anywhere.
+    """
+    high = max(high for _, high in ranges)
+    points = []
+    for _ in range(count):
+        if rng.random() < 0.9:
+            low, range_high = rng.choice(ranges)
+            points.append(rng.randint(low, range_high))
+        else:
+            points.append(rng.randint(0, high))
+    return points
+
+
+def redis_storage(use_server: bool) -> Tuple[Optional[RedisStorage], Optional[str]]:
+    """
+    Create the Redis storage of the write benchmark: the configured server, or
+    fakeredis when it is installed.
+    """
+    if use_server:
+        storage = StorageFactory.create_storage("redis", Config())
+        storage.client.ping()
+        return storage, "server"
+
+    if fakeredis is None:
+        return None, None
+
+    storage = RedisStorage(host="localhost", port=6379)
+    storage.client = fakeredis.FakeRedis()
+    return storage, "fakeredis"
+
+
+def bench_storage(
+    format_name: str,
+    file_path: str,
+    directory: str,
+    rng: random.Random,
+    records: int,
+    lookups: int,
+    use_redis: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Write the first records of a table to every storage backend, then look them up
+    from SQLite and from a lookup artifact.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: The write results by backend and the
+        lookup latencies by reader.
+    """
+    parser = ParserFactory.create_parser(format_name)
+    prefix = "bin:bench:gen"
+    pairs = [
+        (f"{prefix}:{position}", record)
+        for position, record in enumerate(
+            itertools.islice(parser.parse(file_path), records)
+        )
+    ]
+
+    writes = {}
+    storage = SQLiteStorage(directory)
+    start = time.perf_counter()
+    written = storage.store_many(pairs)
+    writes["sqlite"] = throughput(written, time.perf_counter() - start)
+
+    redis, stand_in = redis_storage(use_redis)
+    if redis is None:
+        writes["redis"] = {"skipped": "no Redis server selected and fakeredis missing"}
+    else:
+        start = time.perf_counter()
+        written = redis.store_many(pairs)
+        writes["redis"] = throughput(written, time.perf_counter() - start)
+        writes["redis"]["backend"] = stand_in
+
+    # Lookups of the written records, through the binary index and from the artifact
+    index = IndexFactory.create_index("binary")
+    artifact = ArtifactWriter(JsonCodec())
+    for key, record in pairs:
+        index.insert(record["LowAccountRange"], record["HighAccountRange"], key)
+        artifact.add(key, record)
+    index_path = os.path.join(directory, "lookup.index")
+    with open(index_path, "wb") as file:
+        file.write(index.serialize())
+    artifact_path = os.path.join(directory, "lookup.artifact")
+    with open(artifact_path, "wb") as file:
+        artifact.write(
+            file,
+            (
+                (record["LowAccountRange"], record["HighAccountRange"], key)
+                for key, record in pairs
+            ),
+            {"generation": "gen", "codec": artifact.codec.describe()},
+        )
+
+    ranges = [
+        (record["LowAccountRange"], record["HighAccountRange"]) for _, record in pairs
+    ]
+    digits = index.digits
+    pans = [str(point).zfill(digits) for point in sample_points(ranges, rng, lookups)]
+
+    lookup = {}
+    client = BinLookup(index_path, storage)
+    lookup["sqlite"] = percentiles(latencies(client.lookup, pans))
+    with LookupArtifact(artifact_path) as reader:
+        lookup["artifact"] = percentiles(latencies(reader.lookup, pans))
+    storage.close()
+
+    return writes, lookup
+
+
+def table_path(directory: str, format_name: str, records: int, seed: int) -> str:
+    """
+    Generate a table, unless it was generated by a previous run with the same options.
+    """
+    extension = "csv" if format_name.startswith("mastercard") else "txt"
+    file_path = os.path.join(directory, f"{format_name}_{records}_{seed}.{extension}")
+    if not os.path.exists(file_path):
+        generators[format_name](file_path, records, seed)
+    return file_path
+
+
+def run(args: argparse.Namespace, directory: str) -> Dict[str, Any]:
+    try:
+        version = metadata.version("bin-lookup-indexer")
+    except metadata.PackageNotFoundError:
+        version = None
+
+    results = {
+        "version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "options": {
+            "records": args.records,
+            "seed": args.seed,
+            "lookups": args.lookups,
+            "write_records": args.write_records,
+            "processes": args.processes,
+        },
+        "formats": {},
+    }
+
+    for format_name in args.formats:
+        rng = random.Random(args.seed)
+        file_path = table_path(
+            args.workdir or directory, format_name, args.records, args.seed
+        )
+
+        parse, ranges = bench_parse(format_name, file_path, args.processes)
+        build, load, search = bench_index(ranges, directory, rng, args.lookups)
+        writes, lookup = bench_storage(
+            format_name,
+            file_path,
+            tempfile.mkdtemp(dir=directory),
+            rng,
+            args.write_records,
+            args.lookups,
+            args.redis,
+        )
+
+        results["formats"][format_name] = {
+            "file_bytes": os.path.getsize(file_path),
+            "parse": parse,
+            "index_build": build,
+            "index_load": load,
+            "lookup": {"index_search": search, **lookup},
+            "storage_write": writes,
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the indexing pipeline.")
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=list(generators),
+        default=list(generators),
+        help="The formats to benchmark.",
+    )
+    parser.add_argument(
+        "--records",
+        type=int,
+        default=1000000,
+        help="Number of records of the generated tables.",
+    )
+    parser.add_argument(
+        "--write-records",
+        type=int,
+        default=100000,
+        help="Number of records written to the storage backends and looked up.",
+    )
+    parser.add_argument(
+        "--lookups", type=int, default=100000, help="Number of timed lookups."
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes of the parallel parsing mode.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--redis",
+        action="store_true",
+        help="Write to the Redis server of the configuration instead of fakeredis.",
+    )
+    parser.add_argument(
+        "--workdir",
+        type=str,
+        default=None,
+        help="Directory where the generated tables are kept between runs.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="The path of the JSON results. Printed to stdout by default.",
+    )
+    args = parser.parse_args()
+
+    # Keep stdout for the results
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(args, directory)
+
+    output = orjson.dumps(results, option=orjson.OPT_INDENT_2)
+    if args.output:
+        with open(args.output, "wb") as file:
+            file.write(output)
+    else:
+        sys.stdout.buffer.write(output + b"\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""
+LOOKUP ARTIFACT FORMAT - VERSION 2
+----------------------------------
+A single file holding both the range table and the records, so lookup hosts can answer
+lookups from a memory map without the index file or the storage backend:
+
+    header    (56 bytes)  magic, format version, range digits, range count,
+                          metadata length, ranges offset, blobs offset,
+                          CRC-32 of the metadata, the ranges and the blobs
+    metadata  JSON: generation, namespace, value codec and dictionary tables,
+              padded to a multiple of 8 bytes
+    ranges    (32 bytes each, sorted by low bound and non-overlapping)
+              low bound (uint64), high bound (uint64), blob offset (uint64),
+              blob length (uint32), padding
+    blobs     the records serialized with the value codec, each distinct blob stored once
+
+Every integer is little-endian. Version 1 packed blob offsets as uint32, which limited
+the blobs to 4 GiB.
+"""
+
+import io
+import mmap
+import struct
+import zlib
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import orjson
+
+from bin_lookup_indexer.cache import LRUCache, MISSING
+from bin_lookup_indexer.encoding import decode
+from bin_lookup_indexer.indexes.segments import flatten_ranges
+from bin_lookup_indexer.lookup import normalize_pan
+from bin_lookup_indexer.storage.codecs import CodecFactory, ValueCodec
+
+MAGIC = b"BINART\x00\x00"
+VERSION = 2
+
+HEADER = struct.Struct("<8sHHIQQQIII4x")
+RANGE = struct.Struct("<QQQI4x")
+
+# Number of ranges packed in a single write
+WRITE_CHUNK_RANGES = 4096
+
+
+def write_artifact(
+    file: BinaryIO,
+    segments: Sequence[Tuple[int, int, str]],
+    values: Dict[str, bytes],
+    metadata: Dict[str, Any],
+):
+    """
+    Write already flattened segments and their records in the artifact format. The
+    sections are streamed to the file as their checksums are computed, and the header
+    is written last, so the file must be seekable.
+
+    Args:
+        file (BinaryIO): The destination file, positioned at its start.
+        segments (Sequence[Tuple[int, int, str]]): Sorted, non-overlapping segments as
+            (low, high, key).
+        values (Dict[str, bytes]): The serialized record of every key of the segments.
+        metadata (Dict[str, Any]): The metadata needed to decode the records.
+
+    Raises:
+        ValueError: If the record of a segment is missing.
+    """
+    encoded_metadata = orjson.dumps(metadata)
+    encoded_metadata += b" " * (-len(encoded_metadata) % 8)
+
+    # Offset of every distinct blob, in the order they are written
+    offsets: Dict[bytes, int] = {}
+    blobs_length = 0
+    for _, _, key in segments:
+        value = values.get(key)
+        if value is None:
+            raise ValueError(f"Missing record for key: {key}")
+        if value not in offsets:
+            offsets[value] = blobs_length
+            blobs_length += len(value)
+
+    file.write(bytes(HEADER.size))
+    file.write(encoded_metadata)
+
+    ranges_checksum = 0
+    for start in range(0, len(segments), WRITE_CHUNK_RANGES):
+        chunk = b"".join(
+            RANGE.pack(low, high, offsets[values[key]], len(values[key]))
+            for low, high, key in segments[start : start + WRITE_CHUNK_RANGES]
+        )
+        ranges_checksum = zlib.crc32(chunk, ranges_checksum)
+        file.write(chunk)
+
+    blobs_checksum = 0
+    for value in offsets:
+        blobs_checksum = zlib.crc32(value, blobs_checksum)
+        file.write(value)
+
+    digits = len(str(max(high for _, high, _ in segments))) if segments else 0
+    ranges_offset = HEADER.size + len(encoded_metadata)
+    file.seek(0)
+    file.write(
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            digits,
+            len(segments),
+            len(encoded_metadata),
+            ranges_offset,
+            ranges_offset + RANGE.size * len(segments),
+            zlib.crc32(encoded_metadata),
+            ranges_checksum,
+            blobs_checksum,
+        )
+    )
+    file.seek(0, io.SEEK_END)
+
+
+def serialize_artifact(
+    segments: Sequence[Tuple[int, int, str]],
+    values: Dict[str, bytes],
+    metadata: Dict[str, Any],
+) -> bytes:
+    """
+    Serialize already flattened segments and their records in the artifact format.
+
+    Args:
+        segments (Sequence[Tuple[int, int, str]]): Sorted, non-overlapping segments as
+            (low, high, key).
+        values (Dict[str, bytes]): The serialized record of every key of the segments.
+        metadata (Dict[str, Any]): The metadata needed to decode the records.
+
+    Returns:
+        bytes: The artifact.
+
+    Raises:
+        ValueError: If the record of a segment is missing.
+    """
+    buffer = io.BytesIO()
+    write_artifact(buffer, segments, values, metadata)
+    return buffer.getvalue()
+
+
+class ArtifactWriter:
+    """
+    Collect the serialized records of a run to write them with the range table in a
+    lookup artifact.
+    """
+
+    def __init__(self, codec: ValueCodec):
+        """
+        Args:
+            codec (ValueCodec): The serialization of the records.
+        """
+        self.codec = codec
+        self.values: Dict[str, bytes] = {}
+
+    def add(self, key: str, data: Dict[str, Any]) -> None:
+        """
+        Add the record of a key.
+
+        Args:
+            key (str): The storage key of the record.
+            data (Dict[str, Any]): The record, as it is stored.
+        """
+        self.values[key] = self.codec.encode(data)
+
+    def collect(
+        self, records: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Add the records being stored, yielding them unchanged.
+
+        Args:
+            records (Iterable[Tuple[str, Dict[str, Any]]]): The (key, data) pairs.
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: The same pairs.
+        """
+        for key, data in records:
+            self.add(key, data)
+            yield key, data
+
+    def missing(self, keys: Iterable[str]) -> List[str]:
+        """
+        Get the keys whose record has not been collected, e.g., the records of previous
+        generations kept by an incremental run.
+
+        Args:
+            keys (Iterable[str]): The keys referenced by the ranges.
+
+        Returns:
+            List[str]: The keys without a record.
+        """
+        return [key for key in keys if key not in self.values]
+
+    def serialize(
+        self, ranges: Iterable[Tuple[int, int, str]], metadata: Dict[str, Any]
+    ) -> bytes:
+        """
+        Serialize the ranges and the collected records in the artifact format.
+
+        Args:
+            ranges (Iterable[Tuple[int, int, str]]): Ranges as (low, high, key), in
+                insertion order. Overlapping ranges are flattened keeping the smallest range.
+            metadata (Dict[str, Any]): The metadata of the run (e.g., its generation).
+
+        Returns:
+            bytes: The artifact.
+        """
+        return serialize_artifact(flatten_ranges(ranges), self.values, metadata)
+
+    def write(
+        self,
+        file: BinaryIO,
+        ranges: Iterable[Tuple[int, int, str]],
+        metadata: Dict[str, Any],
+    ):
+        """
+        Write the ranges and the collected records in the artifact format, streaming
+        the sections to the file.
+
+        Args:
+            file (BinaryIO): The destination file, which must be seekable.
+            ranges (Iterable[Tuple[int, int, str]]): Ranges as (low, high, key), in
+                insertion order. Overlapping ranges are flattened keeping the smallest range.
+            metadata (Dict[str, Any]): The metadata of the run (e.g., its generation).
+        """
+        write_artifact(file, flatten_ranges(ranges), self.values, metadata)
+
+
+class LookupArtifact:
+    """
+    Memory-mapped reader of the lookup artifact format. Lookups are a binary search over
+    the mapped range table followed by the decoding of a single blob, so only the pages
+    of the looked up records are read.
+    """
+
+    # Ranges are flattened when the artifact is written
+    disjoint = True
+
+    digits: int
+    count: int
+    metadata_length: int
+    ranges_offset: int
+    blobs_offset: int
+    checksums: List[int]
+
+    def __init__(
+        self,
+        file_path: str,
+        verify: bool = True,
+        cache: Optional[LRUCache] = None,
+        **codec_options,
+    ) -> None:
+        """
+        Args:
+            file_path (str): The path of the artifact file.
+            verify (bool): Check the checksums of every section when opening the file.
+            cache (LRUCache, optional): Cache of decoded records by blob offset.
+            **codec_options: The options of the value codec that are not recorded.
+
+        Raises:
+            ValueError: If the file is not an artifact, its version is unsupported or it
+                is corrupted.
+        """
+        with open(file_path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            self.digits,
+            self.count,
+            self.metadata_length,
+            self.ranges_offset,
+            self.blobs_offset,
+            *self.checksums,
+        ) = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC:
+            self.mmap.close()
+            raise ValueError(f"Invalid lookup artifact: {file_path}")
+        if version != VERSION:
+            self.mmap.close()
+            raise ValueError(f"Unsupported lookup artifact version: {version}")
+        if verify:
+            try:
+                self.verify()
+            except ValueError:
+                self.mmap.close()
+                raise
+
+        self.metadata = orjson.loads(
+            self.mmap[HEADER.size : HEADER.size + self.metadata_length]
+        )
+        self.codec = CodecFactory.from_manifest(
+            self.metadata.get("codec"), **codec_options
+        )
+        self.tables = self.metadata.get("dictionary", {}).get("tables")
+        self.cache = cache
+
+        # Every range is four uint64 words: low, high, blob offset and blob length
+        self.words: memoryview = memoryview(self.mmap)[
+            self.ranges_offset : self.blobs_offset
+        ].cast("Q")
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def generation(self) -> Optional[str]:
+        """
+        The generation the artifact was written from.
+        """
+        generation: Optional[str] = self.metadata.get("generation")
+        return generation
+
+    def verify(self) -> None:
+        """
+        Check the checksums of the metadata, the range table and the blobs.
+
+        Raises:
+            ValueError: If a section does not match its checksum.
+        """
+        sections = {
+            "metadata": (HEADER.size, self.ranges_offset),
+            "ranges": (self.ranges_offset, self.blobs_offset),
+            "blobs": (self.blobs_offset, len(self.mmap)),
+        }
+        for (name, (start, end)), checksum in zip(sections.items(), self.checksums):
+            if zlib.crc32(memoryview(self.mmap)[start:end]) != checksum:
+                raise ValueError(f"Corrupted lookup artifact: {name} checksum mismatch")
+
+    def search(self, point: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Search the range containing a given point.
+
+        Args:
+            point (int): The point to find a range for.
+
+        Returns:
+            Optional[Tuple[int, int, int, int]]: The (low, high, blob offset, blob length)
+            of the range, or None if no range contains the point.
+        """
+        # Binary search of the last range starting at or before the point
+        words = self.words
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if words[middle * 4] <= point:
+                low = middle + 1
+            else:
+                high = middle
+        position = low - 1
+        if position < 0 or words[position * 4 + 1] < point:
+            return None
+
+        found: Tuple[int, int, int, int] = RANGE.unpack_from(
+            self.mmap, self.ranges_offset + position * RANGE.size
+        )
+        return found
+
+    def record(self, offset: int, length: int) -> Dict[str, Any]:
+        """
+        Decode the record of a blob.
+
+        Args:
+            offset (int): The offset of the blob in the blobs section.
+            length (int): The length of the blob.
+
+        Returns:
+            Dict[str, Any]: The record.
+        """
+        record: Dict[str, Any]
+        if self.cache is not None:
+            record = self.cache.get(offset)
+            if record is not MISSING:
+                return record
+
+        start = self.blobs_offset + offset
+        record = decode(
+            self.codec.decode(self.mmap[start : start + length]), self.tables
+        )
+
+        if self.cache is not None:
+            self.cache.set(offset, record)
+        return record
+
+    def lookup(self, pan: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the record of a PAN.
+
+        Args:
+            pan (str): The card number or prefix.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if no range contains the PAN.
+
+        Raises:
+            ValueError: If the PAN contains other characters than digits.
+        """
+        found = self.search(normalize_pan(pan, self.digits))
+        return self.record(found[2], found[3]) if found else None
+
+    def lookup_many(self, pans: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Look up the records of several PANs.
+
+        Args:
+            pans (Sequence[str]): The card numbers or prefixes.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The record of every PAN, in the same order, or
+            None if no range contains it.
+        """
+        return [self.lookup(pan) for pan in pans]
+
+    def close(self) -> None:
+        """
+        Release the memory map.
+        """
+        self.words.release()
+        self.mmap.close()
+
+    def __enter__(self) -> "LookupArtifact":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,109 @@
+"""
+LOOKUP CACHE
+------------
+Bounded in-process cache used by the lookup client to avoid a storage round-trip for
+the most popular BINs.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Returned by `get` for missing or expired entries, so None can be a cached value
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Least-recently-used cache with an optional time-to-live per entry and hit/miss
+    counters.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            maxsize (int): Maximum number of entries. The least recently used entry is
+                evicted when it is exceeded.
+            ttl (float, optional): Seconds an entry is valid for. Entries never expire by
+                default.
+            clock (Callable[[], float]): Function returning the current time in seconds.
+        """
+        if maxsize <= 0:
+            raise ValueError(f"Invalid cache size: {maxsize}")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get a cached value, marking it as the most recently used.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Any: The cached value, or MISSING if it is not cached or has expired.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= self.clock():
+            del self.entries[key]
+            self.misses += 1
+            return MISSING
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Cache a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+        """
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Remove every entry, keeping the counters.
+        """
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, int]: The hits, misses, evictions and current size of the cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -1,4 +1,5 @@
 import os
+from typing import Any, Dict
 
 
 class Config:
@@ -9,6 +10,32 @@ class Config:
         self.redis_db = os.getenv("REDIS_DB", 0)
         self.redis_password = os.getenv("REDIS_PASSWORD", None)
 
+        # Redis batched writes configuration
+        self.redis_batch_size = int(os.getenv("REDIS_BATCH_SIZE", 1000))
+        self.redis_batch_bytes = int(os.getenv("REDIS_BATCH_BYTES", 1048576))
+
+        # Records per hash bucket in the hash layout, within hash-max-listpack-entries
+        self.redis_hash_bucket_size = int(os.getenv("REDIS_HASH_BUCKET_SIZE", 128))
+
+        # SQLite storage configuration
+        self.sqlite_directory = os.getenv("SQLITE_DIRECTORY", ".")
+        self.sqlite_batch_size = int(os.getenv("SQLITE_BATCH_SIZE", 10000))
+        self.sqlite_mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+
+        # Stored values serialization configuration
+        self.value_codec = os.getenv("VALUE_CODEC", "json")
+        self.zstd_level = int(os.getenv("ZSTD_LEVEL", 3))
+        self.zstd_dictionary_size = int(os.getenv("ZSTD_DICTIONARY_SIZE", 16384))
+        self.zstd_training_records = int(os.getenv("ZSTD_TRAINING_RECORDS", 5000))
+
+        # Publishing configuration
+        self.key_prefix = os.getenv("KEY_PREFIX", "bin")
+        # Seconds the previous generation is kept for readers still using its index
+        self.generation_grace_period = int(os.getenv("GENERATION_GRACE_PERIOD", 300))
+
+        # Country and currency enrichment configuration
+        self.enrichment_cache = os.getenv("ENRICHMENT_CACHE", None)
+
         # DynamoDB configuration
         self.dynamodb_region = os.getenv("DYNAMODB_REGION", "us-west-2")
         self.dynamodb_table_name = os.getenv("DYNAMODB_TABLE_NAME", "BinRanges")
@@ -17,7 +44,7 @@ class Config:
 
         # Other configurations can go here as needed
 
-    def get_redis_config(self):
+    def get_redis_config(self) -> Dict[str, Any]:
         return {
             "host": self.redis_host,
             "port": self.redis_port,
@@ -25,6 +52,45 @@ class Config:
             "password": self.redis_password,
         }
 
+    def get_redis_batch_config(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.redis_batch_size,
+            "batch_bytes": self.redis_batch_bytes,
+        }
+
+    def get_redis_layout_config(self) -> Dict[str, Any]:
+        return {
+            "bucket_size": self.redis_hash_bucket_size,
+        }
+
+    def get_sqlite_config(self) -> Dict[str, Any]:
+        return {
+            "directory": self.sqlite_directory,
+            "batch_size": self.sqlite_batch_size,
+            "mmap_size": self.sqlite_mmap_size,
+        }
+
+    def get_codec_config(self) -> Dict[str, Any]:
+        return {
+            "name": self.value_codec,
+            "options": {
+                "level": self.zstd_level,
+                "dictionary_size": self.zstd_dictionary_size,
+                "training_records": self.zstd_training_records,
+            },
+        }
+
+    def get_publish_config(self) -> Dict[str, Any]:
+        return {
+            "key_prefix": self.key_prefix,
+            "grace_period": self.generation_grace_period,
+        }
+
+    def get_enrichment_config(self) -> Dict[str, Any]:
+        return {
+            "cache_path": self.enrichment_cache,
+        }
+
     def get_dynamodb_config(self):
         return {
             "region": self.dynamodb_region,
@@ -0,0 +1,144 @@
+"""
+DICTIONARY-ENCODED PAYLOADS
+---------------------------
+Records can be stored with short integer codes instead of the values of the fields that
+come from fixed tables (brands, card names, issuers, countries...). The distinct values
+of every field are stored once per generation, under `<generation prefix>:tables`, and
+the lookup client decodes the records with them.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, overload
+
+import orjson
+
+TABLES_SUFFIX = "tables"
+
+
+def tables_key_for_prefix(prefix: str) -> str:
+    """
+    Get the storage key of the tables of a generation.
+
+    Args:
+        prefix (str): The key prefix of the generation.
+
+    Returns:
+        str: The storage key of the tables.
+    """
+    return f"{prefix}:{TABLES_SUFFIX}"
+
+
+def tables_key(key: str) -> str:
+    """
+    Get the storage key of the tables used to encode a record.
+
+    Args:
+        key (str): The storage key of the record.
+
+    Returns:
+        str: The storage key of the tables of the record generation.
+    """
+    return tables_key_for_prefix(key.rsplit(":", 1)[0])
+
+
+def _value_id(value: Any):
+    # Strings are their own identity, other values (dicts, bools, numbers) are compared
+    # by their canonical JSON, so True and 1 or equal dicts in another order never clash
+    if isinstance(value, str):
+        return value
+    return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+
+
+class DictionaryEncoder:
+    """
+    Replace the values of some fields of the records by their position in a table of
+    the distinct values of the field.
+
+    Tables only grow, so an encoder created from the tables of a previous generation
+    keeps the codes of the records that were not written again.
+    """
+
+    def __init__(
+        self, fields: Iterable[str], tables: Optional[Dict[str, List[Any]]] = None
+    ):
+        """
+        Args:
+            fields (Iterable[str]): The fields to encode.
+            tables (Dict[str, List[Any]], optional): The tables of a previous generation.
+        """
+        self.fields = list(fields)
+        tables = tables or {}
+        self.tables = {field: list(tables.get(field, [])) for field in self.fields}
+        self.codes = {
+            field: {_value_id(value): code for code, value in enumerate(values)}
+            for field, values in self.tables.items()
+        }
+
+    def encode(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encode the fields of a record.
+
+        Args:
+            record (Dict[str, Any]): The record.
+
+        Returns:
+            Dict[str, Any]: A copy of the record with the codes of the encoded fields.
+        """
+        encoded = dict(record)
+        for field in self.fields:
+            if field not in encoded:
+                continue
+
+            value = encoded[field]
+            codes = self.codes[field]
+            value_id = _value_id(value)
+            code = codes.get(value_id)
+            if code is None:
+                code = codes[value_id] = len(self.tables[field])
+                self.tables[field].append(value)
+            encoded[field] = code
+
+        return encoded
+
+    def manifest_entry(self) -> Dict[str, Any]:
+        """
+        Describe the encoding for the manifest of the generation.
+
+        Returns:
+            Dict[str, Any]: The encoded fields and their tables.
+        """
+        return {"fields": self.fields, "tables": self.tables}
+
+
+@overload
+def decode(
+    record: Dict[str, Any], tables: Optional[Dict[str, List[Any]]]
+) -> Dict[str, Any]: ...
+
+
+@overload
+def decode(record: None, tables: Optional[Dict[str, List[Any]]]) -> None: ...
+
+
+def decode(
+    record: Optional[Dict[str, Any]], tables: Optional[Dict[str, List[Any]]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Decode a record with the tables of its generation.
+
+    Args:
+        record (Dict[str, Any], optional): The stored record.
+        tables (Dict[str, List[Any]], optional): The tables, None if the generation is not
+            dictionary-encoded.
+
+    Returns:
+        Optional[Dict[str, Any]]: The decoded record.
+    """
+    if record is None or not tables:
+        return record
+
+    decoded = dict(record)
+    for field, values in tables.items():
+        if field in decoded:
+            decoded[field] = values[decoded[field]]
+
+    return decoded
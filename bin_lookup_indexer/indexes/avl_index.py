@@ -0,0 +1,101 @@
+from typing import BinaryIO, Dict, Any, Optional, Tuple, Union
+
+import orjson
+from avl_range_tree.avl_tree import RangeTree
+
+from bin_lookup_indexer.indexes.index_base import IndexBase
+
+# Number of JSON fragments buffered before they are written
+WRITE_CHUNK_FRAGMENTS = 4096
+
+
+def json_serializer(data: Dict[str, Any]) -> str:
+    return orjson.dumps(data).decode("utf-8")
+
+
+class AvlIndex(IndexBase):
+    """
+    Index backed by the augmented AVL tree of `avl_range_tree`, serialized as JSON.
+    """
+
+    def __init__(self, tree: RangeTree = None):
+        """
+        Args:
+            tree (RangeTree, optional): An existing tree, e.g., a deserialized one.
+        """
+        self.tree = tree if tree is not None else RangeTree()
+
+    def insert(self, low: int, high: int, key: str):
+        self.tree.insert(low, high, key)
+
+    def search(self, point: int) -> Optional[Tuple[int, int, str]]:
+        found: Optional[Tuple[int, int, str]] = self.tree.search(point)
+        return found
+
+    def serialize(self) -> str:
+        serialized: str = self.tree.serialize(json_serializer)
+        return serialized
+
+    def write(self, file: BinaryIO):
+        """
+        Stream the JSON serialization of the tree to a binary file, node by node.
+
+        The output is the same as `serialize`, but the tree is walked with an explicit
+        stack instead of being converted to nested dictionaries, so only the path to the
+        current node is held in memory besides a small buffer of fragments.
+
+        Args:
+            file (BinaryIO): The destination file.
+        """
+        chunks = [b'{"root":']
+        # Nodes still to be written and the JSON fragments closing the ones being written
+        pending = [self.tree.root]
+        while pending:
+            item = pending.pop()
+            if item is None:
+                chunks.append(b"null")
+            elif isinstance(item, bytes):
+                chunks.append(item)
+            else:
+                chunks.append(
+                    b'{"start":%d,"end":%d,"max":%d,"height":%d,"key":%b,"left":'
+                    % (
+                        item.start,
+                        item.end,
+                        item.max,
+                        item.height,
+                        orjson.dumps(item.key),
+                    )
+                )
+                pending += (b"}", item.right, b',"right":', item.left)
+
+            if len(chunks) >= WRITE_CHUNK_FRAGMENTS:
+                file.write(b"".join(chunks))
+                chunks.clear()
+
+        chunks.append(b"}")
+        file.write(b"".join(chunks))
+
+    @property
+    def digits(self) -> int:
+        """
+        Number of digits of the range bounds (e.g., 18 for Redsys padded ranges).
+        """
+        return len(str(self.tree.root.max)) if self.tree.root else 0
+
+    def __len__(self) -> int:
+        return len(self.tree)
+
+    @classmethod
+    def deserialize(cls, data: Union[str, bytes]) -> "AvlIndex":
+        """
+        Load an index serialized as JSON.
+
+        Args:
+            data (Union[str, bytes]): The serialized tree, as text or as the UTF-8 bytes
+                read from an index file.
+
+        Returns:
+            AvlIndex: The loaded index.
+        """
+        return cls(RangeTree.deserialize(data, orjson.loads))
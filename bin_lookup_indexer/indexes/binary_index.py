@@ -0,0 +1,289 @@
+"""
+BINARY INDEX FORMAT - VERSION 1
+-------------------------------
+A flat, sorted and fixed-width layout that can be memory-mapped and queried without
+deserializing it:
+
+    header   (24 bytes)  magic, format version, range digits, range count, string table offset
+    ranges   (24 bytes each, sorted by low bound and non-overlapping)
+             low bound (uint64), high bound (uint64), key offset (uint32), key length (uint32)
+    strings  UTF-8 storage keys, each distinct key stored once
+
+Every integer is little-endian.
+"""
+
+import io
+import mmap
+import struct
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from bin_lookup_indexer.indexes.segments import flatten_ranges
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, batch lookups fall back to binary searches
+    np = None  # type: ignore[assignment]
+
+MAGIC = b"BINIDX\x00\x00"
+VERSION = 1
+
+HEADER = struct.Struct("<8sHHIQ")
+RANGE = struct.Struct("<QQII")
+
+# Number of ranges packed before they are written
+WRITE_CHUNK_RANGES = 4096
+
+
+def write_table(
+    file: BinaryIO,
+    lows: Sequence[int],
+    highs: Sequence[int],
+    key_ids: Sequence[int],
+    keys: Sequence[str],
+) -> None:
+    """
+    Write sorted, non-overlapping segments in the binary index format, streaming the
+    range table in chunks.
+
+    Args:
+        file (BinaryIO): The destination file.
+        lows (Sequence[int]): The low bound of every segment.
+        highs (Sequence[int]): The high bound of every segment.
+        key_ids (Sequence[int]): The position in `keys` of the key of every segment.
+        keys (Sequence[str]): The distinct keys, in the order they are stored.
+    """
+    locations = []
+    offset = 0
+    for key in keys:
+        length = len(key.encode("utf-8"))
+        locations.append((offset, length))
+        offset += length
+
+    digits = len(str(max(highs))) if highs else 0
+    file.write(
+        HEADER.pack(
+            MAGIC, VERSION, digits, len(lows), HEADER.size + RANGE.size * len(lows)
+        )
+    )
+
+    for start in range(0, len(lows), WRITE_CHUNK_RANGES):
+        end = min(start + WRITE_CHUNK_RANGES, len(lows))
+        file.write(
+            b"".join(
+                RANGE.pack(
+                    lows[position], highs[position], *locations[key_ids[position]]
+                )
+                for position in range(start, end)
+            )
+        )
+
+    for start in range(0, len(keys), WRITE_CHUNK_RANGES):
+        file.write("".join(keys[start : start + WRITE_CHUNK_RANGES]).encode("utf-8"))
+
+
+def serialize_segments(segments: Sequence[Tuple[int, int, str]]) -> bytes:
+    """
+    Serialize already flattened segments in the binary index format.
+
+    Args:
+        segments (Sequence[Tuple[int, int, str]]): Sorted, non-overlapping segments as
+            (low, high, key).
+
+    Returns:
+        bytes: The binary index.
+    """
+    key_ids: Dict[str, int] = {}
+    for _, _, key in segments:
+        key_ids.setdefault(key, len(key_ids))
+
+    buffer = io.BytesIO()
+    write_table(
+        buffer,
+        [low for low, _, _ in segments],
+        [high for _, high, _ in segments],
+        [key_ids[key] for _, _, key in segments],
+        list(key_ids),
+    )
+    return buffer.getvalue()
+
+
+def serialize_binary_index(ranges: Iterable[Tuple[int, int, str]]) -> bytes:
+    """
+    Serialize ranges in the binary index format.
+
+    Args:
+        ranges (Iterable[Tuple[int, int, str]]): Ranges as (low, high, key), in insertion
+            order. Overlapping ranges are flattened keeping the smallest range.
+
+    Returns:
+        bytes: The binary index.
+    """
+    return serialize_segments(flatten_ranges(ranges))
+
+
+def search_sorted(lows: Any, highs: Any, points: Iterable[int]) -> List[int]:
+    """
+    Search the positions of the ranges containing several points at once with NumPy.
+
+    Args:
+        lows (numpy.ndarray): The low bounds of the ranges, sorted and not empty.
+        highs (numpy.ndarray): The high bounds of the ranges.
+        points (Iterable[int]): The points to find a range for.
+
+    Returns:
+        List[int]: The position of the range containing every point, or -1 if no range
+        contains it.
+    """
+    points = np.fromiter(points, dtype=np.uint64)
+    positions = np.searchsorted(lows, points, side="right") - 1
+    clipped = np.maximum(positions, 0)
+    found = (positions >= 0) & (highs[clipped] >= points)
+    result: List[int] = np.where(found, positions, -1).tolist()
+    return result
+
+
+class BinaryIndex:
+    """
+    Memory-mapped reader of the binary index format. Opening the index only reads the
+    header, so the cost is the same regardless of the table size, and lookups are a
+    binary search over the mapped range table.
+    """
+
+    # Ranges are flattened when the index is written
+    disjoint = True
+
+    digits: int
+    count: int
+    strings_offset: int
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path (str): The path of the binary index file.
+
+        Raises:
+            ValueError: If the file is not a binary index or its version is unsupported.
+        """
+        with open(file_path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.digits, self.count, self.strings_offset = (
+            HEADER.unpack_from(self.mmap)
+        )
+        if magic != MAGIC:
+            self.mmap.close()
+            raise ValueError(f"Invalid binary index: {file_path}")
+        if version != VERSION:
+            self.mmap.close()
+            raise ValueError(f"Unsupported binary index version: {version}")
+
+        # Every range is three uint64 words: low, high and the packed key location
+        self.words: memoryview = memoryview(self.mmap)[
+            HEADER.size : self.strings_offset
+        ].cast("Q")
+        # The same words as a NumPy array of rows, without copying them
+        self.table: Optional[Any] = (
+            np.frombuffer(self.words, dtype=np.uint64).reshape(-1, 3)
+            if np is not None
+            else None
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _range(self, position: int) -> Tuple[int, int, str]:
+        low, high, offset, length = RANGE.unpack_from(
+            self.mmap, HEADER.size + position * RANGE.size
+        )
+        start = self.strings_offset + offset
+        return low, high, self.mmap[start : start + length].decode("utf-8")
+
+    def _key(self, location: int) -> str:
+        # Key locations pack the offset in their low half and the length in the high one
+        start = self.strings_offset + (location & 0xFFFFFFFF)
+        return self.mmap[start : start + (location >> 32)].decode("utf-8")
+
+    def ranges(self) -> Iterator[Tuple[int, int, str]]:
+        """
+        Iterate over every range of the index, sorted by low bound.
+
+        Yields:
+            Tuple[int, int, str]: The (low, high, key) of each range.
+        """
+        for position in range(self.count):
+            yield self._range(position)
+
+    def search(self, point: int) -> Optional[Tuple[int, int, str]]:
+        """
+        Search the range containing a given point.
+
+        Args:
+            point (int): The point to find a range for.
+
+        Returns:
+            Optional[Tuple[int, int, str]]: The (low, high, key) of the range, or None if no
+            range contains the point.
+        """
+        # Binary search of the last range starting at or before the point
+        words = self.words
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if words[middle * 3] <= point:
+                low = middle + 1
+            else:
+                high = middle
+        position = low - 1
+        if position < 0 or words[position * 3 + 1] < point:
+            return None
+
+        return self._range(position)
+
+    def search_many(self, points: Iterable[int]) -> List[Optional[str]]:
+        """
+        Search the keys of the ranges containing several points, vectorized with NumPy
+        when it is installed.
+
+        Args:
+            points (Iterable[int]): The points to find a range for.
+
+        Returns:
+            List[Optional[str]]: The key of every point, or None if no range contains it.
+        """
+        if self.table is None or not self.count:
+            results = []
+            for point in points:
+                found = self.search(point)
+                results.append(found[2] if found else None)
+            return results
+
+        words = self.words
+        return [
+            self._key(words[position * 3 + 2]) if position >= 0 else None
+            for position in search_sorted(self.table[:, 0], self.table[:, 1], points)
+        ]
+
+    def close(self) -> None:
+        """
+        Release the memory map.
+        """
+        # The NumPy view holds the words buffer, which can not be released while it exists
+        self.table = None
+        self.words.release()
+        self.mmap.close()
+
+    def __enter__(self) -> "BinaryIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,114 @@
+"""
+INDEX FILE COMPRESSION
+----------------------
+Index files can be written compressed with gzip or Zstandard (pip install zstandard).
+The compression is detected from the magic number of the file when it is loaded, so
+readers do not need to know how the index was written.
+
+Compressed indexes are decompressed into memory when they are loaded, so they can not be
+memory-mapped: only JSON indexes can be compressed.
+"""
+
+import gzip
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, cast
+
+try:
+    import zstandard
+except ImportError:  # Zstandard is optional, only zstd compressed indexes require it
+    zstandard = None  # type: ignore[assignment]
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+compressions = ["none", "gzip", "zstd"]
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise ImportError(
+            "Zstandard compressed indexes require zstandard (pip install zstandard)"
+        )
+
+
+def detect_compression(header: bytes) -> Optional[str]:
+    """
+    Detect the compression of a file from its first bytes.
+
+    Args:
+        header (bytes): The first bytes of the file (at least 4).
+
+    Returns:
+        Optional[str]: 'gzip' or 'zstd', or None if the file is not compressed.
+    """
+    if header.startswith(GZIP_MAGIC):
+        return "gzip"
+    if header.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+@contextmanager
+def compressed_writer(
+    file: BinaryIO, compression: Optional[str] = None
+) -> Iterator[BinaryIO]:
+    """
+    Wrap a binary file so everything written to it is compressed as it is written.
+
+    The compressed stream is finished when the context exits, leaving the file open.
+
+    Args:
+        file (BinaryIO): The destination file.
+        compression (str, optional): 'gzip', 'zstd', or 'none'/None to write it as is.
+
+    Yields:
+        BinaryIO: The file object to write the uncompressed data to.
+
+    Raises:
+        ValueError: If the compression is not supported.
+    """
+    if compression in (None, "none"):
+        yield file
+    elif compression == "gzip":
+        # A fixed modification time keeps the output reproducible
+        with gzip.GzipFile(
+            fileobj=file, mode="wb", compresslevel=GZIP_LEVEL, mtime=0
+        ) as stream:
+            yield cast(BinaryIO, stream)
+    elif compression == "zstd":
+        _require_zstandard()
+        with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(
+            file, closefd=False
+        ) as stream:
+            yield stream
+    else:
+        raise ValueError(f"Unsupported index compression: {compression}")
+
+
+def decompress(file: BinaryIO, compression: str) -> bytes:
+    """
+    Read and decompress a whole file.
+
+    Args:
+        file (BinaryIO): The compressed file, positioned at its start.
+        compression (str): 'gzip' or 'zstd'.
+
+    Returns:
+        bytes: The decompressed content.
+
+    Raises:
+        ValueError: If the compression is not supported.
+    """
+    if compression == "gzip":
+        with gzip.GzipFile(fileobj=file, mode="rb") as stream:
+            return stream.read()
+    elif compression == "zstd":
+        _require_zstandard()
+        # Streamed frames do not record their size, so they are read until the end
+        with zstandard.ZstdDecompressor().stream_reader(file, closefd=False) as stream:
+            return stream.readall()
+    else:
+        raise ValueError(f"Unsupported index compression: {compression}")
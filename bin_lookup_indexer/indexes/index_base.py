@@ -0,0 +1,84 @@
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
+
+
+class IndexBase(ABC):
+    """
+    Abstract base class for range index backends.
+
+    All specific backends (e.g., AvlIndex, SortedArrayIndex) should inherit from this class
+    and implement the required methods.
+    """
+
+    # Whether the stored ranges never overlap, so a range found for a point is the only
+    # one covering every point between its bounds
+    disjoint = False
+
+    @abstractmethod
+    def insert(self, low: int, high: int, key: str):
+        """
+        Insert a range into the index.
+
+        Args:
+            low (int): The low bound of the range.
+            high (int): The high bound of the range.
+            key (str): The storage key of the range record.
+        """
+        pass
+
+    @abstractmethod
+    def search(self, point: int) -> Optional[Tuple[int, int, str]]:
+        """
+        Search the smallest range containing a given point.
+
+        Args:
+            point (int): The point to find a range for.
+
+        Returns:
+            Optional[Tuple[int, int, str]]: The (low, high, key) of the range, or None if no
+            range contains the point.
+        """
+        pass
+
+    def search_many(self, points: Iterable[int]) -> List[Optional[str]]:
+        """
+        Search the keys of the ranges containing several points.
+
+        Args:
+            points (Iterable[int]): The points to find a range for.
+
+        Returns:
+            List[Optional[str]]: The key of every point, or None if no range contains it.
+        """
+        results = []
+        for point in points:
+            found = self.search(point)
+            results.append(found[2] if found else None)
+        return results
+
+    @abstractmethod
+    def serialize(self) -> Union[str, bytes]:
+        """
+        Serialize the index in the file format of the backend.
+
+        Returns:
+            Union[str, bytes]: The serialized index.
+        """
+        pass
+
+    def write(self, file: BinaryIO):
+        """
+        Write the serialized index to a binary file.
+
+        Backends should override it to stream the index in chunks instead of serializing
+        it whole in memory first.
+
+        Args:
+            file (BinaryIO): The destination file.
+        """
+        data = self.serialize()
+        file.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
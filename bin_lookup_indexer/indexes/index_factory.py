@@ -0,0 +1,79 @@
+from typing import Optional, Union
+
+from bin_lookup_indexer.cache import LRUCache
+from bin_lookup_indexer.indexes import paged_index
+from bin_lookup_indexer.indexes.avl_index import AvlIndex
+from bin_lookup_indexer.indexes.binary_index import BinaryIndex, MAGIC
+from bin_lookup_indexer.indexes.compression import decompress, detect_compression
+from bin_lookup_indexer.indexes.paged_index import PagedArrayIndex, PagedIndex
+from bin_lookup_indexer.indexes.sorted_array_index import SortedArrayIndex
+
+# The readers of every index file format
+LoadedIndex = Union[AvlIndex, BinaryIndex, PagedIndex]
+
+
+class IndexFactory:
+    @staticmethod
+    def create_index(index_format: str):
+        """
+        Factory method to create an index backend based on the given index file format.
+
+        Args:
+            index_format (str): The format of the index file (e.g., 'json', 'binary',
+                'paged').
+
+        Returns:
+            IndexBase: The backend building that format, the AVL range tree for 'json'
+            and the sorted arrays for 'binary' and 'paged'.
+
+        Raises:
+            ValueError: If the index format is not supported.
+        """
+        index_format = index_format.lower()
+
+        if index_format == "json":
+            return AvlIndex()
+        elif index_format == "binary":
+            return SortedArrayIndex()
+        elif index_format == "paged":
+            return PagedArrayIndex()
+        else:
+            raise ValueError(f"Unsupported index format: {index_format}")
+
+    @staticmethod
+    def load_index(
+        file_path: str, block_cache: Optional[LRUCache] = None
+    ) -> LoadedIndex:
+        """
+        Load an index file, detecting its format.
+
+        Binary indexes are memory-mapped, paged indexes only read their directory and
+        JSON indexes are deserialized into the AVL range tree, after decompressing them
+        if they were written compressed.
+
+        Args:
+            file_path (str): The path of the index file.
+            block_cache (LRUCache, optional): Cache of the blocks read from paged indexes.
+
+        Returns:
+            LoadedIndex: The loaded index, exposing `search`, `search_many` and `digits`.
+
+        Raises:
+            ValueError: If a binary or paged index is compressed, since they are read in
+                place.
+        """
+        with open(file_path, "rb") as file:
+            header = file.read(len(MAGIC))
+            if header == MAGIC:
+                return BinaryIndex(file_path)
+            if header == paged_index.MAGIC:
+                return PagedIndex(file_path, block_cache)
+            file.seek(0)
+            compression = detect_compression(header)
+            data = decompress(file, compression) if compression else file.read()
+
+        if data.startswith((MAGIC, paged_index.MAGIC)):
+            raise ValueError(
+                f"Compressed binary indexes are not supported: {file_path}"
+            )
+        return AvlIndex.deserialize(data)
@@ -0,0 +1,324 @@
+"""
+PAGED INDEX FORMAT - VERSION 1
+------------------------------
+The flattened segments of the binary index, split in blocks by the BIN prefix of their
+low bound, behind a directory small enough to be read when the index is opened. Lookups
+read the directory entry of the prefix and then only the block it points to, so lookup
+services that only see a fraction of the BINs only ever read a fraction of the file:
+
+    header     (24 bytes)  magic, format version, range digits, prefix digits,
+                           block count, range count
+    directory  prefixes   (uint32 per block, sorted)
+               counts     (uint32 per block) number of segments of every block
+               offsets    (uint64 per block, plus the end of the last block)
+    blocks     ranges   (24 bytes each, sorted by low bound and non-overlapping)
+                        low bound (uint64), high bound (uint64),
+                        key offset (uint32), key length (uint32)
+               strings  UTF-8 storage keys of the block, each distinct key stored once
+
+Every block holds the segments whose low bound starts with its prefix, and key offsets
+are relative to the strings of the block. Every integer is little-endian.
+"""
+
+import bisect
+import os
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+from bin_lookup_indexer.cache import LRUCache, MISSING
+from bin_lookup_indexer.indexes.binary_index import RANGE
+from bin_lookup_indexer.indexes.sorted_array_index import SortedArrayIndex
+
+MAGIC = b"BINPAG\x00\x00"
+VERSION = 1
+
+HEADER = struct.Struct("<8sHHHxxII")
+
+# Blocks group the segments by the BIN, the first 6 digits of the card number
+PREFIX_DIGITS = 6
+# Number of blocks kept decoded by the reader
+CACHED_BLOCKS = 1024
+
+
+def _words(data: bytes, typecode: str) -> array:
+    words = array(typecode)
+    words.frombytes(data)
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+
+def write_paged_table(
+    file: BinaryIO,
+    lows: Sequence[int],
+    highs: Sequence[int],
+    key_ids: Sequence[int],
+    keys: Sequence[str],
+    prefix_digits: int = PREFIX_DIGITS,
+):
+    """
+    Write sorted, non-overlapping segments in the paged index format.
+
+    Args:
+        file (BinaryIO): The destination file.
+        lows (Sequence[int]): The low bound of every segment.
+        highs (Sequence[int]): The high bound of every segment.
+        key_ids (Sequence[int]): The position in `keys` of the key of every segment.
+        keys (Sequence[str]): The distinct keys.
+        prefix_digits (int): The number of leading digits the blocks are split by.
+    """
+    digits = len(str(max(highs))) if highs else 0
+    span = 10 ** max(digits - prefix_digits, 0)
+
+    # Segments are sorted, so the segments of every prefix are contiguous
+    prefixes, starts = array("I"), []
+    for position, low in enumerate(lows):
+        prefix = low // span
+        if not prefixes or prefixes[-1] != prefix:
+            prefixes.append(prefix)
+            starts.append(position)
+    starts.append(len(lows))
+
+    encoded_keys = [key.encode("utf-8") for key in keys]
+
+    def block_keys(start: int, end: int) -> dict:
+        # Offset of every distinct key of a block in its strings
+        locations, offset = {}, 0
+        for position in range(start, end):
+            key_id = key_ids[position]
+            if key_id not in locations:
+                locations[key_id] = offset
+                offset += len(encoded_keys[key_id])
+        return locations
+
+    counts = array("I", (end - start for start, end in zip(starts, starts[1:])))
+    offsets = array("Q", [HEADER.size + 16 * len(prefixes) + 8])
+    for start, end in zip(starts, starts[1:]):
+        strings = sum(len(encoded_keys[key_id]) for key_id in block_keys(start, end))
+        offsets.append(offsets[-1] + RANGE.size * (end - start) + strings)
+
+    file.write(
+        HEADER.pack(MAGIC, VERSION, digits, prefix_digits, len(prefixes), len(lows))
+    )
+    for words in (prefixes, counts, offsets):
+        if sys.byteorder != "little":
+            words = array(words.typecode, words)
+            words.byteswap()
+        file.write(words.tobytes())
+
+    for start, end in zip(starts, starts[1:]):
+        locations = block_keys(start, end)
+        file.write(
+            b"".join(
+                RANGE.pack(
+                    lows[position],
+                    highs[position],
+                    locations[key_ids[position]],
+                    len(encoded_keys[key_ids[position]]),
+                )
+                for position in range(start, end)
+            )
+        )
+        file.write(b"".join(encoded_keys[key_id] for key_id in locations))
+
+
+class PagedArrayIndex(SortedArrayIndex):
+    """
+    Sorted array index written in the paged format.
+    """
+
+    def __init__(self, prefix_digits: int = PREFIX_DIGITS) -> None:
+        """
+        Args:
+            prefix_digits (int): The number of leading digits the blocks are split by.
+
+        Raises:
+            ValueError: If the prefixes do not fit in the directory.
+        """
+        if not 1 <= prefix_digits <= 9:
+            raise ValueError(f"Invalid prefix digits: {prefix_digits}")
+
+        super().__init__()
+        self.prefix_digits = prefix_digits
+
+    def write(self, file: BinaryIO) -> None:
+        """
+        Write the index in the paged format, block by block.
+
+        Args:
+            file (BinaryIO): The destination file.
+        """
+        if not self.built:
+            self.build()
+        write_paged_table(
+            file, self.lows, self.highs, self.key_ids, self.keys, self.prefix_digits
+        )
+
+
+class PagedIndex:
+    """
+    Reader of the paged index format. Opening the index only reads the header and the
+    directory, and the blocks are read on demand with positional reads and kept decoded
+    in an LRU cache, so the memory of the process only grows with the blocks that are
+    actually looked up.
+    """
+
+    # Ranges are flattened when the index is written
+    disjoint = True
+
+    digits: int
+    prefix_digits: int
+    count: int
+
+    def __init__(self, file_path: str, cache: Optional[LRUCache] = None) -> None:
+        """
+        Args:
+            file_path (str): The path of the paged index file.
+            cache (LRUCache, optional): Cache of decoded blocks by position. By default,
+                the last `CACHED_BLOCKS` blocks looked up are kept.
+
+        Raises:
+            ValueError: If the file is not a paged index or its version is unsupported.
+        """
+        self.fd = os.open(file_path, os.O_RDONLY)
+        self.closed = False
+        self.cache = cache if cache is not None else LRUCache(CACHED_BLOCKS)
+
+        header = os.pread(self.fd, HEADER.size, 0)
+        if len(header) < HEADER.size or header[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Invalid paged index: {file_path}")
+        _, version, self.digits, self.prefix_digits, blocks, self.count = HEADER.unpack(
+            header
+        )
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported paged index version: {version}")
+
+        directory = os.pread(self.fd, 16 * blocks + 8, HEADER.size)
+        self.prefixes = _words(directory[: 4 * blocks], "I")
+        self.counts = _words(directory[4 * blocks : 8 * blocks], "I")
+        self.offsets = _words(directory[8 * blocks :], "Q")
+        self.span = 10 ** max(self.digits - self.prefix_digits, 0)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _read_block(self, block: int) -> Tuple[array, bytes]:
+        start, end = self.offsets[block], self.offsets[block + 1]
+        data = os.pread(self.fd, end - start, start)
+        table = RANGE.size * self.counts[block]
+        return _words(data[:table], "Q"), data[table:]
+
+    def block(self, block: int) -> Tuple[array, bytes]:
+        """
+        Get a decoded block, reading it if it is not cached.
+
+        Args:
+            block (int): The position of the block in the directory.
+
+        Returns:
+            Tuple[array, bytes]: The ranges of the block, as three words each (low, high
+            and the packed key location), and its strings.
+        """
+        cached: Tuple[array, bytes] = self.cache.get(block)
+        if cached is not MISSING:
+            return cached
+
+        cached = self._read_block(block)
+        self.cache.set(block, cached)
+        return cached
+
+    @staticmethod
+    def _range(words: array, strings: bytes, position: int) -> Tuple[int, int, str]:
+        location = words[position * 3 + 2]
+        offset, length = location & 0xFFFFFFFF, location >> 32
+        return (
+            words[position * 3],
+            words[position * 3 + 1],
+            strings[offset : offset + length].decode("utf-8"),
+        )
+
+    def ranges(self) -> Iterator[Tuple[int, int, str]]:
+        """
+        Iterate over every range of the index, sorted by low bound, without caching the
+        blocks.
+
+        Yields:
+            Tuple[int, int, str]: The (low, high, key) of each range.
+        """
+        for block in range(len(self.prefixes)):
+            words, strings = self._read_block(block)
+            for position in range(self.counts[block]):
+                yield self._range(words, strings, position)
+
+    def search(self, point: int) -> Optional[Tuple[int, int, str]]:
+        """
+        Search the range containing a given point.
+
+        Args:
+            point (int): The point to find a range for.
+
+        Returns:
+            Optional[Tuple[int, int, str]]: The (low, high, key) of the range, or None if no
+            range contains the point.
+        """
+        block = bisect.bisect_right(self.prefixes, point // self.span) - 1
+        if block < 0:
+            return None
+
+        # Binary search of the last range of the block starting at or before the point
+        words, strings = self.block(block)
+        low, high = 0, self.counts[block]
+        while low < high:
+            middle = (low + high) // 2
+            if words[middle * 3] <= point:
+                low = middle + 1
+            else:
+                high = middle
+        position = low - 1
+        if position < 0:
+            # The point is before the first segment of its prefix, only the last segment
+            # of the previous block can contain it
+            if block == 0:
+                return None
+            block -= 1
+            words, strings = self.block(block)
+            position = self.counts[block] - 1
+
+        if words[position * 3 + 1] < point:
+            return None
+
+        return self._range(words, strings, position)
+
+    def search_many(self, points: Sequence[int]) -> List[Optional[str]]:
+        """
+        Search the keys of the ranges containing several points.
+
+        Args:
+            points (Sequence[int]): The points to find a range for.
+
+        Returns:
+            List[Optional[str]]: The key of every point, or None if no range contains it.
+        """
+        results = []
+        for point in points:
+            found = self.search(point)
+            results.append(found[2] if found else None)
+        return results
+
+    def close(self) -> None:
+        """
+        Close the index file.
+        """
+        if not self.closed:
+            os.close(self.fd)
+            self.closed = True
+
+    def __enter__(self) -> "PagedIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,393 @@
+"""
+PREFIX TABLE FORMAT - VERSION 1
+-------------------------------
+A direct-address table resolving card numbers by their leading digits, written next to
+the index. Most BINs are entirely covered by a single range, so most lookups are a
+single array access instead of a search:
+
+    header     (32 bytes)  magic, format version, range digits, prefix digits,
+                           split digits, sub-table count, overflow count, range count,
+                           key count
+    slots      (uint32 per prefix, 10^prefix digits)
+    sub-tables (uint32 per longer prefix, 10^(split digits - prefix digits) per table)
+    overflow   (two uint32 each) position and count of the ranges of a split prefix
+    ranges     (24 bytes each, sorted by low bound and non-overlapping)
+               low bound (uint64), high bound (uint64), key id (uint64)
+    keys       (two uint32 each) offset and length of every key
+    strings    UTF-8 storage keys
+
+Every slot holds a tag in its two high bits and a value in the rest:
+
+* EMPTY: no range covers any number of the prefix.
+* KEY: a single range covers every number of the prefix, the value is its key id.
+* TABLE: the prefix is split across ranges, the value is the position of the sub-table
+  of its longer prefixes (e.g., 8 digits for a 6-digit BIN), when split digits are set.
+* OVERFLOW: the prefix is split across ranges, the value is the position of its overflow
+  entry, whose ranges are searched.
+
+Only the ranges of split prefixes are stored. Every integer is little-endian.
+"""
+
+import bisect
+import mmap
+import struct
+from array import array
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bin_lookup_indexer.indexes.segments import flatten_ranges
+
+MAGIC = b"BINPFX\x00\x00"
+VERSION = 1
+
+HEADER = struct.Struct("<8sHHHHIIII")
+RANGE = struct.Struct("<QQQ")
+
+EMPTY, KEY, TABLE, OVERFLOW = range(4)
+TAG_SHIFT = 30
+VALUE_MASK = (1 << TAG_SHIFT) - 1
+
+# The 6-digit BIN, split in 8-digit BINs when requested
+PREFIX_DIGITS = 6
+SPLIT_DIGITS = 8
+
+
+def _slot(tag: int, value: int) -> int:
+    if value > VALUE_MASK:
+        raise ValueError(f"Prefix table value out of range: {value}")
+    return tag << TAG_SHIFT | value
+
+
+def _classify(
+    lows: Sequence[int],
+    highs: Sequence[int],
+    key_ids: Sequence[int],
+    start: int,
+    end: int,
+    base: int,
+    span: int,
+    count: int,
+) -> Tuple[array, List[int]]:
+    """
+    Build the slots of consecutive prefixes from the segments covering them.
+
+    Args:
+        lows (Sequence[int]): The low bound of every segment.
+        highs (Sequence[int]): The high bound of every segment.
+        key_ids (Sequence[int]): The key id of every segment.
+        start (int): The position of the first segment covering the prefixes.
+        end (int): The position after the last segment covering the prefixes.
+        base (int): The first number of the first prefix.
+        span (int): The numbers covered by every prefix.
+        count (int): The number of prefixes.
+
+    Returns:
+        Tuple[array, List[int]]: The slots, with the KEY of the prefixes entirely
+        covered by a segment, and the positions of the prefixes split across segments,
+        whose slots are left EMPTY.
+    """
+    slots = array("I", bytes(4 * count))
+    split = set()
+    for position in range(start, end):
+        low = max(lows[position] - base, 0)
+        high = min(highs[position] - base, span * count - 1)
+        first, last = low // span, high // span
+        full_first = first if low % span == 0 else first + 1
+        full_last = last if high % span == span - 1 else last - 1
+        if full_first <= full_last:
+            slots[full_first : full_last + 1] = array(
+                "I", [_slot(KEY, key_ids[position])]
+            ) * (full_last - full_first + 1)
+        if first < full_first:
+            split.add(first)
+        if last > full_last:
+            split.add(last)
+
+    return slots, sorted(split)
+
+
+def write_prefix_table(
+    file: BinaryIO,
+    lows: Sequence[int],
+    highs: Sequence[int],
+    key_ids: Sequence[int],
+    keys: Sequence[str],
+    prefix_digits: int = PREFIX_DIGITS,
+    split_digits: Optional[int] = None,
+):
+    """
+    Write the prefix table of sorted, non-overlapping segments.
+
+    Args:
+        file (BinaryIO): The destination file.
+        lows (Sequence[int]): The low bound of every segment.
+        highs (Sequence[int]): The high bound of every segment.
+        key_ids (Sequence[int]): The position in `keys` of the key of every segment.
+        keys (Sequence[str]): The distinct keys.
+        prefix_digits (int): The length of the prefixes of the table.
+        split_digits (int, optional): The length of the prefixes of the sub-tables of
+            the prefixes split across ranges. By default split prefixes are searched.
+
+    Raises:
+        ValueError: If the prefixes are longer than the range bounds.
+    """
+    digits = len(str(max(highs))) if highs else max(prefix_digits, split_digits or 0)
+    if prefix_digits > digits or (
+        split_digits is not None and not prefix_digits < split_digits <= digits
+    ):
+        raise ValueError(
+            f"Invalid prefix digits for {digits}-digit ranges: "
+            f"{prefix_digits}, {split_digits}"
+        )
+
+    span = 10 ** (digits - prefix_digits)
+    slots, split = _classify(
+        lows, highs, key_ids, 0, len(lows), 0, span, 10**prefix_digits
+    )
+
+    fanout = 10 ** (split_digits - prefix_digits) if split_digits else 1
+    tables = array("I")
+    overflow = array("I")
+    stored: List[int] = []  # Positions of the stored segments
+
+    def add_overflow(start: int, end: int) -> int:
+        # Segments are shared by consecutive split prefixes, they are stored once
+        while stored and stored[-1] >= start:
+            stored.pop()
+        overflow.extend((len(stored), end - start))
+        stored.extend(range(start, end))
+        return _slot(OVERFLOW, len(overflow) // 2 - 1)
+
+    for prefix in split:
+        base = prefix * span
+        start = bisect.bisect_left(highs, base)
+        end = bisect.bisect_right(lows, base + span - 1)
+        if not split_digits:
+            slots[prefix] = add_overflow(start, end)
+            continue
+
+        sub_span = span // fanout
+        sub_slots, sub_split = _classify(
+            lows, highs, key_ids, start, end, base, sub_span, fanout
+        )
+        for sub_prefix in sub_split:
+            sub_base = base + sub_prefix * sub_span
+            sub_slots[sub_prefix] = add_overflow(
+                bisect.bisect_left(highs, sub_base),
+                bisect.bisect_right(lows, sub_base + sub_span - 1),
+            )
+        slots[prefix] = _slot(TABLE, len(tables) // fanout)
+        tables += sub_slots
+
+    file.write(
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            digits,
+            prefix_digits,
+            split_digits or 0,
+            len(tables) // fanout if split_digits else 0,
+            len(overflow) // 2,
+            len(stored),
+            len(keys),
+        )
+    )
+    file.write(slots.tobytes())
+    file.write(tables.tobytes())
+    file.write(overflow.tobytes())
+    for position in range(0, len(stored), 4096):
+        file.write(
+            b"".join(
+                RANGE.pack(
+                    lows[stored_position],
+                    highs[stored_position],
+                    key_ids[stored_position],
+                )
+                for stored_position in stored[position : position + 4096]
+            )
+        )
+
+    encoded_keys = [key.encode("utf-8") for key in keys]
+    locations = array("I")
+    offset = 0
+    for encoded in encoded_keys:
+        locations.extend((offset, len(encoded)))
+        offset += len(encoded)
+    file.write(locations.tobytes())
+    file.write(b"".join(encoded_keys))
+
+
+def write_ranges_prefix_table(
+    file: BinaryIO,
+    ranges: Iterable[Tuple[int, int, str]],
+    prefix_digits: int = PREFIX_DIGITS,
+    split_digits: Optional[int] = None,
+):
+    """
+    Write the prefix table of ranges.
+
+    Args:
+        file (BinaryIO): The destination file.
+        ranges (Iterable[Tuple[int, int, str]]): Ranges as (low, high, key), in insertion
+            order. Overlapping ranges are flattened keeping the smallest range.
+        prefix_digits (int): The length of the prefixes of the table.
+        split_digits (int, optional): The length of the prefixes of the sub-tables of
+            the prefixes split across ranges.
+    """
+    segments = flatten_ranges(ranges)
+    key_ids: Dict[str, int] = {}
+    for _, _, key in segments:
+        key_ids.setdefault(key, len(key_ids))
+
+    write_prefix_table(
+        file,
+        [low for low, _, _ in segments],
+        [high for _, high, _ in segments],
+        [key_ids[key] for _, _, key in segments],
+        list(key_ids),
+        prefix_digits,
+        split_digits,
+    )
+
+
+class PrefixTable:
+    """
+    Memory-mapped reader of the prefix table format. Resolving a card number reads the
+    slot of its prefix, and only searches the few ranges of its prefix when it is split
+    across ranges.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path (str): The path of the prefix table file.
+
+        Raises:
+            ValueError: If the file is not a prefix table or its version is unsupported.
+        """
+        with open(file_path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.mmap) < HEADER.size or self.mmap[: len(MAGIC)] != MAGIC:
+            self.mmap.close()
+            raise ValueError(f"Invalid prefix table: {file_path}")
+        (
+            _,
+            version,
+            self.digits,
+            self.prefix_digits,
+            self.split_digits,
+            tables,
+            overflow,
+            ranges,
+            keys,
+        ) = HEADER.unpack_from(self.mmap)
+        if version != VERSION:
+            self.mmap.close()
+            raise ValueError(f"Unsupported prefix table version: {version}")
+
+        self.span = 10 ** (self.digits - self.prefix_digits)
+        self.fanout = (
+            10 ** (self.split_digits - self.prefix_digits) if self.split_digits else 1
+        )
+        self.split_span = self.span // self.fanout
+
+        # Sections of the file, as views over the memory map
+        view = memoryview(self.mmap)
+        offset = HEADER.size
+        size = 4 * 10**self.prefix_digits
+        self.slots: memoryview = view[offset : offset + size].cast("I")
+        offset += size
+        size = 4 * tables * self.fanout if self.split_digits else 0
+        self.tables: memoryview = view[offset : offset + size].cast("I")
+        offset += size
+        size = 8 * overflow
+        self.overflow: memoryview = view[offset : offset + size].cast("I")
+        offset += size
+        size = RANGE.size * ranges
+        self.ranges: memoryview = view[offset : offset + size].cast("Q")
+        offset += size
+        size = 8 * keys
+        self.keys: memoryview = view[offset : offset + size].cast("I")
+        offset += size
+        self.strings_offset = offset
+
+    def key(self, key_id: int) -> str:
+        """
+        Get a key by its id.
+
+        Args:
+            key_id (int): The id of the key.
+
+        Returns:
+            str: The storage key.
+        """
+        start = self.strings_offset + self.keys[key_id * 2]
+        return self.mmap[start : start + self.keys[key_id * 2 + 1]].decode("utf-8")
+
+    def resolve(self, point: int) -> Optional[str]:
+        """
+        Resolve the key of the range containing a given point.
+
+        Args:
+            point (int): The point to find a range for.
+
+        Returns:
+            Optional[str]: The key of the range, or None if no range contains the point.
+        """
+        slot = self.slots[point // self.span]
+        tag = slot >> TAG_SHIFT
+        if tag == TABLE:
+            slot = self.tables[
+                (slot & VALUE_MASK) * self.fanout
+                + point // self.split_span % self.fanout
+            ]
+            tag = slot >> TAG_SHIFT
+
+        if tag == KEY:
+            return self.key(slot & VALUE_MASK)
+        if tag == EMPTY:
+            return None
+
+        entry = (slot & VALUE_MASK) * 2
+        start = self.overflow[entry]
+        words = self.ranges
+        position = (
+            bisect.bisect_right(
+                range(start, start + self.overflow[entry + 1]),
+                point,
+                key=lambda i: words[i * 3],
+            )
+            - 1
+        )
+        if position < 0 or words[(start + position) * 3 + 1] < point:
+            return None
+        return self.key(words[(start + position) * 3 + 2])
+
+    def search_many(self, points: Sequence[int]) -> List[Optional[str]]:
+        """
+        Resolve the keys of the ranges containing several points.
+
+        Args:
+            points (Sequence[int]): The points to find a range for.
+
+        Returns:
+            List[Optional[str]]: The key of every point, or None if no range contains it.
+        """
+        return [self.resolve(point) for point in points]
+
+    def close(self) -> None:
+        """
+        Release the memory map.
+        """
+        self.slots.release()
+        self.tables.release()
+        self.overflow.release()
+        self.ranges.release()
+        self.keys.release()
+        self.mmap.close()
+
+    def __enter__(self) -> "PrefixTable":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
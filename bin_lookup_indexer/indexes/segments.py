@@ -0,0 +1,57 @@
+import heapq
+from typing import Iterable, List, Tuple
+
+
+def flatten_ranges(
+    ranges: Iterable[Tuple[int, int, str]],
+) -> List[Tuple[int, int, str]]:
+    """
+    Flatten possibly overlapping ranges into sorted, non-overlapping segments.
+
+    Every point keeps the key of the smallest range containing it, which is the range
+    returned by `RangeTree.search`. Ranges of the same size are resolved in favour of the
+    first one inserted. Adjacent segments with the same key are merged.
+
+    Args:
+        ranges (Iterable[Tuple[int, int, str]]): Ranges as (low, high, key), in insertion order.
+
+    Returns:
+        List[Tuple[int, int, str]]: The segments as (low, high, key), sorted by low bound.
+    """
+    # Ranges as (low, high, key, insertion order), sorted by low bound
+    ordered: List[Tuple[int, int, str, int]] = [
+        (low, high, key, order) for order, (low, high, key) in enumerate(ranges)
+    ]
+    ordered.sort(key=lambda item: item[0])
+
+    # Every range starts and ends a segment
+    boundaries = sorted(
+        {low for low, _, _, _ in ordered} | {high + 1 for _, high, _, _ in ordered}
+    )
+
+    segments: List[Tuple[int, int, str]] = []
+    # Heap of the ranges covering the current boundary, smallest first, as
+    # (size, insertion order, high, key)
+    active: List[Tuple[int, int, int, str]] = []
+    position = 0
+    for start, next_start in zip(boundaries, boundaries[1:]):
+        while position < len(ordered) and ordered[position][0] == start:
+            low, high, key, order = ordered[position]
+            heapq.heappush(active, (high - low, order, high, key))
+            position += 1
+
+        # Discard the ranges that ended before this boundary
+        while active and active[0][2] < start:
+            heapq.heappop(active)
+
+        if not active:
+            continue
+
+        key = active[0][3]
+        end = next_start - 1
+        if segments and segments[-1][2] == key and segments[-1][1] + 1 == start:
+            segments[-1] = (segments[-1][0], end, key)
+        else:
+            segments.append((start, end, key))
+
+    return segments
@@ -0,0 +1,158 @@
+import bisect
+import io
+from array import array
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from bin_lookup_indexer.indexes.binary_index import (
+    BinaryIndex,
+    search_sorted,
+    write_table,
+)
+from bin_lookup_indexer.indexes.index_base import IndexBase
+from bin_lookup_indexer.indexes.segments import flatten_ranges
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, batch lookups fall back to bisect
+    np = None  # type: ignore[assignment]
+
+
+class SortedArrayIndex(IndexBase):
+    """
+    Index backed by flat arrays of sorted, non-overlapping segments.
+
+    Ranges are collected as they are inserted and sorted once when the index is first
+    searched or serialized. Overlapping ranges are flattened so every point keeps the key
+    of the smallest range containing it, the same range `RangeTree.search` looks for.
+    Batch lookups are vectorized with NumPy when it is installed.
+    """
+
+    disjoint = True
+
+    def __init__(self) -> None:
+        self.ranges: List[Tuple[int, int, str]] = []
+        self.lows = array("Q")
+        self.highs = array("Q")
+        self.key_ids = array("I")
+        self.keys: List[str] = []
+        self.built = True
+
+    def insert(self, low: int, high: int, key: str) -> None:
+        self.ranges.append((low, high, key))
+        self.built = False
+
+    def build(self) -> None:
+        """
+        Sort and flatten the inserted ranges into the lookup arrays.
+        """
+        self._load(flatten_ranges(self.ranges))
+
+    def _load(self, segments: Iterable[Tuple[int, int, str]]) -> None:
+        key_ids: Dict[str, int] = {}
+        self.lows = array("Q")
+        self.highs = array("Q")
+        self.key_ids = array("I")
+        self.keys = []
+
+        for low, high, key in segments:
+            if key not in key_ids:
+                key_ids[key] = len(self.keys)
+                self.keys.append(key)
+            self.lows.append(low)
+            self.highs.append(high)
+            self.key_ids.append(key_ids[key])
+
+        self.built = True
+
+    def segments(self) -> List[Tuple[int, int, str]]:
+        """
+        Get the flattened segments of the index.
+
+        Returns:
+            List[Tuple[int, int, str]]: The segments as (low, high, key), sorted by low bound.
+        """
+        if not self.built:
+            self.build()
+        return [
+            (low, high, self.keys[key_id])
+            for low, high, key_id in zip(self.lows, self.highs, self.key_ids)
+        ]
+
+    def search(self, point: int) -> Optional[Tuple[int, int, str]]:
+        if not self.built:
+            self.build()
+
+        position = bisect.bisect_right(self.lows, point) - 1
+        if position < 0 or self.highs[position] < point:
+            return None
+
+        return (
+            self.lows[position],
+            self.highs[position],
+            self.keys[self.key_ids[position]],
+        )
+
+    def search_many(self, points: Iterable[int]) -> List[Optional[str]]:
+        if np is None:
+            return super().search_many(points)
+
+        if not self.built:
+            self.build()
+        if not self.lows:
+            return [None for _ in points]
+
+        positions = search_sorted(
+            np.frombuffer(self.lows, dtype=np.uint64),
+            np.frombuffer(self.highs, dtype=np.uint64),
+            points,
+        )
+        keys, key_ids = self.keys, self.key_ids
+        return [
+            keys[key_ids[position]] if position >= 0 else None for position in positions
+        ]
+
+    def serialize(self) -> bytes:
+        buffer = io.BytesIO()
+        self.write(buffer)
+        return buffer.getvalue()
+
+    def write(self, file: BinaryIO) -> None:
+        """
+        Write the index in the binary format straight from the lookup arrays, streaming
+        the range table in chunks.
+
+        Args:
+            file (BinaryIO): The destination file.
+        """
+        if not self.built:
+            self.build()
+        write_table(file, self.lows, self.highs, self.key_ids, self.keys)
+
+    @property
+    def digits(self) -> int:
+        """
+        Number of digits of the range bounds (e.g., 18 for Redsys padded ranges).
+        """
+        if not self.built:
+            self.build()
+        return len(str(max(self.highs))) if self.highs else 0
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+    @classmethod
+    def from_binary(cls, file_path: str) -> "SortedArrayIndex":
+        """
+        Load the segments of a binary index file into memory.
+
+        Args:
+            file_path (str): The path of the binary index file.
+
+        Returns:
+            SortedArrayIndex: The loaded index.
+        """
+        index = cls()
+        with BinaryIndex(file_path) as binary_index:
+            index.ranges = list(binary_index.ranges())
+        index._load(index.ranges)
+        return index
@@ -0,0 +1,95 @@
+"""
+ASYNC INGESTION
+---------------
+Pipeline that overlaps parsing with storage writes: the records are produced in a worker
+thread and pushed in batches to a bounded queue consumed by concurrent writer tasks.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.metrics import PipelineMetrics
+from bin_lookup_indexer.storage.async_storage_base import AsyncStorageBase
+
+
+async def ingest(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    storage: AsyncStorageBase,
+    writers: int = 4,
+    batch_size: int = 1000,
+    queue_size: Optional[int] = None,
+    metrics: Optional[PipelineMetrics] = None,
+) -> int:
+    """
+    Store every record using concurrent writer tasks.
+
+    The records iterable (typically wrapping the parser generator) is consumed in a
+    worker thread, so parsing keeps going while the writers wait for the network.
+
+    Args:
+        records (Iterable[Tuple[str, Dict[str, Any]]]): Pairs of (key, parsed_data).
+        storage (AsyncStorageBase): The asyncio storage backend.
+        writers (int): Number of concurrent writer tasks.
+        batch_size (int): Number of records sent by a writer in a single batch.
+        queue_size (int, optional): Maximum number of pending batches. Defaults to twice
+            the number of writers, which bounds the memory used by the pipeline.
+        metrics (PipelineMetrics, optional): The metrics of the run, recording the
+            latency of every batch.
+
+    Returns:
+        int: The number of records written.
+
+    Raises:
+        RuntimeError: If any record could not be written.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or writers * 2)
+
+    def produce():
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+                batch = []
+        if batch:
+            asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+
+    async def write() -> Tuple[int, int]:
+        written = failed = 0
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return written, failed
+
+            started_at = time.perf_counter()
+            try:
+                batch_failed = await storage.store_many(batch)
+            except Exception as e:
+                # Keep consuming, otherwise the producer would block on a full queue
+                logger.error("Failed to write batch", records=len(batch), error=str(e))
+                batch_failed = len(batch)
+
+            if metrics is not None:
+                metrics.observe(
+                    "batch_flush", time.perf_counter() - started_at, len(batch)
+                )
+            written += len(batch) - batch_failed
+            failed += batch_failed
+
+    tasks = [asyncio.create_task(write()) for _ in range(writers)]
+    try:
+        await asyncio.to_thread(produce)
+    finally:
+        for _ in tasks:
+            await queue.put(None)
+        results = await asyncio.gather(*tasks)
+
+    written = sum(written for written, _ in results)
+    failed = sum(failed for _, failed in results)
+    if failed:
+        raise RuntimeError(f"Failed to write {failed} records to the storage")
+
+    return written
@@ -0,0 +1,236 @@
+"""
+STORAGE KEYS
+------------
+Strategies to assign the storage key of every parsed record. The key is what the index
+stores for each range, so it links the index with the record in the storage backend.
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Tuple, Type, Union
+
+import orjson
+from ksuid import Ksuid
+
+from bin_lookup_indexer.manifest import Manifest
+
+# Fields that identify the range rather than describing the card
+RANGE_FIELDS = ("LowAccountRange", "HighAccountRange")
+
+# Separates the hash bucket from the field of the records stored in hash buckets
+BUCKET_SEPARATOR = "#"
+
+
+def split_key(key: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a storage key into the key of the backend and the field of its hash bucket.
+
+    Args:
+        key (str): The storage key (e.g., 'bin:redsys:gen1:12#2n9c5X').
+
+    Returns:
+        Tuple[str, Optional[str]]: The bucket and the field, or the key and None for
+        records stored under their own key.
+    """
+    bucket, separator, field = key.partition(BUCKET_SEPARATOR)
+    return (bucket, field) if separator else (key, None)
+
+
+def payload_of(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the payload of a record, i.e., the record without its range bounds.
+
+    Args:
+        record (Dict[str, Any]): The parsed record.
+
+    Returns:
+        Dict[str, Any]: The record data shared by every range with the same attributes.
+    """
+    return {k: v for k, v in record.items() if k not in RANGE_FIELDS}
+
+
+def payload_hash(record: Dict[str, Any]) -> str:
+    """
+    Hash the canonical orjson serialization of the record payload.
+
+    Args:
+        record (Dict[str, Any]): The parsed record.
+
+    Returns:
+        str: A hex digest that is equal for every record with the same payload.
+    """
+    canonical = orjson.dumps(payload_of(record), option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+class PrefixedKeys(ABC):
+    """
+    Build the keys of the new records of a generation, as keys of their own or, with a
+    bucket size, as fields of hash buckets filled in order: `<prefix>:<bucket>#<id>`.
+    """
+
+    def __init__(self, prefix: str, bucket_size: int = 0):
+        """
+        Args:
+            prefix (str): The prefix of every key (e.g., the generation prefix).
+            bucket_size (int): The number of records of every hash bucket, 0 to store
+                every record under its own key.
+        """
+        self.prefix = prefix
+        self.bucket_size = bucket_size
+        self.created = 0
+
+    def new_key(self, record_id: str) -> str:
+        """
+        Build the key of a new record.
+
+        Args:
+            record_id (str): The identifier of the record within the generation.
+
+        Returns:
+            str: The storage key.
+        """
+        if not self.bucket_size:
+            return f"{self.prefix}:{record_id}"
+
+        bucket = self.created // self.bucket_size
+        self.created += 1
+        return f"{self.prefix}:{bucket}{BUCKET_SEPARATOR}{record_id}"
+
+    @abstractmethod
+    def assign(
+        self, record: Dict[str, Any], digest: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Assign the storage key of a record.
+
+        Args:
+            record (Dict[str, Any]): The parsed record.
+            digest (str): The payload hash of the record.
+
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]]]: The key and the data to store under it, or
+            None if the data has already been stored.
+        """
+        pass
+
+
+class KsuidKeys(PrefixedKeys):
+    """
+    Assign a new KSUID to every record, storing each range as its own value.
+    """
+
+    def assign(
+        self, record: Dict[str, Any], digest: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Assign the storage key of a record.
+
+        Args:
+            record (Dict[str, Any]): The parsed record.
+            digest (str): The payload hash of the record.
+
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]]]: The key and the data to store under it, or
+            None if the data has already been stored.
+        """
+        return self.new_key(str(Ksuid())), record
+
+
+class ContentKeys(PrefixedKeys):
+    """
+    Assign content-addressed keys, so every range of a generation with the same payload
+    points to a single stored value. Keys start with the generation prefix, so a new run
+    produces new keys, unless incremental runs reuse the previous ones.
+    """
+
+    def __init__(self, prefix: str, bucket_size: int = 0):
+        """
+        Args:
+            prefix (str): The prefix of every key (e.g., the generation prefix).
+            bucket_size (int): The number of records of every hash bucket, 0 to store
+                every record under its own key.
+        """
+        super().__init__(prefix, bucket_size)
+        self.stored: Dict[str, str] = {}
+
+    def assign(
+        self, record: Dict[str, Any], digest: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Assign the storage key of a record.
+
+        Args:
+            record (Dict[str, Any]): The parsed record.
+            digest (str): The payload hash of the record.
+
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]]]: The key and the payload to store under
+            it, or None if the payload has already been stored.
+        """
+        key = self.stored.get(digest)
+        if key is not None:
+            return key, None
+
+        key = self.stored[digest] = self.new_key(digest)
+        return key, payload_of(record)
+
+
+class IncrementalKeys:
+    """
+    Reuse the keys of the previous run for the ranges that did not change, delegating
+    the new and updated ranges to the wrapped key strategy.
+    """
+
+    def __init__(self, keys: PrefixedKeys, previous: Manifest):
+        """
+        Args:
+            keys (PrefixedKeys): The key strategy used for new and updated ranges.
+            previous (Manifest): The manifest of the previous run.
+        """
+        self.keys = keys
+        self.by_range = {
+            (low, high, digest): key for low, high, key, digest in previous.ranges
+        }
+        # Content-addressed keys can be shared by any range with the same payload
+        self.by_digest = (
+            {digest: key for _, _, key, digest in previous.ranges}
+            if isinstance(keys, ContentKeys)
+            else {}
+        )
+        self.unchanged = 0
+        self.changed = 0
+
+    def assign(
+        self, record: Dict[str, Any], digest: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Assign the storage key of a record.
+
+        Args:
+            record (Dict[str, Any]): The parsed record.
+            digest (str): The payload hash of the record.
+
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]]]: The key and the data to store under it, or
+            None if the data is already stored.
+        """
+        key = self.by_range.get(
+            (record["LowAccountRange"], record["HighAccountRange"], digest)
+        ) or self.by_digest.get(digest)
+
+        if key:
+            self.unchanged += 1
+            return key, None
+
+        self.changed += 1
+        return self.keys.assign(record, digest)
+
+
+# Any key strategy, possibly reusing the keys of the previous run
+KeyStrategy = Union[PrefixedKeys, IncrementalKeys]
+
+key_strategies: Dict[str, Type[PrefixedKeys]] = {
+    "ksuid": KsuidKeys,
+    "content": ContentKeys,
+}
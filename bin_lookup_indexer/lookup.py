@@ -0,0 +1,454 @@
+"""
+BIN LOOKUP
+----------
+Resolve card numbers to their BIN records using the index generated by the indexer and
+the storage backend holding the records.
+"""
+
+import os
+import time
+from typing import Dict, Any, List, Optional, Sequence
+
+from bin_lookup_indexer import publish
+from bin_lookup_indexer.cache import LRUCache, MISSING
+from bin_lookup_indexer.encoding import decode, tables_key
+from bin_lookup_indexer.indexes.index_factory import IndexFactory, LoadedIndex
+from bin_lookup_indexer.indexes.prefix_table import PrefixTable
+from bin_lookup_indexer.storage.async_storage_base import AsyncStorageBase
+from bin_lookup_indexer.storage.storage_base import StorageBase
+
+
+def normalize_pan(pan: str, digits: int) -> int:
+    """
+    Normalize a PAN or PAN prefix to the width of the range bounds.
+
+    Args:
+        pan (str): The card number or prefix. Spaces and dashes are ignored.
+        digits (int): The width of the range bounds.
+
+    Returns:
+        int: The point to search in the index.
+
+    Raises:
+        ValueError: If the PAN is empty or contains other characters than digits.
+    """
+    numbers = pan.replace(" ", "").replace("-", "")
+    if not numbers.isdigit():
+        raise ValueError(f"Invalid PAN: {pan!r}")
+
+    return int(numbers[:digits].ljust(digits, "0"))
+
+
+class BinLookup:
+    """
+    Lookup client that loads an index file once and resolves PANs, or PAN prefixes, to
+    their records in the storage backend.
+
+    Range bounds are fixed-width numbers (e.g., Redsys pads them to 18 digits), so every
+    PAN is normalized to that width before searching the index: longer numbers are
+    truncated and shorter prefixes are padded with zeros.
+    """
+
+    def __init__(
+        self,
+        index_file_path: str,
+        storage: Optional[StorageBase],
+        digits: Optional[int] = None,
+        cache: Optional[LRUCache] = None,
+        prefix_cache: Optional[LRUCache] = None,
+        prefix_digits: int = 6,
+        refresh_interval: Optional[float] = None,
+        dictionary: bool = False,
+        block_cache: Optional[LRUCache] = None,
+        prefix_table: bool = True,
+    ):
+        """
+        Args:
+            index_file_path (str): The path of the active index file (e.g., 'redsys.index').
+            storage (StorageBase, optional): The storage backend holding the records. None
+                for clients that only resolve keys, like the client wrapped by
+                AsyncBinLookup.
+            digits (int, optional): The width of the range bounds. Inferred from the index
+                by default.
+            cache (LRUCache, optional): Cache of records by storage key.
+            prefix_cache (LRUCache, optional): Cache of storage keys by BIN prefix. Only the
+                prefixes entirely covered by a single range are cached.
+            prefix_digits (int): The length of the BIN prefixes of the prefix cache.
+            refresh_interval (float, optional): Seconds between checks of the active
+                generation. When it changes, the index is reloaded and the caches are
+                cleared. Only checked on `refresh` calls by default.
+            dictionary (bool): Decode dictionary-encoded records. The tables of every
+                generation are fetched with its first records and kept until the index is
+                reloaded.
+            block_cache (LRUCache, optional): Cache of the blocks read from paged indexes,
+                by default the last `CACHED_BLOCKS` blocks of `paged_index`.
+            prefix_table (bool): Resolve PANs through the prefix table written next to the
+                index (`--prefix-table`), if it was published with the active generation.
+        """
+        self.index_file_path = index_file_path
+        self.storage = storage
+        self.fixed_digits = digits
+        self.cache = cache
+        self.prefix_cache = prefix_cache
+        self.prefix_digits = prefix_digits
+        self.block_cache = block_cache
+        self.use_prefix_table = prefix_table
+        self.refresh_interval = refresh_interval
+        self.dictionary = dictionary
+        self.tables: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.index: LoadedIndex = self._load_index()
+        self.prefix_table: Optional[PrefixTable] = self._load_prefix_table()
+        self._clear()
+
+    def load(self) -> None:
+        """
+        Load, or reload, the active index file and clear the caches.
+        """
+        previous = self.index, self.prefix_table
+        self.index = self._load_index()
+        self.prefix_table = self._load_prefix_table()
+        self._clear()
+
+        for loaded in previous:
+            if loaded is not None and hasattr(loaded, "close"):
+                loaded.close()
+
+    def _load_index(self) -> LoadedIndex:
+        """
+        Open the active index file, recording its generation and the width of its range
+        bounds.
+
+        Returns:
+            LoadedIndex: The index.
+        """
+        self.generation = publish.read_active_generation(self.index_file_path)
+        if self.block_cache is not None:
+            self.block_cache.clear()
+        index = IndexFactory.load_index(self.index_file_path, self.block_cache)
+        self.digits = self.fixed_digits or index.digits
+        self.prefix_span = 10 ** max(self.digits - self.prefix_digits, 0)
+        return index
+
+    def _clear(self) -> None:
+        """
+        Clear the caches and the tables of the previous index.
+        """
+        self.checked_at = time.monotonic()
+        if self.cache is not None:
+            self.cache.clear()
+        if self.prefix_cache is not None:
+            self.prefix_cache.clear()
+        self.tables.clear()
+
+    def _load_prefix_table(self) -> Optional[PrefixTable]:
+        """
+        Open the prefix table published with the active index, if any.
+
+        Returns:
+            Optional[PrefixTable]: The prefix table, or None if it is disabled, missing,
+            from another generation or for ranges of another width.
+        """
+        table_path = publish.prefix_table_path(self.index_file_path)
+        if (
+            not self.use_prefix_table
+            or self.generation is None
+            or publish.read_active_generation(table_path) != self.generation
+            or not os.path.exists(table_path)
+        ):
+            return None
+
+        table = PrefixTable(table_path)
+        if table.digits != self.digits:
+            table.close()
+            return None
+        return table
+
+    def refresh(self) -> bool:
+        """
+        Reload the index if a new generation has been published.
+
+        Returns:
+            bool: True if the index has been reloaded.
+        """
+        self.checked_at = time.monotonic()
+        if publish.read_active_generation(self.index_file_path) == self.generation:
+            return False
+
+        self.load()
+        return True
+
+    def normalize(self, pan: str) -> int:
+        """
+        Normalize a PAN or PAN prefix to the width of the index range bounds.
+
+        Args:
+            pan (str): The card number or prefix. Spaces and dashes are ignored.
+
+        Returns:
+            int: The point to search in the index.
+
+        Raises:
+            ValueError: If the PAN is empty or contains other characters than digits.
+        """
+        return normalize_pan(pan, self.digits)
+
+    def _storage(self) -> StorageBase:
+        if self.storage is None:
+            raise ValueError("Records can not be fetched without a storage backend")
+        return self.storage
+
+    def _check_generation(self) -> None:
+        if (
+            self.refresh_interval is not None
+            and time.monotonic() - self.checked_at >= self.refresh_interval
+        ):
+            self.refresh()
+
+    def resolve(self, pan: str) -> Optional[str]:
+        """
+        Resolve the storage key of the record of a PAN.
+
+        Args:
+            pan (str): The card number or prefix.
+
+        Returns:
+            Optional[str]: The storage key, or None if no range contains the PAN.
+        """
+        point = self.normalize(pan)
+
+        if self.prefix_table is not None:
+            return self.prefix_table.resolve(point)
+
+        if self.prefix_cache is None:
+            found = self.index.search(point)
+            return found[2] if found else None
+
+        prefix = point // self.prefix_span
+        key: Optional[str] = self.prefix_cache.get(prefix)
+        if key is not MISSING:
+            return key
+
+        found = self.index.search(point)
+        if not found:
+            return None
+
+        # Cache the prefix only when every card number in it resolves to the same range
+        low = prefix * self.prefix_span
+        if (
+            self.index.disjoint
+            and found[0] <= low
+            and found[1] >= low + self.prefix_span - 1
+        ):
+            self.prefix_cache.set(prefix, found[2])
+
+        return found[2]
+
+    def lookup(self, pan: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the record of a PAN.
+
+        Args:
+            pan (str): The card number or prefix.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if no range contains the PAN.
+        """
+        self._check_generation()
+
+        key = self.resolve(pan)
+        if key is None:
+            return None
+
+        record: Optional[Dict[str, Any]]
+        if self.cache is not None:
+            record = self.cache.get(key)
+            if record is not MISSING:
+                return record
+
+        missing_tables = self._missing_tables([key])
+        if missing_tables:
+            fetched = self._storage().fetch_many([key] + missing_tables)
+            self.tables.update(zip(missing_tables, fetched[1:]))
+            record = self._decode(key, fetched[0])
+        else:
+            record = self._decode(key, self._storage().fetch_parsed_data(key))
+
+        if self.cache is not None and record is not None:
+            self.cache.set(key, record)
+
+        return record
+
+    def lookup_many(self, pans: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Look up the records of several PANs, fetching every distinct record that is not
+        cached at once.
+
+        Args:
+            pans (Sequence[str]): The card numbers or prefixes.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The record of every PAN, in the same order, or
+            None if no range contains it.
+        """
+        self._check_generation()
+
+        index = self.prefix_table if self.prefix_table is not None else self.index
+        keys = index.search_many([self.normalize(pan) for pan in pans])
+        records, missing = self._cached_records(keys)
+        if missing:
+            missing_tables = self._missing_tables(missing)
+            self._add_records(
+                records,
+                missing,
+                self._storage().fetch_many(missing + missing_tables),
+                missing_tables,
+            )
+
+        return [records[key] if key is not None else None for key in keys]
+
+    def _cached_records(self, keys: List[Optional[str]]) -> tuple:
+        """
+        Split the distinct keys of a batch between cached records and keys to fetch.
+        """
+        records = {}
+        missing = []
+        for key in dict.fromkeys(key for key in keys if key is not None):
+            record = self.cache.get(key) if self.cache is not None else MISSING
+            if record is MISSING:
+                missing.append(key)
+            else:
+                records[key] = record
+
+        return records, missing
+
+    def _missing_tables(self, keys: List[str]) -> List[str]:
+        """
+        Get the keys of the tables needed to decode records that have not been fetched yet.
+        """
+        if not self.dictionary:
+            return []
+
+        return list(
+            dict.fromkeys(
+                key
+                for key in (tables_key(record_key) for record_key in keys)
+                if key not in self.tables
+            )
+        )
+
+    def _decode(
+        self, key: str, record: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Decode a record with the tables of its generation. Generations without tables
+        are stored as plain records.
+        """
+        if not self.dictionary:
+            return record
+
+        return decode(record, self.tables.get(tables_key(key)))
+
+    def _add_records(
+        self,
+        records: Dict[str, Any],
+        keys: List[str],
+        fetched: List[Optional[Dict[str, Any]]],
+        tables_keys: Sequence[str] = (),
+    ) -> None:
+        """
+        Add the fetched records, followed by the fetched tables, to the batch results and
+        to the cache.
+        """
+        self.tables.update(zip(tables_keys, fetched[len(keys) :]))
+        for key, record in zip(keys, fetched):
+            record = self._decode(key, record)
+            records[key] = record
+            if self.cache is not None and record is not None:
+                self.cache.set(key, record)
+
+
+class AsyncBinLookup:
+    """
+    Lookup client for asyncio services, fetching the records through an asyncio storage
+    backend (e.g., AsyncRedisStorage) without blocking the event loop. Index searches
+    and caching are delegated to a BinLookup without storage, so they work exactly as
+    in BinLookup.
+    """
+
+    def __init__(self, index_file_path: str, storage: AsyncStorageBase, **kwargs: Any):
+        """
+        Args:
+            index_file_path (str): The path of the active index file (e.g., 'redsys.index').
+            storage (AsyncStorageBase): The asyncio storage backend holding the records.
+            **kwargs: The options of BinLookup (digits, cache, prefix_cache, ...).
+        """
+        self.storage = storage
+        self.client = BinLookup(index_file_path, None, **kwargs)
+
+    @property
+    def generation(self) -> Optional[str]:
+        """
+        The generation of the loaded index.
+        """
+        return self.client.generation
+
+    def refresh(self) -> bool:
+        """
+        Reload the index if a new generation has been published.
+
+        Returns:
+            bool: True if the index has been reloaded.
+        """
+        return self.client.refresh()
+
+    def resolve(self, pan: str) -> Optional[str]:
+        """
+        Resolve the storage key of the record of a PAN.
+
+        Args:
+            pan (str): The card number or prefix.
+
+        Returns:
+            Optional[str]: The storage key, or None if no range contains the PAN.
+        """
+        return self.client.resolve(pan)
+
+    async def lookup(self, pan: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the record of a PAN.
+
+        Args:
+            pan (str): The card number or prefix.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if no range contains the PAN.
+        """
+        return (await self.lookup_many([pan]))[0]
+
+    async def lookup_many(self, pans: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Look up the records of several PANs, fetching every distinct record that is not
+        cached at once.
+
+        Args:
+            pans (Sequence[str]): The card numbers or prefixes.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The record of every PAN, in the same order, or
+            None if no range contains it.
+        """
+        client = self.client
+        client._check_generation()
+
+        keys = [client.resolve(pan) for pan in pans]
+        records, missing = client._cached_records(keys)
+        if missing:
+            missing_tables = client._missing_tables(missing)
+            client._add_records(
+                records,
+                missing,
+                await self.storage.fetch_many(missing + missing_tables),
+                missing_tables,
+            )
+
+        return [records[key] if key is not None else None for key in keys]
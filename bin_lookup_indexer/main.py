@@ -1,15 +1,44 @@
 import argparse
+import asyncio
 import os
-from typing import Dict, Any
-
-import orjson
-from avl_range_tree.avl_tree import RangeTree
-from ksuid import Ksuid
+import time
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
 
+from bin_lookup_indexer import publish
+from bin_lookup_indexer.artifact import ArtifactWriter
 from bin_lookup_indexer.config import Config
+from bin_lookup_indexer.encoding import (
+    DictionaryEncoder,
+    tables_key,
+    tables_key_for_prefix,
+)
+from bin_lookup_indexer.indexes.compression import compressions
+from bin_lookup_indexer.indexes.index_base import IndexBase
+from bin_lookup_indexer.indexes.index_factory import IndexFactory
+from bin_lookup_indexer.indexes.prefix_table import (
+    PREFIX_DIGITS,
+    SPLIT_DIGITS,
+    write_ranges_prefix_table,
+)
+from bin_lookup_indexer.ingest import ingest
+from bin_lookup_indexer.keys import (
+    key_strategies,
+    payload_hash,
+    IncrementalKeys,
+    KeyStrategy,
+)
+from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.manifest import Manifest, manifest_path
+from bin_lookup_indexer.metrics import PipelineMetrics
+from bin_lookup_indexer.parsers import enrichment
+from bin_lookup_indexer.parsers.filters import RecordFilter
 from bin_lookup_indexer.parsers.parser_factory import ParserFactory
+from bin_lookup_indexer.storage.codecs import CodecFactory, ValueCodec
 from bin_lookup_indexer.storage.storage_factory import StorageFactory
 
+# Number of records whose stage times are charged to the metrics at once
+METRICS_BATCH_SIZE = 10000
+
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Process BIN Account Range Tables.")
@@ -35,9 +64,9 @@ def parse_arguments():
         "-s",
         "--storage",
         type=str,
-        choices=["redis"],
+        choices=["redis", "sqlite"],
         default="redis",
-        help="The storage type to use (e.g., 'Redis', 'DynamoDB').",
+        help="The storage type to use (e.g., 'Redis', 'SQLite', 'DynamoDB').",
     )
 
     parser.add_argument(
@@ -48,47 +77,468 @@ def parse_arguments():
         help="The output file path to the index tree, either local or an S3 URL.",
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--index-format",
+        type=str,
+        choices=["json", "binary", "paged"],
+        default="json",
+        help="The index file format: the serialized AVL range tree, a flat binary table that can be memory-mapped, "
+        "or the binary table split in blocks by BIN that lookups read on demand.",
+    )
+
+    parser.add_argument(
+        "--index-compression",
+        type=str,
+        choices=compressions,
+        default="none",
+        help="Compress the index file as it is written. Only JSON indexes can be compressed, since binary "
+        "and paged indexes are read in place.",
+    )
+
+    parser.add_argument(
+        "--prefix-table",
+        type=int,
+        choices=[PREFIX_DIGITS, SPLIT_DIGITS],
+        default=None,
+        help="Also write a direct-address table of the 6-digit BINs next to the index (<index>.prefixes), "
+        "resolving the BINs covered by a single range with one array access. With 8, the BINs split across "
+        "ranges get a table of their 8-digit prefixes too.",
+    )
+
+    parser.add_argument(
+        "--artifact",
+        type=str,
+        default=None,
+        help="Also write a self-contained lookup artifact to this path, holding the ranges and the records "
+        "in a single file that can be memory-mapped and queried without the storage backend.",
+    )
+
+    parser.add_argument(
+        "-k",
+        "--key-mode",
+        type=str,
+        choices=list(key_strategies),
+        default="ksuid",
+        help="How storage keys are assigned: a KSUID per range or a hash of the payload, "
+        "storing ranges with the same data only once.",
+    )
+
+    parser.add_argument(
+        "--layout",
+        type=str,
+        choices=["keys", "hash"],
+        default="keys",
+        help="How records are laid out in Redis: a key per record, or fields of hash buckets of "
+        "REDIS_HASH_BUCKET_SIZE records, which Redis stores compactly.",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Diff against the manifest of the previous run and only write the ranges that changed.",
+    )
+
+    parser.add_argument(
+        "--payload-encoding",
+        type=str,
+        choices=["plain", "dictionary"],
+        default="plain",
+        help="How records are stored: as plain dictionaries or with codes for the fields taken from the "
+        "format tables, whose values are stored once per generation.",
+    )
+
+    parser.add_argument(
+        "-w",
+        "--writers",
+        type=int,
+        default=0,
+        help="Number of concurrent asyncio writers, with the redis storage only. Parsing then runs in a worker thread, overlapping with the writes. By default records are written synchronously in batches.",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--processes",
+        type=int,
+        default=0,
+        help="Number of processes used to parse the BIN file. By default it is parsed sequentially.",
+    )
+
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="COLUMN=VALUES",
+        help="Drop the records with one of these comma-separated raw values in a column of the format "
+        "(e.g. 'Brand=06,08'), before they are parsed. Can be repeated.",
+    )
+
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="COLUMN=VALUES",
+        help="Keep only the records with one of these comma-separated raw values in a column of the format, "
+        "dropping the rest before they are parsed. Can be repeated.",
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=None,
+        help="Write the metrics of every stage of the run to this Prometheus textfile (e.g., for the "
+        "node_exporter textfile collector). They are always logged at the end of the run.",
+    )
+
+    args = parser.parse_args()
+    if args.index_format != "json" and args.index_compression != "none":
+        parser.error(
+            f"{args.index_format} indexes are read in place and can not be compressed"
+        )
+    if args.writers and args.storage != "redis":
+        parser.error(
+            f"concurrent writers require the redis storage, {args.storage} is written synchronously"
+        )
+
+    return args
+
+
+def index_records(
+    records: Iterable[Dict[str, Any]],
+    keys: KeyStrategy,
+    index: IndexBase,
+    manifest: Manifest,
+    encoder: Optional[DictionaryEncoder] = None,
+    metrics: Optional[PipelineMetrics] = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Assign the storage key of every parsed record and add its range to the index and
+    the manifest, timing the key assignment, index insert and encoding stages.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): The parsed records.
+        keys (KeyStrategy): The key strategy.
+        index (IndexBase): The index being built.
+        manifest (Manifest): The manifest of the run.
+        encoder (DictionaryEncoder, optional): The encoder of dictionary-encoded payloads.
+        metrics (PipelineMetrics, optional): The metrics of the run.
+
+    Yields:
+        Tuple[str, Dict[str, Any]]: The (key, data) pairs that have to be stored.
+    """
+    metrics = metrics or PipelineMetrics()
+    # Stage times are summed locally and charged once per batch of records
+    keys_time = index_time = encode_time = 0.0
+    indexed = encoded = 0
+
+    def charge() -> None:
+        nonlocal keys_time, index_time, encode_time, indexed, encoded
+        if indexed:
+            metrics.add_time("keys", keys_time, records=indexed)
+            metrics.add_time("index", index_time, records=indexed)
+        if encoded:
+            metrics.add_time("encode", encode_time, records=encoded)
+        keys_time = index_time = encode_time = 0.0
+        indexed = encoded = 0
+
+    try:
+        for record in records:
+            # Assign the storage key, None data means it is already stored
+            started_at = time.perf_counter()
+            digest = payload_hash(record)
+            key, data = keys.assign(record, digest)
+
+            # Build the index
+            assigned_at = time.perf_counter()
+            index.insert(record["LowAccountRange"], record["HighAccountRange"], key)
+            manifest.add(
+                record["LowAccountRange"], record["HighAccountRange"], key, digest
+            )
+            indexed_at = time.perf_counter()
+            keys_time += assigned_at - started_at
+            index_time += indexed_at - assigned_at
+            indexed += 1
+
+            # store the data
+            if data is not None and encoder:
+                data = encoder.encode(data)
+                encode_time += time.perf_counter() - indexed_at
+                encoded += 1
+            if indexed >= METRICS_BATCH_SIZE:
+                charge()
+            if data is not None:
+                yield key, data
+    finally:
+        charge()
+
+
+async def ingest_records(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    storage_type: str,
+    config: Config,
+    writers: int,
+    codec: ValueCodec,
+    metrics: PipelineMetrics,
+) -> int:
+    """
+    Store the records with the asyncio storage backend and concurrent writers.
+    """
+    storage = StorageFactory.create_async_storage(storage_type, config, codec)
+    try:
+        return await ingest(
+            records,
+            storage,
+            writers=writers,
+            batch_size=config.get_redis_batch_config()["batch_size"],
+            metrics=metrics,
+        )
+    finally:
+        await storage.close()
 
 
 def main():
     # Parse command-line arguments
     args = parse_arguments()
+    metrics = PipelineMetrics({"format": args.format})
 
     # Load configuration
     config = Config()
+    publish_config = config.get_publish_config()
+
+    # Load the country and currency tables from the cache file, if there is one
+    enrichment_cache = config.get_enrichment_config()["cache_path"]
+    if enrichment_cache:
+        enrichment.load_tables(enrichment_cache)
 
     # Create the appropriate parser
     parser = ParserFactory.create_parser(args.format)
+    for expression in args.exclude:
+        parser.add_filter(RecordFilter.from_expression(expression))
+    for expression in args.include:
+        parser.add_filter(RecordFilter.from_expression(expression, exclude=False))
+
+    # Determine the correct index file path
+    index_file_path = args.index
+    if os.path.isdir(index_file_path):
+        index_file_path = os.path.join(index_file_path, parser.index_name)
+
+    # Every run is written under its own generation, which is only activated once
+    # both the records and the index are complete
+    namespace = publish.namespace_for(publish_config["key_prefix"], parser.index_name)
+    generation = publish.new_generation()
+    prefix = publish.generation_prefix(namespace, generation)
+    bucket_size = (
+        config.get_redis_layout_config()["bucket_size"] if args.layout == "hash" else 0
+    )
+    new_keys = key_strategies[args.key_mode](prefix, bucket_size)
+    keys: KeyStrategy = new_keys
+
+    # In incremental mode, the ranges that did not change keep the previous keys
+    manifest_file_path = manifest_path(index_file_path)
+    previous_manifest = Manifest.load(manifest_file_path)
+    codec_config = config.get_codec_config()
+    if args.incremental:
+        # Reused keys keep their stored values, so they must be encoded the same way
+        if previous_manifest and previous_manifest.reusable_by(
+            args.key_mode,
+            codec_config["name"],
+            (
+                parser.dictionary_fields
+                if args.payload_encoding == "dictionary"
+                else None
+            ),
+        ):
+            keys = IncrementalKeys(new_keys, previous_manifest)
+        else:
+            logger.warning(
+                "No compatible manifest found, running a full index",
+                manifest=manifest_file_path,
+            )
+    current_manifest = Manifest(generation, args.key_mode)
+
+    # Incremental runs keep the compression dictionary of the previous run, so the reused
+    # values can be decoded with the codec of the manifest. Full runs rewrite every value,
+    # so they train a new one
+    previous_codec = (
+        previous_manifest.encoding.get("codec")
+        if isinstance(keys, IncrementalKeys) and previous_manifest
+        else None
+    )
+    if previous_codec:
+        codec = CodecFactory.from_manifest(previous_codec, **codec_config["options"])
+    else:
+        codec = CodecFactory.create_codec(
+            codec_config["name"], **codec_config["options"]
+        )
+
     # Create the appropriate storage strategy
-    storage = StorageFactory.create_storage(args.storage, config)
+    storage = StorageFactory.create_storage(args.storage, config, codec)
+    storage.metrics = metrics
+
+    # Dictionary-encoded payloads extend the tables of the previous run, so unchanged
+    # values keep their codes
+    encoder = None
+    if args.payload_encoding == "dictionary":
+        previous_encoding = (
+            previous_manifest.encoding.get("dictionary", {})
+            if previous_manifest
+            else {}
+        )
+        encoder = DictionaryEncoder(
+            parser.dictionary_fields,
+            (
+                previous_encoding.get("tables")
+                if previous_encoding.get("fields") == parser.dictionary_fields
+                else None
+            ),
+        )
 
     # Create index
-    index = RangeTree()
+    index = IndexFactory.create_index(args.index_format)
 
-    # Process the BIN file line by line
-    for record in parser.parse(args.file_path):
-        key = str(Ksuid())  # Generate a unique KSUID for the storage key
+    # Process the BIN file line by line, building the index while the records are stored.
+    # Every stage is timed as the records are pulled through it
+    if args.processes:
+        parsed = parser.parse_parallel(args.file_path, args.processes)
+    else:
+        parsed = parser.parse(args.file_path)
+    if os.path.isfile(args.file_path):
+        metrics.count("parse", bytes=os.path.getsize(args.file_path))
+    records = metrics.track(
+        "codec",
+        codec.prepare(
+            index_records(
+                metrics.track("parse", parsed),
+                keys,
+                index,
+                current_manifest,
+                encoder,
+                metrics,
+            )
+        ),
+    )
+    artifact = ArtifactWriter(codec) if args.artifact else None
+    if artifact:
+        records = metrics.track("artifact", artifact.collect(records))
+    with metrics.stage("write"):
+        if args.writers:
+            written = asyncio.run(
+                ingest_records(
+                    records, args.storage, config, args.writers, codec, metrics
+                )
+            )
+        else:
+            written = storage.store_many(records)
+    metrics.count("write", records=written)
 
-        # Build the index tree
-        index.insert(record["LowAccountRange"], record["HighAccountRange"], key)
+    # The tables are stored once the records are encoded, if any record of this
+    # generation uses them
+    referenced_tables = {tables_key(key) for key in current_manifest.keys()}
+    current_manifest.encoding["codec"] = codec.describe()
+    if encoder:
+        current_manifest.encoding["dictionary"] = encoder.manifest_entry()
+        if tables_key_for_prefix(prefix) in referenced_tables:
+            with metrics.stage("write"):
+                storage.store_parsed_data(tables_key_for_prefix(prefix), encoder.tables)
 
-        # store the data
-        storage.store_parsed_data(key, record)
+    # store index, streamed to the generation file as it is serialized
+    generation_path = publish.generation_index_path(index_file_path, generation)
+    with metrics.stage("serialize"):
+        with publish.open_atomic(generation_path, args.index_compression) as file:
+            index.write(file)
+    metrics.count("serialize", bytes=os.path.getsize(generation_path))
 
-    # store index
-    def json_serializer(data: Dict[str, Any]) -> str:
-        return orjson.dumps(data).decode("utf-8")
+    prefix_table_path = publish.prefix_table_path(index_file_path)
+    if args.prefix_table:
+        generation_path = publish.generation_index_path(prefix_table_path, generation)
+        with metrics.stage("prefix_table"):
+            with publish.open_atomic(generation_path) as file:
+                write_ranges_prefix_table(
+                    file,
+                    ((low, high, key) for low, high, key, _ in current_manifest.ranges),
+                    PREFIX_DIGITS,
+                    SPLIT_DIGITS if args.prefix_table == SPLIT_DIGITS else None,
+                )
+        metrics.count("prefix_table", bytes=os.path.getsize(generation_path))
 
-    json_index = index.serialize(json_serializer)
+    # The artifact also holds the records kept from previous generations
+    if artifact:
+        with metrics.stage("artifact"):
+            missing = artifact.missing(current_manifest.keys())
+            for key, data in zip(missing, storage.fetch_many(missing)):
+                if data is not None:
+                    artifact.add(key, data)
+            with publish.open_atomic(args.artifact) as file:
+                artifact.write(
+                    file,
+                    ((low, high, key) for low, high, key, _ in current_manifest.ranges),
+                    {
+                        "namespace": namespace,
+                        "generation": generation,
+                        **current_manifest.encoding,
+                    },
+                )
+        logger.info(
+            "Lookup artifact written", path=args.artifact, records=len(artifact.values)
+        )
 
-    # Determine the correct index file path
-    index_file_path = args.index
-    if os.path.isdir(index_file_path):
-        index_file_path = os.path.join(index_file_path, parser.index_name)
+    # Flip the aliases and retire the previous generation
+    with metrics.stage("publish"):
+        current_manifest.save(manifest_file_path)
+        previous = storage.activate_generation(namespace, generation)
+        # The prefix table is flipped first, readers only use it with the index of the
+        # same generation
+        previous_table = (
+            publish.activate_index(prefix_table_path, generation)
+            if args.prefix_table
+            else None
+        )
+        previous_index = publish.activate_index(index_file_path, generation)
+
+    logger.info(
+        "Generation activated",
+        namespace=namespace,
+        generation=generation,
+        written=written,
+        unchanged=getattr(keys, "unchanged", 0),
+    )
+
+    # Release the records of the previous run that are no longer referenced. In
+    # incremental mode the previous generation still holds referenced records, otherwise
+    # it is dropped whole
+    dropped = (
+        previous
+        if previous and previous != generation and not isinstance(keys, IncrementalKeys)
+        else None
+    )
+    with metrics.stage("release"):
+        if previous_manifest:
+            previous_keys = previous_manifest.keys()
+            stale_keys = previous_keys - current_manifest.keys()
+            # And the tables of the generations no longer referenced by any record
+            stale_tables = {
+                tables_key(key) for key in previous_keys
+            } - referenced_tables
+            released = stale_keys | stale_tables
+            if dropped:
+                # Released with the whole generation below
+                dropped_prefix = f"{publish.generation_prefix(namespace, dropped)}:"
+                released = {
+                    key for key in released if not key.startswith(dropped_prefix)
+                }
+            storage.delete_many(released, publish_config["grace_period"])
+            logger.info("Stale records released", keys=len(stale_keys))
+
+        if dropped:
+            storage.drop_generation(namespace, dropped, publish_config["grace_period"])
+        if previous_index and previous_index != generation:
+            publish.remove_generation_index(index_file_path, previous_index)
+        if previous_table and previous_table != generation:
+            publish.remove_generation_index(prefix_table_path, previous_table)
 
-    with open(index_file_path, "w") as file:
-        file.write(json_index)
+    metrics.finish()
+    metrics.log()
+    if args.metrics_file:
+        metrics.write_prometheus(args.metrics_file)
 
 
 if __name__ == "__main__":
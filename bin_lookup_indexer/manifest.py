@@ -0,0 +1,141 @@
+"""
+RUN MANIFEST
+------------
+The manifest records, for every range of a published generation, its bounds, storage key
+and payload hash. The next run can diff against it to only write the ranges that changed
+and to release the keys that are no longer referenced.
+"""
+
+from typing import Any, Dict, List, Optional, Set
+
+import orjson
+
+from bin_lookup_indexer.publish import write_atomic
+
+
+def manifest_path(index_file_path: str) -> str:
+    """
+    Get the path of the manifest written next to the index.
+
+    Args:
+        index_file_path (str): The path of the active index file.
+
+    Returns:
+        str: The path of the manifest file.
+    """
+    return f"{index_file_path}.manifest"
+
+
+class Manifest:
+    """
+    Ranges of a generation as [LowAccountRange, HighAccountRange, key, payload hash].
+    """
+
+    def __init__(
+        self,
+        generation: str,
+        key_mode: str,
+        ranges: Optional[List[list]] = None,
+        encoding: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            generation (str): The generation described by the manifest.
+            key_mode (str): The key strategy used to assign the keys (e.g., 'ksuid').
+            ranges (List[list], optional): The ranges of the generation.
+            encoding (Dict[str, Any], optional): How the payloads are encoded (e.g., the
+                fields and tables of dictionary-encoded payloads).
+        """
+        self.generation = generation
+        self.key_mode = key_mode
+        self.ranges = ranges if ranges is not None else []
+        self.encoding = encoding if encoding is not None else {}
+
+    def add(self, low: int, high: int, key: str, digest: str):
+        """
+        Add a range to the manifest.
+
+        Args:
+            low (int): The low bound of the range.
+            high (int): The high bound of the range.
+            key (str): The storage key of the range record.
+            digest (str): The payload hash of the range record.
+        """
+        self.ranges.append([low, high, key, digest])
+
+    def reusable_by(
+        self, key_mode: str, codec_name: str, dictionary_fields: Optional[List[str]]
+    ) -> bool:
+        """
+        Check whether an incremental run can reuse the keys of the generation, i.e.,
+        whether their stored values are keyed and encoded like the records of the run.
+
+        Args:
+            key_mode (str): The key strategy of the run.
+            codec_name (str): The value codec of the run.
+            dictionary_fields (List[str], optional): The dictionary-encoded fields of the
+                run, or None if its payloads are not dictionary-encoded.
+
+        Returns:
+            bool: True if the keys can be reused.
+        """
+        codec = self.encoding.get("codec")
+        dictionary = self.encoding.get("dictionary")
+        return (
+            self.key_mode == key_mode
+            # Manifests written before the codec was recorded were stored as json
+            and (codec["name"] if codec else "json") == codec_name
+            and (dictionary["fields"] if dictionary else None) == dictionary_fields
+        )
+
+    def keys(self) -> Set[str]:
+        """
+        Get every storage key referenced by the generation.
+
+        Returns:
+            Set[str]: The referenced keys.
+        """
+        return {key for _, _, key, _ in self.ranges}
+
+    def save(self, file_path: str):
+        """
+        Write the manifest atomically.
+
+        Args:
+            file_path (str): The path of the manifest file.
+        """
+        write_atomic(
+            file_path,
+            orjson.dumps(
+                {
+                    "generation": self.generation,
+                    "key_mode": self.key_mode,
+                    "ranges": self.ranges,
+                    "encoding": self.encoding,
+                }
+            ),
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional["Manifest"]:
+        """
+        Load a manifest written by a previous run.
+
+        Args:
+            file_path (str): The path of the manifest file.
+
+        Returns:
+            Optional[Manifest]: The manifest, or None if there is no previous run.
+        """
+        try:
+            with open(file_path, "rb") as file:
+                data = orjson.loads(file.read())
+        except FileNotFoundError:
+            return None
+
+        return cls(
+            data["generation"],
+            data["key_mode"],
+            data["ranges"],
+            data.get("encoding", {}),
+        )
@@ -0,0 +1,360 @@
+"""
+PIPELINE METRICS
+----------------
+Timings and counters of every stage of a run (parsing, key assignment, index inserts,
+storage writes...), logged at the end of the run and optionally written to a Prometheus
+textfile, e.g., for the node_exporter textfile collector.
+
+Stages are nested generators pulling records from each other, so every stage is only
+charged the time spent in its own code: the time spent in the stages it pulls from is
+subtracted.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, TypeVar
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, the memory high-water mark is skipped
+    resource = None  # type: ignore[assignment]
+
+from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.publish import write_atomic
+
+T = TypeVar("T")
+
+PROMETHEUS_PREFIX = "bin_indexer"
+
+
+class StageMetrics:
+    """
+    Time spent in a stage and the records and bytes it handled.
+    """
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.records = 0
+        self.bytes = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 6),
+            "records": self.records,
+            "bytes": self.bytes,
+            "records_per_second": (
+                round(self.records / self.seconds, 1)
+                if self.seconds and self.records
+                else None
+            ),
+        }
+
+
+class LatencyMetrics:
+    """
+    Count, total and maximum of the latencies of an operation (e.g., batch flushes).
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.records = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float, records: int = 0) -> None:
+        self.count += 1
+        self.records += records
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "records": self.records,
+            "seconds": round(self.seconds, 6),
+            "mean_seconds": (
+                round(self.seconds / self.count, 6) if self.count else None
+            ),
+            "max_seconds": round(self.max_seconds, 6),
+        }
+
+
+def memory_high_water_mark() -> Optional[int]:
+    """
+    Get the peak resident memory of the process.
+
+    Returns:
+        Optional[int]: The peak resident set size in bytes, or None if it is unknown.
+    """
+    if resource is None:
+        return None
+
+    # Reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PipelineMetrics:
+    """
+    Collect the metrics of the stages of a run.
+    """
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None) -> None:
+        """
+        Args:
+            labels (Dict[str, str], optional): Labels of the exported metrics (e.g., the
+                format of the file).
+        """
+        self.labels = labels or {}
+        self.stages: Dict[str, StageMetrics] = {}
+        self.latencies: Dict[str, LatencyMetrics] = {}
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        # Stack of the stages being timed, as [name, start, time spent in nested stages]
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def stage_metrics(self, name: str) -> StageMetrics:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageMetrics()
+        return stage
+
+    def _frames(self) -> list:
+        frames = getattr(self.local, "frames", None)
+        if frames is None:
+            frames = self.local.frames = []
+        return frames
+
+    def _enter(self, name: str) -> None:
+        self._frames().append([name, time.perf_counter(), 0.0])
+
+    def _exit(self) -> None:
+        name, start, nested = self._frames().pop()
+        self.add_time(name, time.perf_counter() - start, nested)
+
+    def add_time(
+        self, name: str, seconds: float, nested: float = 0.0, records: int = 0
+    ) -> None:
+        """
+        Charge time to a stage, and subtract it from the stage it runs in.
+
+        Args:
+            name (str): The stage.
+            seconds (float): The elapsed time.
+            nested (float): The part of the elapsed time spent in nested stages.
+            records (int): The number of records handled in that time.
+        """
+        with self.lock:
+            stage = self.stage_metrics(name)
+            stage.seconds += seconds - nested
+            stage.records += records
+        frames = self._frames()
+        if frames:
+            frames[-1][2] += seconds
+
+    def count(self, name: str, records: int = 0, bytes: int = 0) -> None:
+        """
+        Count the records or bytes handled by a stage (e.g., the bytes read by the parser).
+
+        Args:
+            name (str): The stage.
+            records (int): The number of records.
+            bytes (int): The number of bytes.
+        """
+        with self.lock:
+            stage = self.stage_metrics(name)
+            stage.records += records
+            stage.bytes += bytes
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a block of code as a stage.
+
+        Args:
+            name (str): The stage.
+        """
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def track(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Time the production of the items of an iterable as a stage, counting them as
+        records.
+
+        Args:
+            name (str): The stage.
+            iterable (Iterable[T]): The items, usually records.
+
+        Yields:
+            T: The same items.
+        """
+        iterator = iter(iterable)
+        stage = self.stage_metrics(name)
+        while True:
+            self._enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            stage.records += 1
+            yield item
+
+    def observe(self, name: str, seconds: float, records: int = 0) -> None:
+        """
+        Record the latency of an operation.
+
+        Args:
+            name (str): The operation (e.g., 'batch_flush').
+            seconds (float): The latency.
+            records (int): The number of records handled by the operation.
+        """
+        with self.lock:
+            latency = self.latencies.get(name)
+            if latency is None:
+                latency = self.latencies[name] = LatencyMetrics()
+            latency.observe(seconds, records)
+
+    def finish(self) -> None:
+        """
+        Mark the end of the run.
+        """
+        self.finished_at = time.perf_counter()
+
+    @property
+    def run_seconds(self) -> float:
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the metrics of the run.
+
+        Returns:
+            Dict[str, Any]: The run time, memory high-water mark, stages and latencies.
+        """
+        return {
+            "run_seconds": round(self.run_seconds, 6),
+            "memory_max_bytes": memory_high_water_mark(),
+            "stages": {name: stage.summary() for name, stage in self.stages.items()},
+            "latencies": {
+                name: latency.summary() for name, latency in self.latencies.items()
+            },
+        }
+
+    def log(self) -> None:
+        """
+        Log every stage and the summary of the run.
+        """
+        summary = self.summary()
+        for name, stage in summary["stages"].items():
+            logger.info("Stage metrics", stage=name, **self.labels, **stage)
+        for name, latency in summary["latencies"].items():
+            logger.info("Latency metrics", operation=name, **self.labels, **latency)
+        logger.info(
+            "Run metrics",
+            **self.labels,
+            run_seconds=summary["run_seconds"],
+            memory_max_bytes=summary["memory_max_bytes"],
+        )
+
+    def _labels(self, **labels) -> str:
+        labels = {**self.labels, **labels}
+        if not labels:
+            return ""
+
+        def escape(value: str) -> str:
+            return (
+                str(value)
+                .replace("\\", "\\\\")
+                .replace("\n", "\\n")
+                .replace('"', '\\"')
+            )
+
+        return (
+            "{"
+            + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+            + "}"
+        )
+
+    def prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = []
+
+        def metric(name: str, kind: str, description: str, samples: list):
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(
+                    f"{PROMETHEUS_PREFIX}_{name}{suffix}{self._labels(**labels)} {value}"
+                )
+
+        metric(
+            "run_seconds",
+            "gauge",
+            "Duration of the run.",
+            [("", {}, self.run_seconds)],
+        )
+        metric(
+            "last_run_timestamp_seconds",
+            "gauge",
+            "Time the run finished.",
+            [("", {}, time.time())],
+        )
+        memory = memory_high_water_mark()
+        if memory is not None:
+            metric(
+                "memory_max_bytes",
+                "gauge",
+                "Peak resident memory of the run.",
+                [("", {}, memory)],
+            )
+        for name, attribute, description in [
+            ("stage_seconds", "seconds", "Time spent in every stage of the run."),
+            ("stage_records", "records", "Records handled by every stage of the run."),
+            ("stage_bytes", "bytes", "Bytes handled by every stage of the run."),
+        ]:
+            metric(
+                name,
+                "gauge",
+                description,
+                [
+                    ("", {"stage": stage}, getattr(metrics, attribute))
+                    for stage, metrics in self.stages.items()
+                ],
+            )
+        for name, latency in self.latencies.items():
+            metric(
+                f"{name}_seconds",
+                "summary",
+                f"Latency of every {name.replace('_', ' ')} of the run.",
+                [("_count", {}, latency.count), ("_sum", {}, latency.seconds)],
+            )
+            metric(
+                f"{name}_max_seconds",
+                "gauge",
+                f"Slowest {name.replace('_', ' ')} of the run.",
+                [("", {}, latency.max_seconds)],
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path: str) -> None:
+        """
+        Write the metrics to a Prometheus textfile atomically, so the collector never
+        reads a partial file.
+
+        Args:
+            file_path (str): The path of the textfile (e.g., '/var/lib/node_exporter/bin.prom').
+        """
+        write_atomic(file_path, self.prometheus())
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Iterator, Dict, Any
+from typing import Iterator, Dict, Any, List, Optional
+
+from bin_lookup_indexer.parsers.filters import RecordFilter
 
 
 class BaseParser(ABC):
@@ -10,6 +12,12 @@ class BaseParser(ABC):
     and implement the parse_line method for line-by-line processing.
     """
 
+    # Filters evaluated on the raw columns of every record, before it is parsed
+    record_filters: List[RecordFilter] = []
+
+    # Fields stored as codes when the payloads are dictionary-encoded
+    dictionary_fields: List[str] = []
+
     @abstractmethod
     def parse(self, file_path: str) -> Iterator[Dict[str, Any]]:
         """
@@ -22,3 +30,29 @@ class BaseParser(ABC):
             dict: A dictionary with keys 'StartRange' and 'EndRange' for each BIN range.
         """
         pass
+
+    def parse_parallel(
+        self, file_path: str, processes: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parse the BIN file with several processes, yielding the records in file order.
+
+        Parsers that cannot split their files fall back to the sequential parse.
+
+        Args:
+            file_path (str): The path to the BIN file.
+            processes (Optional[int]): The number of worker processes, by default one per CPU.
+
+        Yields:
+            dict: The parsed data of each BIN record.
+        """
+        yield from self.parse(file_path)
+
+    def add_filter(self, record_filter: RecordFilter):
+        """
+        Add a filter on the raw columns of the records, after the filters of the version.
+
+        Args:
+            record_filter (RecordFilter): The filter.
+        """
+        self.record_filters = [*self.record_filters, record_filter]
@@ -0,0 +1,295 @@
+"""
+PARSER COMPILER
+---------------
+Turns the column specifications, translation rules and excluded fields of a format
+version into a single specialized function, so the rules are interpreted once when
+the parser is built instead of once per record.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+TranslationRules = Sequence[Tuple[str, Any]]
+
+
+def _translation_source(
+    translation_rules: TranslationRules, namespace: Dict[str, Any]
+) -> List[str]:
+    """
+    Generate the statements applying the translation rules to the `row` dictionary.
+
+    Dictionaries are bound as `table_<n>` and callables as `rule_<n>` in the namespace
+    of the generated function.
+    """
+    lines = []
+    for position, (column_name, translation) in enumerate(translation_rules):
+        if callable(translation):
+            namespace[f"rule_{position}"] = translation
+            lines.append(f"    row[{column_name!r}] = rule_{position}(row)")
+        else:
+            namespace[f"table_{position}"] = translation.get
+            lines.append(f"    value = row[{column_name!r}]")
+            lines.append(f"    row[{column_name!r}] = table_{position}(value, value)")
+    return lines
+
+
+def _exclusion_source(excluded_fields: Iterable[str]) -> List[str]:
+    """
+    Generate the statements removing the excluded fields from the `row` dictionary.
+    """
+    return [f"    row.pop({column_name!r}, None)" for column_name in excluded_fields]
+
+
+def _build(name: str, lines: List[str], namespace: Dict[str, Any]) -> Callable:
+    source = "\n".join(lines) + "\n    return row\n"
+    exec(compile(source, f"<compiled {name}>", "exec"), namespace)
+    function = namespace[name]
+    function.source = source
+    built: Callable = function
+    return built
+
+
+def compile_translation(
+    translation_rules: TranslationRules,
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile translation rules into a function translating a record in place.
+
+    Args:
+        translation_rules (TranslationRules): The (column, dictionary or callable) rules, in order.
+
+    Returns:
+        Callable[[Dict[str, Any]], Dict[str, Any]]: A function applying the rules to a record and returning it.
+    """
+    namespace: Dict[str, Any] = {}
+    lines = ["def translate(row):"] + _translation_source(translation_rules, namespace)
+    return _build("translate", lines, namespace)
+
+
+def compile_fixed_width(
+    colspecs: Sequence[Tuple[int, int, str]],
+    translation_rules: TranslationRules,
+    excluded_fields: Iterable[str],
+) -> Callable[[str], Dict[str, Any]]:
+    """
+    Compile a fixed-width layout into a function building a record from a line.
+
+    Args:
+        colspecs (Sequence[Tuple[int, int, str]]): The (start, end, column) specifications.
+        translation_rules (TranslationRules): The (column, dictionary or callable) rules, in order.
+        excluded_fields (Iterable[str]): The columns removed from the record.
+
+    Returns:
+        Callable[[str], Dict[str, Any]]: A function parsing, translating and filtering a line.
+    """
+    namespace: Dict[str, Any] = {}
+    lines = ["def build_row(line):", "    row = {"]
+    lines += [
+        f"        {column_name!r}: line[{start}:{end}].strip(),"
+        for start, end, column_name in colspecs
+    ]
+    lines.append("    }")
+    lines += _translation_source(translation_rules, namespace)
+    lines += _exclusion_source(excluded_fields)
+    return _build("build_row", lines, namespace)
+
+
+def compile_fixed_width_bytes(
+    colspecs: Sequence[Tuple[int, int, str]],
+    translation_rules: TranslationRules,
+    excluded_fields: Iterable[str],
+    encoding: str = "cp1252",
+) -> Callable[[bytes], Dict[str, Any]]:
+    """
+    Compile a fixed-width layout into a function building a record from a raw line.
+
+    Only the columns that are emitted are sliced and decoded, and the rules of the
+    excluded columns are skipped, so the remaining rules can only read emitted columns.
+    ASCII fields take the fast ASCII decoder.
+
+    Args:
+        colspecs (Sequence[Tuple[int, int, str]]): The (start, end, column) specifications.
+        translation_rules (TranslationRules): The (column, dictionary or callable) rules, in order.
+        excluded_fields (Iterable[str]): The columns that are neither decoded nor emitted.
+        encoding (str): The encoding of the file.
+
+    Returns:
+        Callable[[bytes], Dict[str, Any]]: A function parsing, translating and filtering an encoded line.
+    """
+    excluded_fields = set(excluded_fields)
+    namespace: Dict[str, Any] = {}
+    lines = ["def build_row(line):", "    row = {"]
+    lines += [
+        f"        {column_name!r}: (value.decode('ascii') if (value := line[{start}:{end}]).isascii()"
+        f" else value.decode({encoding!r})).strip(),"
+        for start, end, column_name in colspecs
+        if column_name not in excluded_fields
+    ]
+    lines.append("    }")
+    lines += _translation_source(
+        [rule for rule in translation_rules if rule[0] not in excluded_fields],
+        namespace,
+    )
+    return _build("build_row", lines, namespace)
+
+
+def compile_mapping(
+    column_mappings: Dict[str, str],
+    translation_rules: TranslationRules,
+    excluded_fields: Iterable[str],
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile a column mapping into a function building a record from a CSV row.
+
+    Args:
+        column_mappings (Dict[str, str]): The CSV columns and the fields they are renamed to.
+        translation_rules (TranslationRules): The (column, dictionary or callable) rules, in order.
+        excluded_fields (Iterable[str]): The columns removed from the record.
+
+    Returns:
+        Callable[[Dict[str, Any]], Dict[str, Any]]: A function renaming, translating and filtering a CSV row.
+    """
+    namespace: Dict[str, Any] = {}
+    lines = ["def build_row(data):", "    row = {"]
+    lines += [
+        f"        {new_field!r}: data[{original_field!r}],"
+        for original_field, new_field in column_mappings.items()
+    ]
+    lines.append("    }")
+    lines += _translation_source(translation_rules, namespace)
+    lines += _exclusion_source(excluded_fields)
+    return _build("build_row", lines, namespace)
+
+
+def _filter_source(
+    record_filters: Iterable[Any],
+    read_column: Callable[[str], str],
+    encoding: Optional[str],
+    namespace: Dict[str, Any],
+) -> List[str]:
+    """
+    Generate the statements returning the name of the first filter dropping a record.
+    """
+    lines = []
+    for position, record_filter in enumerate(record_filters):
+        values = record_filter.values
+        if encoding:
+            values = frozenset(value.encode(encoding) for value in values)
+        namespace[f"values_{position}"] = values
+
+        operator = "in" if record_filter.exclude else "not in"
+        lines.append(
+            f"    if {read_column(record_filter.column)} {operator} values_{position}:"
+        )
+        lines.append(f"        return {record_filter.name!r}")
+    return lines
+
+
+def _build_filter(lines: List[str], namespace: Dict[str, Any]) -> Callable:
+    source = "\n".join(lines) + "\n    return None\n"
+    exec(compile(source, "<compiled record_filter>", "exec"), namespace)
+    function = namespace["record_filter"]
+    function.source = source
+    built: Callable = function
+    return built
+
+
+def compile_fixed_width_filter(
+    colspecs: Sequence[Tuple[int, int, str]],
+    record_filters: Iterable[Any],
+    encoding: Optional[str] = None,
+) -> Callable[[Union[str, bytes]], Optional[str]]:
+    """
+    Compile record filters into a predicate on the raw columns of a fixed-width line.
+
+    Args:
+        colspecs (Sequence[Tuple[int, int, str]]): The (start, end, column) specifications.
+        record_filters (Iterable[RecordFilter]): The filters, evaluated in order.
+        encoding (Optional[str]): The encoding of the lines, when they are not decoded.
+
+    Returns:
+        Callable[[Union[str, bytes]], Optional[str]]: A function returning the name of the
+            filter dropping a line, or None when it is kept.
+
+    Raises:
+        ValueError: If a filter uses a column that is not in the colspecs.
+    """
+    positions = {column_name: (start, end) for start, end, column_name in colspecs}
+
+    def read_column(column_name: str) -> str:
+        if column_name not in positions:
+            raise ValueError(f"Unknown column: {column_name}")
+        start, end = positions[column_name]
+        return f"line[{start}:{end}].strip()"
+
+    namespace: Dict[str, Any] = {}
+    lines = ["def record_filter(line):"]
+    lines += _filter_source(record_filters, read_column, encoding, namespace)
+    return _build_filter(lines, namespace)
+
+
+def compile_mapping_filter(
+    column_mappings: Dict[str, str],
+    record_filters: Iterable[Any],
+) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """
+    Compile record filters into a predicate on the raw columns of a CSV row.
+
+    Args:
+        column_mappings (Dict[str, str]): The CSV columns and the fields they are renamed to.
+        record_filters (Iterable[RecordFilter]): The filters on the renamed fields, evaluated in order.
+
+    Returns:
+        Callable[[Dict[str, Any]], Optional[str]]: A function returning the name of the
+            filter dropping a row, or None when it is kept.
+
+    Raises:
+        ValueError: If a filter uses a field that is not in the column mappings.
+    """
+    original_fields = {
+        new_field: original_field
+        for original_field, new_field in column_mappings.items()
+    }
+
+    def read_column(column_name: str) -> str:
+        if column_name not in original_fields:
+            raise ValueError(f"Unknown column: {column_name}")
+        return f"data[{original_fields[column_name]!r}]"
+
+    namespace: Dict[str, Any] = {}
+    lines = ["def record_filter(data):"]
+    lines += _filter_source(record_filters, read_column, None, namespace)
+    return _build_filter(lines, namespace)
+
+
+class Compiled:
+    """
+    A parser attribute holding a function compiled from other attributes of the parser.
+
+    The function is compiled on first access and compiled again whenever one of the
+    attributes it was built from is replaced, so versions can still be patched.
+    """
+
+    def __init__(self, compiler: Callable[..., Callable], *attributes: str):
+        self.compiler = compiler
+        self.attributes = attributes
+
+    def __set_name__(self, owner, name):
+        self.cache_name = f"_compiled_{name}"
+
+    def __get__(self, parser, owner=None):
+        if parser is None:
+            return self
+
+        cached = parser.__dict__.get(self.cache_name)
+        if cached is not None:
+            sources, function = cached
+            for attribute, source in zip(self.attributes, sources):
+                if getattr(parser, attribute) is not source:
+                    break
+            else:
+                return function
+
+        sources = tuple(getattr(parser, attribute) for attribute in self.attributes)
+        function = self.compiler(*sources)
+        parser.__dict__[self.cache_name] = (sources, function)
+        return function
@@ -0,0 +1,158 @@
+"""
+COUNTRY AND CURRENCY ENRICHMENT
+-------------------------------
+Lookup tables expanding ISO 3166 country and ISO 4217 currency codes into the
+{"Code", "Alpha3", "Name"} dictionaries stored with every record.
+
+The tables are built from pycountry once per process, or read from a small cache
+file so pycountry's database does not have to be loaded at all. Every code maps to a
+single shared dictionary, so records with the same country or currency reference the
+same object; these dictionaries must not be modified.
+"""
+
+import os
+from importlib import metadata
+from typing import Any, Dict, Optional
+
+import orjson
+
+from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.publish import write_atomic
+
+# Bumped whenever the layout of the cache file changes
+CACHE_FORMAT = 1
+
+_tables: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None
+
+
+def pycountry_version() -> str:
+    """
+    Return the installed pycountry version, without importing it.
+    """
+    try:
+        return metadata.version("pycountry")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def read_pycountry() -> Dict[str, Any]:
+    """
+    Read the countries and currencies from the pycountry database.
+
+    Returns:
+        Dict[str, Any]: The cache file contents, with the alpha3 code and name of every
+            country and currency by numeric code.
+    """
+    import pycountry
+
+    return {
+        "format": CACHE_FORMAT,
+        "pycountry": pycountry_version(),
+        "countries": {
+            country.numeric: [country.alpha_3, country.name]
+            for country in pycountry.countries
+        },
+        "currencies": {
+            currency.numeric: [currency.alpha_3, currency.name]
+            for currency in pycountry.currencies
+        },
+    }
+
+
+def build_tables(source: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """
+    Build the lookup tables, with one shared dictionary per country and currency.
+
+    Args:
+        source (Dict[str, Any]): The countries and currencies, as returned by read_pycountry.
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, str]]]: The countries by numeric and alpha3 code and
+            the currencies by numeric code.
+    """
+    countries_by_numeric = {
+        numeric: {"Code": numeric, "Alpha3": alpha_3, "Name": name}
+        for numeric, (alpha_3, name) in source["countries"].items()
+    }
+    currencies_by_numeric = {
+        numeric: {"Code": numeric, "Alpha3": alpha_3, "Name": name}
+        for numeric, (alpha_3, name) in source["currencies"].items()
+    }
+
+    return {
+        "countries_by_numeric": countries_by_numeric,
+        "countries_by_alpha3": {
+            country["Alpha3"]: country for country in countries_by_numeric.values()
+        },
+        "currencies_by_numeric": currencies_by_numeric,
+    }
+
+
+def load_tables(
+    cache_path: Optional[str] = None,
+) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """
+    Load the lookup tables for this process.
+
+    When a cache file is given, it is read if it was written by the same pycountry
+    version, and written from pycountry otherwise.
+
+    Args:
+        cache_path (Optional[str]): The path to the cache file.
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, str]]]: The lookup tables.
+    """
+    global _tables
+
+    source = None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as file:
+                source = orjson.loads(file.read())
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(
+                "Failed to read the enrichment cache", path=cache_path, error=str(e)
+            )
+
+        if source and (
+            source.get("format") != CACHE_FORMAT
+            or source.get("pycountry") != pycountry_version()
+        ):
+            source = None
+
+    if source is None:
+        source = read_pycountry()
+        if cache_path:
+            write_atomic(cache_path, orjson.dumps(source))
+
+    _tables = build_tables(source)
+    return _tables
+
+
+def get_tables() -> Dict[str, Dict[str, Dict[str, str]]]:
+    """
+    Return the lookup tables, building them from pycountry on first use.
+    """
+    return _tables if _tables is not None else load_tables()
+
+
+def country_by_numeric(code: str) -> Optional[Dict[str, str]]:
+    """
+    Return the country with the given ISO 3166 numeric code, or None.
+    """
+    return get_tables()["countries_by_numeric"].get(code)
+
+
+def country_by_alpha3(code: str) -> Optional[Dict[str, str]]:
+    """
+    Return the country with the given ISO 3166 alpha3 code, in any case, or None.
+    """
+    return get_tables()["countries_by_alpha3"].get(code.upper())
+
+
+def currency_by_numeric(code: str) -> Optional[Dict[str, str]]:
+    """
+    Return the currency with the given ISO 4217 numeric code, or None.
+    """
+    return get_tables()["currencies_by_numeric"].get(code)
@@ -0,0 +1,63 @@
+from typing import Iterable
+
+
+class RecordFilter:
+    """
+    A predicate on the raw value of a column, evaluated before a record is parsed.
+
+    Records are dropped when their raw value is one of the values of an excluding
+    filter, or is not one of the values of an including filter. Dropped records are
+    counted under the name of the filter.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        column: str,
+        values: Iterable[str],
+        exclude: bool = True,
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            name (str): The name the dropped records are counted under.
+            column (str): The column of the format version, e.g. "Brand".
+            values (Iterable[str]): The raw values of the column, e.g. "08".
+            exclude (bool): Drop the records with these values, or keep only them.
+        """
+        self.name = name
+        self.column = column
+        self.values = frozenset(values)
+        self.exclude = exclude
+
+    @classmethod
+    def from_expression(
+        cls, expression: str, exclude: bool = True, name: str = "filtered"
+    ) -> "RecordFilter":
+        """
+        Create a filter from a `Column=value1,value2` expression.
+
+        Args:
+            expression (str): The column and its comma-separated raw values.
+            exclude (bool): Drop the records with these values, or keep only them.
+            name (str): The name the dropped records are counted under.
+
+        Returns:
+            RecordFilter: The filter.
+
+        Raises:
+            ValueError: If the expression is not in the form 'Column=values'.
+        """
+        column, separator, values = expression.partition("=")
+        if not separator or not column.strip():
+            raise ValueError(
+                f"Filter '{expression}' is invalid. It should be in the form 'Column=value1,value2'."
+            )
+
+        return cls(
+            name,
+            column.strip(),
+            [value.strip() for value in values.split(",")],
+            exclude=exclude,
+        )
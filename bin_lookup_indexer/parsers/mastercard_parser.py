@@ -1,9 +1,15 @@
 import csv
 from typing import Iterator, Dict, Any
 
-import pycountry
-
+from bin_lookup_indexer.parsers import enrichment
 from bin_lookup_indexer.parsers.base_parser import BaseParser
+from bin_lookup_indexer.parsers.compiler import (
+    Compiled,
+    compile_mapping,
+    compile_mapping_filter,
+    compile_translation,
+)
+from bin_lookup_indexer.parsers.filters import RecordFilter
 from bin_lookup_indexer.parsers.versions import mastercard_simplified
 
 
@@ -16,6 +22,12 @@ class MastercardParser(BaseParser):
     data includes the company name, ICA, account ranges, product details, and country information.
     """
 
+    # The rules of the version compiled into the functions parsing every record
+    build_row = Compiled(
+        compile_mapping, "column_mappings", "translation_rules", "excluded_fields"
+    )
+    translate = Compiled(compile_translation, "translation_rules")
+
     def __init__(self, version="simplified"):
         """
         Initialize the MastercardParser with a specific version's configuration.
@@ -28,11 +40,18 @@ class MastercardParser(BaseParser):
             self.column_mappings = mastercard_simplified.column_mappings
             self.translation_rules = mastercard_simplified.translation_rules
             self.excluded_fields = mastercard_simplified.excluded_fields
+            self.record_filters = [
+                RecordFilter(*spec) for spec in mastercard_simplified.record_filters
+            ]
+            self.dictionary_fields = mastercard_simplified.dictionary_fields
             self.index_name = "mastercard.index"
             self.skip_header = True  # Indicate if we have to skip the header
         else:
             raise ValueError(f"Unsupported version: {version}")
 
+        # Compile the version rules once, instead of interpreting them for every record
+        self.build_row
+
     def parse(self, file_path: str) -> Iterator[Dict[str, Any]]:
         """
         Parse a CSV formatted Mastercard BIN file line by line.
@@ -55,21 +74,20 @@ class MastercardParser(BaseParser):
             if self.skip_header:
                 next(reader)
 
+            record_filter = compile_mapping_filter(
+                self.column_mappings, self.record_filters
+            )
+
             # Iterate over each row in the CSV file
             for parsed_data in reader:
 
-                # Normalize field names
-                renamed_data = self.rename_fields(parsed_data)
-
-                # Apply the translation rules in the specified order
-                translated_data = self.apply_translation(renamed_data)
+                # Filtered rows are dropped before they are parsed
+                if record_filter(parsed_data):
+                    continue
 
-                # Filter out the fields that are excluded in this version
-                filtered_data = {
-                    k: v
-                    for k, v in translated_data.items()
-                    if k not in self.excluded_fields
-                }
+                # Normalize field names, apply the translation rules in the specified order
+                # and filter out the fields that are excluded in this version
+                filtered_data = self.build_row(parsed_data)
 
                 # Expand the country information
                 expanded_data = self.expand_country(filtered_data)
@@ -108,17 +126,8 @@ class MastercardParser(BaseParser):
         Returns:
             dict: The translated data.
         """
-        translated_data = parsed_data.copy()
-
-        for column_name, translation in self.translation_rules:
-            if callable(translation):
-                translated_data[column_name] = translation(translated_data)
-            else:
-                translated_data[column_name] = translation.get(
-                    translated_data[column_name], translated_data[column_name]
-                )
-
-        return translated_data
+        translated: dict = self.translate(parsed_data.copy())
+        return translated
 
     def expand_country(self, data: dict) -> dict:
         """
@@ -132,13 +141,9 @@ class MastercardParser(BaseParser):
         """
         country_alpha3 = data.pop("CountryAlpha3", "")
         if country_alpha3:
-            country_info = pycountry.countries.get(alpha_3=country_alpha3)
+            country_info = enrichment.country_by_alpha3(country_alpha3)
             if country_info:
-                data["Country"] = {
-                    "Code": country_info.numeric,
-                    "Alpha3": country_info.alpha_3,
-                    "Name": country_info.name,
-                }
+                data["Country"] = country_info
             else:
                 # If country code is invalid or not found, default to the original Alpha3 code
                 data["Country"] = {
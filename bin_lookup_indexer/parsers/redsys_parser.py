@@ -1,24 +1,57 @@
-from typing import Iterator, Dict, Any
+import mmap
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Deque, Iterator, Iterable, Dict, Any, List, Optional, Tuple
 
 import orjson
-import pycountry
 
 from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.parsers import enrichment
 from bin_lookup_indexer.parsers.base_parser import BaseParser
+from bin_lookup_indexer.parsers.compiler import (
+    Compiled,
+    compile_fixed_width,
+    compile_fixed_width_bytes,
+    compile_fixed_width_filter,
+    compile_translation,
+)
+from bin_lookup_indexer.parsers.filters import RecordFilter
 from bin_lookup_indexer.parsers.versions import redsys_v3_8
 
+# Approximate size of the byte ranges parsed by every worker process in parallel mode
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
 
 class RedsysParser(BaseParser):
-    def __init__(self, version="3.8"):
+    # The rules of the version compiled into the functions parsing every record
+    build_row = Compiled(
+        compile_fixed_width, "colspecs", "translation_rules", "excluded_fields"
+    )
+    build_raw_row = Compiled(
+        compile_fixed_width_bytes, "colspecs", "translation_rules", "excluded_fields"
+    )
+    translate = Compiled(compile_translation, "translation_rules")
+
+    def __init__(self, version: str = "3.8") -> None:
         # Load the specific version's configuration
         if version == "3.8":
             self.colspecs = redsys_v3_8.colspecs
             self.translation_rules = redsys_v3_8.translation_rules
             self.excluded_fields = redsys_v3_8.excluded_fields
+            self.record_filters = [
+                RecordFilter(*spec) for spec in redsys_v3_8.record_filters
+            ]
+            self.dictionary_fields = redsys_v3_8.dictionary_fields
             self.index_name = "redsys.index"
+            self.version = version
         else:
             raise ValueError(f"Unsupported version: {version}")
 
+        # Compile the version rules once, instead of interpreting them for every record
+        self.build_row
+
     def parse_fixed_width_line(self, line: str) -> dict:
         """
         Parse a fixed-width formatted line according to the colspecs.
@@ -29,19 +62,8 @@ class RedsysParser(BaseParser):
         Returns:
             dict: A dictionary containing the parsed data.
         """
-        parsed_data = {}
-
-        # Apply the column specifications to extract data
-        for start, end, column_name in self.colspecs:
-            parsed_data[column_name] = line[start:end].strip()
-
-        # Apply the translation rules in the specified order
-        translated_data = self.apply_translation(parsed_data)
-
-        # Filter out the excluded fields
-        filtered_data = {
-            k: v for k, v in translated_data.items() if k not in self.excluded_fields
-        }
+        # Extract the columns, apply the translation rules and filter out the excluded fields
+        filtered_data = self.build_row(line)
 
         # Group Issuer-related fields into a single dictionary
         issuer_grouped_data = self.group_issuer_fields(filtered_data)
@@ -61,17 +83,8 @@ class RedsysParser(BaseParser):
         Returns:
             dict: The translated data.
         """
-        translated_data = parsed_data.copy()
-
-        for column_name, translation in self.translation_rules:
-            if callable(translation):
-                translated_data[column_name] = translation(translated_data)
-            else:
-                translated_data[column_name] = translation.get(
-                    translated_data[column_name], translated_data[column_name]
-                )
-
-        return translated_data
+        translated: dict = self.translate(parsed_data.copy())
+        return translated
 
     def group_issuer_fields(self, data: dict) -> dict:
         """
@@ -104,24 +117,16 @@ class RedsysParser(BaseParser):
         # Expand currency information
         currency_code = data.get("Currency")
         if currency_code:
-            currency_info = pycountry.currencies.get(numeric=currency_code)
+            currency_info = enrichment.currency_by_numeric(currency_code)
             if currency_info:
-                data["Currency"] = {
-                    "Code": currency_code,
-                    "Alpha3": currency_info.alpha_3,
-                    "Name": currency_info.name,
-                }
+                data["Currency"] = currency_info
 
         # Expand country information
         country_code = data.get("Country")
         if country_code:
-            country_info = pycountry.countries.get(numeric=country_code)
+            country_info = enrichment.country_by_numeric(country_code)
             if country_info:
-                data["Country"] = {
-                    "Code": country_code,
-                    "Alpha3": country_info.alpha_3,
-                    "Name": country_info.name,
-                }
+                data["Country"] = country_info
 
         return data
 
@@ -136,40 +141,282 @@ class RedsysParser(BaseParser):
         Yields:
             dict: A dictionary with keys 'StartRange' and 'EndRange' for each BIN range.
         """
+        totals = self.new_totals()
 
         with open(file_path, "r", encoding="cp1252") as file:
-            records = 0
-            atm_only_records = 0
-            for line in file:
-
-                if line[0:2] == "10":  # Structure code 10 means it's a BIN record
-                    records += 1
-
-                    parsed_data = self.parse_fixed_width_line(line)
-
-                    # For our purposes, we can remove the ATM only to avoid conflicts and reduce the file
-                    # size improving performance in queries
-                    if parsed_data["Usage"] == "ATM":
-                        atm_only_records += 1
-                        continue
-                    else:
-                        del parsed_data["Usage"]
-
-                    yield parsed_data
-                elif (
-                    line[0:2] == "90"
-                ):  # Structure code 90 means it's a totalization record
-                    lines_to_process = int(line[28:38]) - 2
-                    if lines_to_process == records:
-                        logger.info(
-                            "All records have been processed successfully",
-                            processed=records,
-                            atm_only=atm_only_records,
-                            stored=records - atm_only_records,
-                        )
-                    else:
-                        logger.error(
-                            "Some records could not be processed",
-                            records=lines_to_process,
-                            processed=records,
-                        )
+            yield from self.parse_lines(file, totals)
+
+        self.check_totals(totals)
+
+    def parse_mapped(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Parse a Redsys BIN file from a memory map of its bytes.
+
+        Lines are never decoded as a whole: the structure code and the record filters are
+        checked on the raw bytes, so filtered records, like ATM only ones, are skipped
+        before any translation, and only the emitted columns are sliced and decoded.
+
+        Args:
+            file_path (str): The path to the BIN file.
+
+        Yields:
+            dict: The parsed data of each BIN record.
+        """
+        totals = self.new_totals()
+
+        with open(file_path, "rb") as file:
+            if os.fstat(file.fileno()).st_size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    yield from self.parse_buffer(buffer, 0, len(buffer), totals)
+
+        self.check_totals(totals)
+
+    def parse_parallel(
+        self,
+        file_path: str,
+        processes: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parse a Redsys BIN file in a pool of processes.
+
+        The file is split into byte ranges aligned to line boundaries, every range is
+        parsed by a worker process and the records are yielded in file order. Only a
+        few ranges per process are in flight at any time, so memory stays bounded.
+
+        Args:
+            file_path (str): The path to the BIN file.
+            processes (Optional[int]): The number of worker processes, by default one per CPU.
+            chunk_size (int): The approximate size in bytes of every range.
+
+        Yields:
+            dict: The parsed data of each BIN record, in file order.
+        """
+        processes = processes or os.cpu_count() or 1
+        if processes == 1:
+            # A single process does not need a pool
+            yield from self.parse_mapped(file_path)
+            return
+
+        totals = self.new_totals()
+        chunks = chunk_offsets(file_path, chunk_size)
+        window = 2 * processes
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            pending: Deque[Future] = deque()
+
+            for start, end in chunks:
+                pending.append(
+                    executor.submit(
+                        _parse_chunk,
+                        self.version,
+                        self.record_filters,
+                        file_path,
+                        start,
+                        end,
+                    )
+                )
+                if len(pending) >= window:
+                    yield from self._merge_chunk(pending.popleft().result(), totals)
+
+            while pending:
+                yield from self._merge_chunk(pending.popleft().result(), totals)
+
+        self.check_totals(totals)
+
+    @staticmethod
+    def _merge_chunk(chunk: Tuple[List[Dict[str, Any]], Dict[str, Any]], totals: dict):
+        """
+        Add the counters of a parsed chunk to the file totals and return its records.
+        """
+        records, chunk_totals = chunk
+        for name, count in chunk_totals.items():
+            if name == "expected":
+                if count is not None:
+                    totals["expected"] = count
+            else:
+                totals[name] += count
+        return records
+
+    def parse_lines(
+        self, lines: Iterable[str], totals: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parse the BIN records of a sequence of lines, counting them in totals.
+
+        Args:
+            lines (Iterable[str]): The lines of the file, or of a part of it.
+            totals (Dict[str, Any]): The counters of BIN records, records dropped by every
+                filter and the records expected by the totalization record, updated in place.
+
+        Yields:
+            dict: The parsed data of each BIN record.
+        """
+        record_filter = compile_fixed_width_filter(self.colspecs, self.record_filters)
+
+        for line in lines:
+
+            if line[0:2] == "10":  # Structure code 10 means it's a BIN record
+                totals["records"] += 1
+
+                # Filtered records are dropped before they are parsed
+                dropped_by = record_filter(line)
+                if dropped_by:
+                    totals[dropped_by] += 1
+                    continue
+
+                parsed_data = self.parse_fixed_width_line(line)
+                del parsed_data["Usage"]
+
+                yield parsed_data
+            elif (
+                line[0:2] == "90"
+            ):  # Structure code 90 means it's a totalization record
+                totals["expected"] = int(line[28:38]) - 2
+
+    def parse_buffer(
+        self, buffer: Any, start: int, end: int, totals: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parse the BIN records of a byte range of an encoded Redsys file, counting them in
+        totals like parse_lines.
+
+        Args:
+            buffer (Any): The bytes of the file, e.g. a memory map.
+            start (int): The offset of the first line of the range.
+            end (int): The offset of the end of the range, at a line boundary.
+            totals (Dict[str, Any]): The counters updated in place.
+
+        Yields:
+            dict: The parsed data of each BIN record.
+        """
+        build_row = self.build_raw_row
+        record_filter = compile_fixed_width_filter(
+            self.colspecs, self.record_filters, encoding="cp1252"
+        )
+
+        while start < end:
+            line_end = buffer.find(b"\n", start, end)
+            if line_end < 0:
+                line_end = end
+            line = buffer[start:line_end]
+            start = line_end + 1
+
+            structure_code = line[0:2]
+            if structure_code == b"10":  # Structure code 10 means it's a BIN record
+                totals["records"] += 1
+
+                # Filtered records are dropped before they are parsed
+                dropped_by = record_filter(line)
+                if dropped_by:
+                    totals[dropped_by] += 1
+                    continue
+
+                parsed_data = self.expand_currency_and_country(
+                    self.group_issuer_fields(build_row(line))
+                )
+                del parsed_data["Usage"]
+
+                yield parsed_data
+            elif structure_code == b"90":  # Totalization record
+                totals["expected"] = int(line[28:38]) - 2
+
+    def new_totals(self) -> Dict[str, Any]:
+        """
+        Create the counters of a parse: the BIN records, the records dropped by every
+        filter and the records expected by the totalization record.
+        """
+        totals = {"records": 0, "expected": None}
+        for record_filter in self.record_filters:
+            totals[record_filter.name] = 0
+        return totals
+
+    @staticmethod
+    def check_totals(totals: Dict[str, Any]):
+        """
+        Validate the number of processed records against the totalization record.
+
+        Args:
+            totals (Dict[str, Any]): The counters filled by parse_lines.
+        """
+        if totals["expected"] is None:
+            return
+
+        records = totals["records"]
+        dropped = {
+            name: count
+            for name, count in totals.items()
+            if name not in ("records", "expected")
+        }
+        if totals["expected"] == records:
+            logger.info(
+                "All records have been processed successfully",
+                processed=records,
+                **dropped,
+                stored=records - sum(dropped.values()),
+            )
+        else:
+            logger.error(
+                "Some records could not be processed",
+                records=totals["expected"],
+                processed=records,
+            )
+
+
+def chunk_offsets(file_path: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges of about chunk_size bytes that start and end on line
+    boundaries.
+
+    Args:
+        file_path (str): The path to the file.
+        chunk_size (int): The approximate size in bytes of every range.
+
+    Returns:
+        List[Tuple[int, int]]: The (start, end) offsets of every range.
+    """
+    size = os.path.getsize(file_path)
+    offsets = []
+
+    with open(file_path, "rb") as file:
+        start = 0
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            # Move the end of the range to the end of the current line
+            file.readline()
+            end = file.tell()
+            offsets.append((start, end))
+            start = end
+
+    return offsets
+
+
+@lru_cache(maxsize=None)
+def _chunk_parser(version: str) -> RedsysParser:
+    # Every worker process builds its parser once
+    return RedsysParser(version)
+
+
+def _parse_chunk(
+    version: str,
+    record_filters: List[RecordFilter],
+    file_path: str,
+    start: int,
+    end: int,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Parse the lines of a byte range of a Redsys file in a worker process.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Any]]: The parsed records and the counters
+            of the range.
+    """
+    parser = _chunk_parser(version)
+    parser.record_filters = record_filters
+    totals = parser.new_totals()
+
+    with open(file_path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            records = list(parser.parse_buffer(buffer, start, end, totals))
+
+    return records, totals
@@ -4,6 +4,8 @@ MASTERCARD FILE PARSER - VERSION 1.0
 This module defines the column specifications and any necessary rules for the Mastercard format version 1.0.
 """
 
+from typing import List, Tuple
+
 # Define the column mappings from the CSV columns to the desired structure
 column_mappings = {
     "COMPANY_NAME": "IssuerName",
@@ -215,3 +217,10 @@ translation_rules = [
 
 # No fields are excluded from the final output in this version
 excluded_fields = []
+
+# No records are dropped before they are parsed in this version
+record_filters: List[Tuple[str, str, List[str]]] = []
+
+# Fields taking their values from small tables, stored as codes in dictionary-encoded
+# payloads
+dictionary_fields = ["IssuerName", "CardName", "CardDescription", "Brand", "Country"]
@@ -4,6 +4,7 @@
  This module defines the column specifications and
  translation dictionaries for Redsys format version 3.8.
 """
+import operator
 from typing import Dict, Any, Callable
 
 # Define the column specifications for this version
@@ -407,7 +408,15 @@ prepaid = {"0": False, "1": True}
 chip_technology = {"0": False, "1": True}
 
 
-#def create_conditional_translation(translation_dict, key):
+# Conditions supported by the conditional translations, longest prefixes first
+comparisons = [
+    (">=", operator.ge),
+    ("<=", operator.le),
+    (">", operator.gt),
+    ("<", operator.lt),
+]
+
+
 def create_conditional_translation(
     translation_dict: Dict[str, str], key: str
 ) -> Callable[[Dict[str, Any]], str]:
@@ -422,36 +431,41 @@ def create_conditional_translation(
         function: A lambda function that performs the conditional translation.
     """
 
+    # Parse the conditions once, in the order they are declared
+    exact_matches = {}
+    thresholds = []
+    for condition, translation in translation_dict.items():
+        for prefix, compare in comparisons:
+            if condition.startswith(prefix):
+                thresholds.append((compare, int(condition[len(prefix) :]), translation))
+                break
+        else:
+            exact_matches[condition] = translation
+
+    # Values resolved through the conditions are memoized with the exact matches
+    resolved = dict(exact_matches)
+
     def translator(record: dict):
         value = record.get(key, "")
 
         # Exact match first
-        if value in translation_dict:
-            return translation_dict[value]
+        if value in resolved:
+            return resolved[value]
 
         # Check for any conditional rules
-        for condition, translation in translation_dict.items():
-            if condition.startswith(">="):
-                threshold = int(condition[2:])
-                if int(value) >= threshold:
-                    return translation
-            elif condition.startswith("<="):
-                threshold = int(condition[2:])
-                if int(value) <= threshold:
-                    return translation
-            elif condition.startswith(">"):
-                threshold = int(condition[1:])
-                if int(value) > threshold:
-                    return translation
-            elif condition.startswith("<"):
-                threshold = int(condition[1:])
-                if int(value) < threshold:
-                    return translation
+        translated = "Unknown"
+        if thresholds:
+            number = int(value)
+            for compare, threshold, translation in thresholds:
+                if compare(number, threshold):
+                    translated = translation
+                    break
 
         # If no match, return a default or unknown value
-        return "Unknown"
+        resolved[value] = translated
+        return translated
 
-    return lambda parsed_data: translator(parsed_data)
+    return translator
 
 
 # Generate the translation lambdas using the generalized factory
@@ -502,3 +516,27 @@ excluded_fields = [
     "ICAProcessor",
     "BINProcessorPrefix",
 ]
+
+# Records dropped before they are parsed, as (counted as, column, raw values).
+# For our purposes, we can remove the ATM only to avoid conflicts and reduce the file
+# size improving performance in queries
+record_filters = [
+    ("atm_only", "Usage", ["2"]),
+]
+
+# Fields taking their values from small tables, stored as codes in dictionary-encoded
+# payloads
+dictionary_fields = [
+    "Brand",
+    "CardName",
+    "CardDescription",
+    "Country",
+    "Region",
+    "FundingSource",
+    "UsageScope",
+    "Issuer",
+    "Group",
+    "Currency",
+    "CardType",
+    "Contactless",
+]
@@ -0,0 +1,203 @@
+"""
+INDEX PUBLISHING
+----------------
+Helpers to publish every run as an immutable generation. Records are written under a
+generation namespace, the index is written next to the previous ones and the active
+generation is flipped atomically once everything is in place, so readers never see an
+index pointing at half-written data.
+"""
+
+import os
+import shutil
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Union
+
+from ksuid import Ksuid
+
+from bin_lookup_indexer.indexes.compression import compressed_writer
+
+
+def new_generation() -> str:
+    """
+    Generate a new, time-sortable generation identifier.
+
+    Returns:
+        str: The generation identifier.
+    """
+    return str(Ksuid())
+
+
+def namespace_for(key_prefix: str, index_name: str) -> str:
+    """
+    Build the storage namespace of a provider from its index name (e.g., 'bin:redsys').
+
+    Args:
+        key_prefix (str): The global prefix of every key written by the indexer.
+        index_name (str): The default index file name of the parser (e.g., 'redsys.index').
+
+    Returns:
+        str: The namespace shared by every generation of the provider.
+    """
+    return f"{key_prefix}:{os.path.splitext(index_name)[0]}"
+
+
+def generation_prefix(namespace: str, generation: str) -> str:
+    """
+    Build the prefix of every record key written in a generation.
+
+    Args:
+        namespace (str): The provider namespace.
+        generation (str): The generation identifier.
+
+    Returns:
+        str: The key prefix of the generation.
+    """
+    return f"{namespace}:{generation}"
+
+
+def generation_index_path(index_file_path: str, generation: str) -> str:
+    """
+    Get the path of the index file written for a generation.
+
+    Args:
+        index_file_path (str): The path of the active index file (e.g., 'redsys.index').
+        generation (str): The generation identifier.
+
+    Returns:
+        str: The path of the generation index file.
+    """
+    return f"{index_file_path}.{generation}"
+
+
+def alias_path(index_file_path: str) -> str:
+    """
+    Get the path of the alias file holding the active generation.
+
+    Args:
+        index_file_path (str): The path of the active index file.
+
+    Returns:
+        str: The path of the alias file.
+    """
+    return f"{index_file_path}.active"
+
+
+def prefix_table_path(index_file_path: str) -> str:
+    """
+    Get the path of the prefix table written next to the index. It is published as
+    another index file, with its own generation files and alias file.
+
+    Args:
+        index_file_path (str): The path of the active index file.
+
+    Returns:
+        str: The path of the active prefix table.
+    """
+    return f"{index_file_path}.prefixes"
+
+
+@contextmanager
+def open_atomic(
+    file_path: str, compression: Optional[str] = None
+) -> Iterator[BinaryIO]:
+    """
+    Open a file to be written atomically: the content is streamed to a temporary file in
+    the same directory, which is renamed over the destination once the context exits
+    without errors, and removed otherwise.
+
+    Args:
+        file_path (str): The destination path.
+        compression (str, optional): Compress the content as it is written, with 'gzip'
+            or 'zstd'.
+
+    Yields:
+        BinaryIO: The binary file object to write the content to.
+    """
+    tmp_path = f"{file_path}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            with compressed_writer(file, compression) as stream:
+                yield stream
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, file_path)
+
+
+def write_atomic(file_path: str, data: Union[str, bytes]):
+    """
+    Write a file atomically, writing a temporary file in the same directory and
+    renaming it over the destination.
+
+    Args:
+        file_path (str): The destination path.
+        data (Union[str, bytes]): The content of the file, strings are encoded as UTF-8.
+    """
+    with open_atomic(file_path) as file:
+        file.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+
+
+def read_active_generation(index_file_path: str) -> Optional[str]:
+    """
+    Read the active generation from the alias file.
+
+    Args:
+        index_file_path (str): The path of the active index file.
+
+    Returns:
+        Optional[str]: The active generation, or None if nothing has been published yet.
+    """
+    try:
+        with open(alias_path(index_file_path), "r") as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def activate_index(index_file_path: str, generation: str) -> Optional[str]:
+    """
+    Make the generation index the active one.
+
+    The generation file is linked (or copied if hard links are not supported) to a
+    temporary path and renamed over the active index path, and then the alias file is
+    updated, so both are always replaced atomically.
+
+    Args:
+        index_file_path (str): The path of the active index file.
+        generation (str): The generation to activate.
+
+    Returns:
+        Optional[str]: The previously active generation, if any.
+    """
+    previous = read_active_generation(index_file_path)
+
+    tmp_path = f"{index_file_path}.tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(generation_index_path(index_file_path, generation), tmp_path)
+    except OSError:
+        shutil.copyfile(generation_index_path(index_file_path, generation), tmp_path)
+    os.replace(tmp_path, index_file_path)
+
+    write_atomic(alias_path(index_file_path), generation)
+
+    return previous
+
+
+def remove_generation_index(index_file_path: str, generation: str):
+    """
+    Remove the index file of a retired generation. Readers that still have it open
+    keep working until they close it.
+
+    Args:
+        index_file_path (str): The path of the active index file.
+        generation (str): The retired generation.
+    """
+    try:
+        os.remove(generation_index_path(index_file_path, generation))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,119 @@
+import redis.asyncio
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+from redis.exceptions import RedisError
+
+from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.storage.codecs import JsonCodec, ValueCodec
+from bin_lookup_indexer.storage.redis_storage import (
+    as_bytes,
+    collect_reads,
+    group_keys,
+    queue_reads,
+    queue_write,
+)
+from bin_lookup_indexer.storage.async_storage_base import AsyncStorageBase
+
+
+class AsyncRedisStorage(AsyncStorageBase):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int = 0,
+        password: Optional[str] = None,
+        codec: Optional[ValueCodec] = None,
+    ):
+        """
+        Initialize the asyncio Redis storage connection pool.
+
+        Args:
+            host (str): Redis server host.
+            port (int): Redis server port.
+            db (int): Redis database index.
+            password (str, optional): Password for Redis authentication. Defaults to None.
+            codec (ValueCodec, optional): The serialization of the values. Defaults to json.
+        """
+        try:
+            self.client = redis.asyncio.Redis(
+                host=host, port=port, db=db, password=password
+            )
+        except RedisError as e:
+            raise ConnectionError(f"Failed to connect to Redis: {e}")
+
+        self.codec = codec or JsonCodec()
+
+    async def store_many(self, records: Sequence[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Store a batch of records in a single non-transactional pipeline. Failures are
+        logged with the batch details and counted, instead of raising, so concurrent
+        writers can keep going.
+
+        Args:
+            records (Sequence[Tuple[str, Dict[str, Any]]]): Pairs of (key, parsed_data).
+
+        Returns:
+            int: The number of records that could not be written.
+        """
+        if not records:
+            return 0
+
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for key, parsed_data in records:
+                queue_write(pipeline, key, self.codec.encode(parsed_data))
+            results = await pipeline.execute(raise_on_error=False)
+        except RedisError as e:
+            # The whole batch is lost, e.g., the connection dropped during the flush
+            results = [e] * len(records)
+
+        errors = [
+            (key, result)
+            for (key, _), result in zip(records, results)
+            if isinstance(result, Exception)
+        ]
+        if errors:
+            logger.error(
+                "Failed to write batch to Redis",
+                records=len(records),
+                failed=len(errors),
+                first_key=errors[0][0],
+                error=str(errors[0][1]),
+            )
+
+        return len(errors)
+
+    async def fetch_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch several records in a single round-trip with MGET, and an HMGET per hash
+        bucket in the same pipeline.
+
+        Args:
+            keys (List[str]): The unique identifiers of the records.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The records, None for the keys that do not exist.
+        """
+        if not keys:
+            return []
+
+        plain_keys, buckets = group_keys(keys)
+        values: Sequence[Optional[Union[bytes, str]]]
+        try:
+            if not buckets:
+                values = await self.client.mget(keys)
+            else:
+                pipeline = self.client.pipeline(transaction=False)
+                queue_reads(pipeline, plain_keys, buckets)
+                values = collect_reads(
+                    keys, plain_keys, buckets, await pipeline.execute()
+                )
+        except RedisError as e:
+            raise RuntimeError(f"Failed to read data from Redis: {e}")
+
+        return [
+            self.codec.decode(as_bytes(value)) if value is not None else None
+            for value in values
+        ]
+
+    async def close(self) -> None:
+        await self.client.aclose()
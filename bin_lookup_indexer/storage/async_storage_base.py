@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+
+class AsyncStorageBase(ABC):
+    """
+    Abstract base class for asyncio storage strategies.
+
+    All specific asyncio storage strategies (e.g., AsyncRedisStorage) should inherit from
+    this class and implement the required methods. They can be used both by the async
+    ingestion pipeline and by async lookup services.
+    """
+
+    @abstractmethod
+    async def store_many(self, records: Sequence[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Store a batch of parsed records in the storage backend.
+
+        Args:
+            records (Sequence[Tuple[str, Dict[str, Any]]]): Pairs of (key, parsed_data).
+
+        Returns:
+            int: The number of records that could not be written.
+        """
+        pass
+
+    async def store_parsed_data(self, key: str, parsed_data: Dict[str, Any]) -> None:
+        """
+        Store a single parsed record in the storage backend.
+
+        Args:
+            key (str): The unique identifier for the record (e.g., KSUID).
+            parsed_data (Dict[str, Any]): A dictionary representing the columns and their values.
+        """
+        if await self.store_many([(key, parsed_data)]):
+            raise RuntimeError(f"Failed to write record {key}")
+
+    @abstractmethod
+    async def fetch_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch several parsed records, in the order of the given keys.
+
+        Args:
+            keys (List[str]): The unique identifiers of the records.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The records, None for the keys that do not exist.
+        """
+        pass
+
+    async def fetch_parsed_data(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single parsed record from the storage backend.
+
+        Args:
+            key (str): The unique identifier for the record (e.g., KSUID).
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the key does not exist.
+        """
+        return (await self.fetch_many([key]))[0]
+
+    async def close(self) -> None:
+        """
+        Release the connections of the storage backend.
+        """
+        pass
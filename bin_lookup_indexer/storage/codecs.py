@@ -0,0 +1,297 @@
+"""
+VALUE CODECS
+------------
+How the records are serialized into the values of the storage backend. The codec of a
+run is recorded in its manifest, so readers and later runs can decode the values.
+
+* json: orjson bytes, the default.
+* msgpack: MessagePack (pip install msgpack).
+* zstd: orjson bytes compressed with Zstandard (pip install zstandard) and a dictionary
+  trained on the first records of the run. BIN records are very similar to each other,
+  so the shared dictionary holds most of their content and every value only stores
+  what is specific to it.
+"""
+
+import base64
+import itertools
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is optional, only the msgpack codec requires it
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Zstandard is optional, only the zstd codec requires it
+    zstandard = None  # type: ignore[assignment]
+
+from bin_lookup_indexer.logging_config import logger
+
+
+class ValueCodec(ABC):
+    """
+    Abstract base class for the serialization of the stored values.
+    """
+
+    name: Optional[str] = None
+
+    @abstractmethod
+    def encode(self, data: Any) -> bytes:
+        """
+        Serialize a value.
+
+        Args:
+            data (Any): The value, usually a parsed record.
+
+        Returns:
+            bytes: The serialized value.
+        """
+        pass
+
+    @abstractmethod
+    def decode(self, value: bytes) -> Any:
+        """
+        Deserialize a value.
+
+        Args:
+            value (bytes): The serialized value.
+
+        Returns:
+            Any: The value.
+        """
+        pass
+
+    def prepare(
+        self, records: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Prepare the codec with the records to be stored, yielding them unchanged.
+
+        Args:
+            records (Iterable[Tuple[str, Dict[str, Any]]]): The (key, data) pairs.
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: The same pairs.
+        """
+        yield from records
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Describe the codec for the manifest of the run.
+
+        Returns:
+            Dict[str, Any]: The name and the options needed to decode the values.
+        """
+        return {"name": self.name}
+
+
+class JsonCodec(ValueCodec):
+    """
+    Store the values as the bytes written by orjson.
+    """
+
+    name = "json"
+
+    def encode(self, data: Any) -> bytes:
+        return orjson.dumps(data)
+
+    def decode(self, value: bytes) -> Any:
+        return orjson.loads(value)
+
+
+class MsgpackCodec(ValueCodec):
+    """
+    Store the values as MessagePack.
+    """
+
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError(
+                "The msgpack codec requires msgpack (pip install msgpack)"
+            )
+
+    def encode(self, data: Any) -> bytes:
+        packed: bytes = msgpack.packb(data, use_bin_type=True)
+        return packed
+
+    def decode(self, value: bytes) -> Any:
+        return msgpack.unpackb(value, raw=False)
+
+
+class ZstdCodec(ValueCodec):
+    """
+    Store the values as orjson bytes compressed with Zstandard and a shared dictionary.
+
+    Without a dictionary, one is trained on the first records of the run before any of
+    them is encoded. Incremental runs reuse the codec of the previous manifest and keep
+    its dictionary, so the values they reuse can still be decoded.
+    """
+
+    name = "zstd"
+
+    def __init__(
+        self,
+        level: int = 3,
+        dictionary: Optional[bytes] = None,
+        dictionary_size: int = 16384,
+        training_records: int = 5000,
+    ) -> None:
+        """
+        Args:
+            level (int): The compression level.
+            dictionary (bytes, optional): The dictionary of a previous run.
+            dictionary_size (int): The maximum size in bytes of a trained dictionary.
+            training_records (int): The number of records the dictionary is trained on.
+        """
+        if zstandard is None:
+            raise ImportError(
+                "The zstd codec requires zstandard (pip install zstandard)"
+            )
+
+        self.level = level
+        self.dictionary_size = dictionary_size
+        self.training_records = training_records
+        self.use_dictionary(dictionary)
+
+    def use_dictionary(self, dictionary: Optional[bytes]) -> None:
+        """
+        Set the dictionary used to compress and decompress the values.
+
+        Args:
+            dictionary (bytes, optional): The raw dictionary, or None to compress without it.
+        """
+        self.dictionary = dictionary
+        compression_dictionary = (
+            zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        )
+        self.compressor = zstandard.ZstdCompressor(
+            level=self.level, dict_data=compression_dictionary
+        )
+        self.decompressor = zstandard.ZstdDecompressor(dict_data=compression_dictionary)
+
+    def train(self, samples: Iterable[bytes]) -> None:
+        """
+        Train the dictionary on serialized records.
+
+        When there are too few samples to train a dictionary, the values are compressed
+        without one.
+
+        Args:
+            samples (Iterable[bytes]): The orjson bytes of the records.
+        """
+        training: List[Union[bytes, bytearray, memoryview]] = list(samples)
+        try:
+            trained = zstandard.train_dictionary(self.dictionary_size, training)
+        except zstandard.ZstdError as e:
+            logger.warning(
+                "Failed to train the compression dictionary",
+                samples=len(training),
+                error=str(e),
+            )
+            return
+
+        dictionary = trained.as_bytes()
+        self.use_dictionary(dictionary)
+        logger.info(
+            "Compression dictionary trained",
+            samples=len(training),
+            bytes=len(dictionary),
+        )
+
+    def prepare(
+        self, records: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Train the dictionary on the first records, if there is none, before yielding them.
+
+        Args:
+            records (Iterable[Tuple[str, Dict[str, Any]]]): The (key, data) pairs.
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: The same pairs.
+        """
+        records = iter(records)
+        if self.dictionary is None:
+            first = list(itertools.islice(records, self.training_records))
+            if first:
+                self.train(orjson.dumps(data) for _, data in first)
+            yield from first
+
+        yield from records
+
+    def encode(self, data: Any) -> bytes:
+        return self.compressor.compress(orjson.dumps(data))
+
+    def decode(self, value: bytes) -> Any:
+        return orjson.loads(self.decompressor.decompress(value))
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "level": self.level,
+            "dictionary": (
+                base64.b64encode(self.dictionary).decode("ascii")
+                if self.dictionary
+                else None
+            ),
+        }
+
+
+class CodecFactory:
+    @staticmethod
+    def create_codec(name: str, **options) -> ValueCodec:
+        """
+        Factory method to create a value codec based on the given name.
+
+        Args:
+            name (str): The name of the codec (e.g., 'json', 'msgpack', 'zstd').
+            **options: The options of the zstd codec (level, dictionary_size,
+                training_records), ignored by the other codecs.
+
+        Returns:
+            ValueCodec: The codec.
+
+        Raises:
+            ValueError: If the codec is not supported.
+        """
+        name = name.lower()
+
+        if name == "json":
+            return JsonCodec()
+        elif name == "msgpack":
+            return MsgpackCodec()
+        elif name == "zstd":
+            return ZstdCodec(**options)
+        else:
+            raise ValueError(f"Unsupported value codec: {name}")
+
+    @staticmethod
+    def from_manifest(description: Optional[Dict[str, Any]], **options) -> ValueCodec:
+        """
+        Create the codec recorded in a manifest.
+
+        Args:
+            description (Dict[str, Any], optional): The codec description of the manifest.
+                Manifests written before codecs were recorded use json.
+            **options: The options of the codec that are not recorded (e.g., the zstd
+                training settings).
+
+        Returns:
+            ValueCodec: The codec, with the dictionary of the manifest.
+        """
+        if not description:
+            return JsonCodec()
+
+        if description["name"] != ZstdCodec.name:
+            return CodecFactory.create_codec(description["name"])
+
+        codec = ZstdCodec(**{**options, "level": description["level"]})
+        if description.get("dictionary"):
+            codec.use_dictionary(base64.b64decode(description["dictionary"]))
+        return codec
@@ -1,13 +1,180 @@
-import orjson
+import time
+
 import redis
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple, Union
 from redis.exceptions import RedisError
 
-from bin_lookup_indexer.storage.storage_base import StorageBase
+from bin_lookup_indexer.keys import BUCKET_SEPARATOR, split_key
+from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.storage.codecs import JsonCodec, ValueCodec
+from bin_lookup_indexer.storage.storage_base import StorageBase, BatchWriter
+
+
+def as_bytes(value: Union[bytes, str]) -> bytes:
+    """
+    Normalize a value read from Redis, which is text if the client decodes responses.
+    """
+    return value if isinstance(value, bytes) else value.encode("utf-8")
+
+
+def queue_write(pipeline, key: str, value: bytes):
+    """
+    Queue the write of a value, as a field of its hash bucket if the key has one.
+    """
+    bucket, field = split_key(key)
+    if field is None:
+        pipeline.set(key, value)
+    else:
+        pipeline.hset(bucket, field, value)
+
+
+def group_keys(keys: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Split the keys to read between top-level keys and the fields of every hash bucket.
+
+    Args:
+        keys (List[str]): The storage keys.
+
+    Returns:
+        Tuple[List[str], Dict[str, List[str]]]: The top-level keys, read with a single
+        MGET, and the fields of every bucket, read with an HMGET per bucket.
+    """
+    plain_keys = []
+    buckets: Dict[str, List[str]] = {}
+    for key in keys:
+        bucket, field = split_key(key)
+        if field is None:
+            plain_keys.append(key)
+        else:
+            buckets.setdefault(bucket, []).append(field)
+    return plain_keys, buckets
+
+
+def queue_reads(pipeline, plain_keys: List[str], buckets: Dict[str, List[str]]):
+    """
+    Queue the reads of grouped keys in a pipeline, so they take a single round-trip.
+    """
+    if plain_keys:
+        pipeline.mget(plain_keys)
+    for bucket, fields in buckets.items():
+        pipeline.hmget(bucket, fields)
+
+
+def collect_reads(
+    keys: List[str],
+    plain_keys: List[str],
+    buckets: Dict[str, List[str]],
+    results: List[List[Optional[bytes]]],
+) -> List[Optional[bytes]]:
+    """
+    Match the results of the queued reads with the keys, in the order of the keys.
+    """
+    # The MGET of the top-level keys comes first, then an HMGET per bucket
+    replies = iter(results)
+    values: Dict[str, Optional[bytes]] = {}
+    if plain_keys:
+        values.update(zip(plain_keys, next(replies)))
+    for bucket, fields in buckets.items():
+        values.update(
+            zip(
+                (f"{bucket}{BUCKET_SEPARATOR}{field}" for field in fields),
+                next(replies),
+            )
+        )
+    return [values[key] for key in keys]
+
+
+class RedisBatchWriter(BatchWriter):
+    """
+    Batched writer that sends records through non-transactional Redis pipelines.
+
+    The pipeline is flushed whenever the pending records reach `batch_size` or their
+    serialized size reaches `batch_bytes`, so a full table costs one round-trip per
+    batch instead of one per record. Failed flushes are logged and counted, and the
+    writer raises a RuntimeError on close if any record could not be written.
+    """
+
+    def __init__(self, storage: "RedisStorage", batch_size: int, batch_bytes: int):
+        super().__init__(storage)
+        self.client = storage.client
+        self.codec = storage.codec
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.pending: List[tuple] = []
+        self.pending_bytes = 0
+        self.batches = 0
+        self.failed = 0
+        self.failed_batches = 0
+
+    def add(self, key: str, parsed_data: Dict[str, Any]):
+        value = self.codec.encode(parsed_data)
+        self.pending.append((key, value))
+        self.pending_bytes += len(key) + len(value)
+
+        if (
+            len(self.pending) >= self.batch_size
+            or self.pending_bytes >= self.batch_bytes
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+
+        started_at = time.perf_counter()
+        batch, self.pending = self.pending, []
+        batch_bytes, self.pending_bytes = self.pending_bytes, 0
+        self.batches += 1
+
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for key, value in batch:
+                queue_write(pipeline, key, value)
+            results = pipeline.execute(raise_on_error=False)
+        except RedisError as e:
+            # The whole batch is lost, e.g., the connection dropped during the flush
+            results = [e] * len(batch)
+
+        errors = [
+            (key, result)
+            for (key, _), result in zip(batch, results)
+            if isinstance(result, Exception)
+        ]
+        if errors:
+            self.failed += len(errors)
+            self.failed_batches += 1
+            logger.error(
+                "Failed to write batch to Redis",
+                batch=self.batches,
+                records=len(batch),
+                failed=len(errors),
+                bytes=batch_bytes,
+                first_key=errors[0][0],
+                error=str(errors[0][1]),
+            )
+
+        self.written += len(batch) - len(errors)
+        self.observe_flush(len(batch), started_at)
+
+    def close(self) -> None:
+        self.flush()
+        if self.failed:
+            raise RuntimeError(
+                f"Failed to write {self.failed} records to Redis in {self.failed_batches} batches"
+            )
 
 
 class RedisStorage(StorageBase):
-    def __init__(self, host: str, port: int, db: int = 0, password: str = None):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int = 0,
+        password: str = None,
+        batch_size: int = 1000,
+        batch_bytes: int = 1048576,
+        codec: Optional[ValueCodec] = None,
+    ):
         """
         Initialize the Redis storage connection.
 
@@ -16,19 +183,188 @@ class RedisStorage(StorageBase):
             port (int): Redis server port.
             db (int): Redis database index.
             password (str, optional): Password for Redis authentication. Defaults to None.
+            batch_size (int): Maximum number of records sent in a single pipeline.
+            batch_bytes (int): Maximum serialized size in bytes of a single pipeline.
+            codec (ValueCodec, optional): The serialization of the values. Defaults to json.
         """
         try:
             self.client = redis.Redis(host=host, port=port, db=db, password=password)
         except RedisError as e:
             raise ConnectionError(f"Failed to connect to Redis: {e}")
 
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.codec = codec or JsonCodec()
+
     def store_parsed_data(self, key: str, parsed_data: Dict[str, Any]):
         """
         Args:
             key (str): The unique identifier for the record (e.g., KSUID).
             parsed_data (Dict[str, Any]): A dictionary representing the columns and their values.
         """
+        bucket, field = split_key(key)
+        value = self.codec.encode(parsed_data)
         try:
-            self.client.set(key, orjson.dumps(parsed_data).decode("utf-8"))
+            if field is None:
+                self.client.set(key, value)
+            else:
+                self.client.hset(bucket, field, value)
         except RedisError as e:
             raise RuntimeError(f"Failed to write data to Redis: {e}")
+
+    def fetch_parsed_data(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            key (str): The unique identifier for the record (e.g., KSUID).
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the key does not exist.
+        """
+        bucket, field = split_key(key)
+        try:
+            value = (
+                self.client.get(key)
+                if field is None
+                else self.client.hget(bucket, field)
+            )
+        except RedisError as e:
+            raise RuntimeError(f"Failed to read data from Redis: {e}")
+
+        return self.codec.decode(as_bytes(value)) if value is not None else None
+
+    def fetch_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch several records in a single round-trip with MGET, and an HMGET per hash
+        bucket in the same pipeline.
+
+        Args:
+            keys (List[str]): The unique identifiers of the records.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The records, None for the keys that do not exist.
+        """
+        if not keys:
+            return []
+
+        plain_keys, buckets = group_keys(keys)
+        values: Sequence[Optional[Union[bytes, str]]]
+        try:
+            if not buckets:
+                values = self.client.mget(keys)
+            else:
+                pipeline = self.client.pipeline(transaction=False)
+                queue_reads(pipeline, plain_keys, buckets)
+                values = collect_reads(keys, plain_keys, buckets, pipeline.execute())
+        except RedisError as e:
+            raise RuntimeError(f"Failed to read data from Redis: {e}")
+
+        return [
+            self.codec.decode(as_bytes(value)) if value is not None else None
+            for value in values
+        ]
+
+    def batch_writer(self) -> RedisBatchWriter:
+        """
+        Create a writer that groups records in non-transactional pipelines.
+
+        Returns:
+            RedisBatchWriter: The pipelined writer.
+        """
+        return RedisBatchWriter(self, self.batch_size, self.batch_bytes)
+
+    def activate_generation(self, namespace: str, generation: str) -> Optional[str]:
+        """
+        Swap the alias key of the namespace to the new generation with a single SET.
+
+        Args:
+            namespace (str): The provider namespace (e.g., 'bin:redsys').
+            generation (str): The generation to activate.
+
+        Returns:
+            Optional[str]: The previously active generation, if any.
+        """
+        try:
+            previous = self.client.set(f"{namespace}:active", generation, get=True)
+        except RedisError as e:
+            raise RuntimeError(f"Failed to activate generation in Redis: {e}")
+
+        if isinstance(previous, bytes):
+            return previous.decode("utf-8")
+        return previous if isinstance(previous, str) else None
+
+    def drop_generation(
+        self, namespace: str, generation: str, grace_period: int = 0
+    ) -> int:
+        """
+        Drop every key of a retired generation. Keys are released with UNLINK, so Redis
+        frees the memory in a background thread, or expired after the grace period.
+
+        Args:
+            namespace (str): The provider namespace (e.g., 'bin:redsys').
+            generation (str): The retired generation.
+            grace_period (int): Seconds to keep the keys before they expire.
+
+        Returns:
+            int: The number of keys dropped.
+        """
+        dropped = self._release(
+            (
+                (key, None)
+                for key in self.client.scan_iter(
+                    match=f"{namespace}:{generation}:*", count=self.batch_size
+                )
+            ),
+            grace_period,
+        )
+
+        logger.info(
+            "Previous generation dropped",
+            namespace=namespace,
+            generation=generation,
+            keys=dropped,
+            grace_period=grace_period,
+        )
+        return dropped
+
+    def delete_many(self, keys: Iterable[str], grace_period: int = 0) -> int:
+        """
+        Release keys in pipelined batches. Keys are released with UNLINK, so Redis frees
+        the memory in a background thread, or expired after the grace period. Records
+        stored in hash buckets are removed with HDEL, or expired with HEXPIRE, which
+        requires Redis 7.4.
+
+        Args:
+            keys (Iterable[str]): The keys to release.
+            grace_period (int): Seconds to keep the keys before they expire.
+
+        Returns:
+            int: The number of keys released.
+        """
+        return self._release((split_key(key) for key in keys), grace_period)
+
+    def _release(
+        self, entries: Iterable[Tuple[Any, Optional[str]]], grace_period: int
+    ) -> int:
+        released = 0
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for key, field in entries:
+                if field is not None and grace_period:
+                    pipeline.execute_command(  # type: ignore[no-untyped-call]
+                        "HEXPIRE", key, grace_period, "FIELDS", 1, field
+                    )
+                elif field is not None:
+                    pipeline.hdel(key, field)
+                elif grace_period:
+                    pipeline.expire(key, grace_period)
+                else:
+                    pipeline.unlink(key)
+                released += 1
+
+                if released % self.batch_size == 0:
+                    pipeline.execute()
+            pipeline.execute()
+        except RedisError as e:
+            raise RuntimeError(f"Failed to release keys from Redis: {e}")
+
+        return released
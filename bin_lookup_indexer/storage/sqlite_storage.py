@@ -0,0 +1,442 @@
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from bin_lookup_indexer import publish
+from bin_lookup_indexer.logging_config import logger
+from bin_lookup_indexer.storage.codecs import JsonCodec, ValueCodec
+from bin_lookup_indexer.storage.storage_base import StorageBase, BatchWriter
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS records "
+    "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL) WITHOUT ROWID"
+)
+
+# SQLite limits the number of parameters of a statement
+MAX_PARAMETERS = 900
+
+
+def generation_of(key: str) -> str:
+    """
+    Get the generation prefix of a storage key, which selects its database file.
+
+    Args:
+        key (str): The storage key (e.g., 'bin:redsys:gen1:2n9c5X').
+
+    Returns:
+        str: The generation prefix (e.g., 'bin:redsys:gen1').
+    """
+    return key.rsplit(":", 1)[0]
+
+
+class SQLiteBatchWriter(BatchWriter):
+    """
+    Batched writer inserting the records of every generation file in a single
+    transaction per batch.
+    """
+
+    storage: "SQLiteStorage"
+
+    def __init__(self, storage: "SQLiteStorage", batch_size: int):
+        super().__init__(storage)
+        self.codec = storage.codec
+        self.batch_size = batch_size
+        self.pending: List[Tuple[str, bytes]] = []
+
+    def add(self, key: str, parsed_data: Dict[str, Any]):
+        self.pending.append((key, self.codec.encode(parsed_data)))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+
+        started_at = time.perf_counter()
+        batch, self.pending = self.pending, []
+        by_file: Dict[str, List[Tuple[str, bytes]]] = {}
+        for key, value in batch:
+            by_file.setdefault(generation_of(key), []).append((key, value))
+
+        try:
+            for prefix, rows in by_file.items():
+                with self.storage.open_connection(prefix) as connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO records (key, value) VALUES (?, ?)",
+                        rows,
+                    )
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Failed to write data to SQLite: {e}")
+
+        self.written += len(batch)
+        self.observe_flush(len(batch), started_at)
+
+
+class SQLiteStorage(StorageBase):
+    """
+    Embedded storage writing the records of every generation to its own SQLite file,
+    `<directory>/<namespace>.<generation>.db`, so lookups can run in-process on hosts
+    the files are shipped to.
+
+    Files are read through SQLite's memory-mapped I/O, and the active generation is
+    recorded in a `<namespace>.active` alias file, as for the index files.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        batch_size: int = 10000,
+        mmap_size: int = 268435456,
+        codec: Optional[ValueCodec] = None,
+    ):
+        """
+        Initialize the SQLite storage.
+
+        Args:
+            directory (str): The directory of the generation files.
+            batch_size (int): Maximum number of records inserted in a single transaction.
+            mmap_size (int): Maximum number of bytes of every file read through a memory map.
+            codec (ValueCodec, optional): The serialization of the values. Defaults to json.
+        """
+        self.directory = directory
+        self.batch_size = batch_size
+        self.mmap_size = mmap_size
+        self.codec = codec or JsonCodec()
+        self.connections: Dict[str, sqlite3.Connection] = {}
+
+    def file_path(self, prefix: str) -> str:
+        """
+        Get the path of the file holding the records of a generation.
+
+        Args:
+            prefix (str): The generation prefix (e.g., 'bin:redsys:gen1').
+
+        Returns:
+            str: The path of the generation file.
+        """
+        return os.path.join(self.directory, f"{prefix.replace(':', '.')}.db")
+
+    def connection(self, prefix: str) -> Optional[sqlite3.Connection]:
+        """
+        Get the connection to the file of a generation, opening it on first use.
+
+        Args:
+            prefix (str): The generation prefix.
+
+        Returns:
+            Optional[sqlite3.Connection]: The connection, or None if the file does not exist.
+        """
+        if prefix not in self.connections and not os.path.exists(
+            self.file_path(prefix)
+        ):
+            return None
+        return self.open_connection(prefix)
+
+    def open_connection(self, prefix: str) -> sqlite3.Connection:
+        """
+        Get the connection to the file of a generation, creating the file if it does not
+        exist.
+
+        Args:
+            prefix (str): The generation prefix.
+
+        Returns:
+            sqlite3.Connection: The connection.
+        """
+        connection = self.connections.get(prefix)
+        if connection is not None:
+            return connection
+
+        file_path = self.file_path(prefix)
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            connection = sqlite3.connect(file_path)
+            connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute(SCHEMA)
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Failed to open SQLite file {file_path}: {e}")
+
+        self.connections[prefix] = connection
+        return connection
+
+    def remove_file(self, prefix: str):
+        """
+        Close and remove the file of a generation.
+
+        Args:
+            prefix (str): The generation prefix.
+        """
+        connection = self.connections.pop(prefix, None)
+        if connection is not None:
+            connection.close()
+        try:
+            os.remove(self.file_path(prefix))
+        except FileNotFoundError:
+            pass
+
+    def store_parsed_data(self, key: str, parsed_data: Dict[str, Any]):
+        """
+        Args:
+            key (str): The unique identifier for the record (e.g., KSUID).
+            parsed_data (Dict[str, Any]): A dictionary representing the columns and their values.
+        """
+        with self.batch_writer() as writer:
+            writer.add(key, parsed_data)
+
+    def fetch_parsed_data(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            key (str): The unique identifier for the record (e.g., KSUID).
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the key does not exist.
+        """
+        return self.fetch_many([key])[0]
+
+    def fetch_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch several records with a query per generation file.
+
+        Args:
+            keys (List[str]): The unique identifiers of the records.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The records, None for the keys that do not exist.
+        """
+        by_file: Dict[str, Set[str]] = {}
+        for key in keys:
+            by_file.setdefault(generation_of(key), set()).add(key)
+
+        now = time.time()
+        values: Dict[str, bytes] = {}
+        try:
+            for prefix, distinct_keys in by_file.items():
+                connection = self.connection(prefix)
+                if connection is None:
+                    continue
+
+                file_keys = list(distinct_keys)
+                for start in range(0, len(file_keys), MAX_PARAMETERS):
+                    chunk = file_keys[start : start + MAX_PARAMETERS]
+                    values.update(
+                        connection.execute(
+                            "SELECT key, value FROM records WHERE key IN "
+                            f"({', '.join('?' * len(chunk))}) "
+                            "AND (expires_at IS NULL OR expires_at > ?)",
+                            [*chunk, now],
+                        )
+                    )
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Failed to read data from SQLite: {e}")
+
+        return [
+            self.codec.decode(values[key]) if key in values else None for key in keys
+        ]
+
+    def batch_writer(self) -> SQLiteBatchWriter:
+        """
+        Create a writer that groups records in transactions.
+
+        Returns:
+            SQLiteBatchWriter: The batched writer.
+        """
+        return SQLiteBatchWriter(self, self.batch_size)
+
+    def alias_path(self, namespace: str) -> str:
+        return os.path.join(self.directory, f"{namespace.replace(':', '.')}.active")
+
+    def activate_generation(self, namespace: str, generation: str) -> Optional[str]:
+        """
+        Swap the alias file of the namespace to the new generation.
+
+        Args:
+            namespace (str): The provider namespace (e.g., 'bin:redsys').
+            generation (str): The generation to activate.
+
+        Returns:
+            Optional[str]: The previously active generation, if any.
+        """
+        alias_path = self.alias_path(namespace)
+        try:
+            with open(alias_path, "r") as file:
+                previous = file.read().strip() or None
+        except FileNotFoundError:
+            previous = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        publish.write_atomic(alias_path, generation)
+        return previous
+
+    def generations(self, namespace: str) -> List[str]:
+        """
+        List the generations of a namespace that have a file in the directory. Only the
+        files named after the namespace are considered, other files are left alone.
+
+        Args:
+            namespace (str): The provider namespace (e.g., 'bin:redsys').
+
+        Returns:
+            List[str]: The generations, sorted by file name.
+        """
+        pattern = re.compile(rf"{re.escape(namespace.replace(':', '.'))}\.([^.]+)\.db")
+        try:
+            file_names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        return [
+            match.group(1)
+            for match in map(pattern.fullmatch, file_names)
+            if match is not None
+        ]
+
+    def sweep(self, namespace: str) -> int:
+        """
+        Delete the expired records of every generation file of a namespace, and remove
+        the files whose records have all expired, including the files of generations
+        retired by earlier runs.
+
+        Args:
+            namespace (str): The provider namespace (e.g., 'bin:redsys').
+
+        Returns:
+            int: The number of records deleted.
+        """
+        now = time.time()
+        swept = 0
+        for generation in self.generations(namespace):
+            prefix = publish.generation_prefix(namespace, generation)
+            connection = self.connection(prefix)
+            if connection is None:
+                continue
+
+            try:
+                with connection:
+                    deleted = connection.execute(
+                        "DELETE FROM records WHERE expires_at <= ?", (now,)
+                    ).rowcount
+                empty = (
+                    deleted > 0
+                    and connection.execute("SELECT 1 FROM records LIMIT 1").fetchone()
+                    is None
+                )
+            except sqlite3.Error as e:
+                raise RuntimeError(f"Failed to sweep SQLite file {prefix}: {e}")
+
+            if empty:
+                self.remove_file(prefix)
+            swept += deleted
+
+        if swept:
+            logger.info("Expired records swept", namespace=namespace, keys=swept)
+        return swept
+
+    def drop_generation(
+        self, namespace: str, generation: str, grace_period: int = 0
+    ) -> int:
+        """
+        Remove the file of a retired generation, or expire its records after the grace
+        period, so readers opening it in the meantime still find them. The file is then
+        removed by the sweep of a later release.
+
+        Args:
+            namespace (str): The provider namespace (e.g., 'bin:redsys').
+            generation (str): The retired generation.
+            grace_period (int): Seconds to keep the records before they expire.
+
+        Returns:
+            int: The number of records dropped.
+        """
+        self.sweep(namespace)
+
+        prefix = publish.generation_prefix(namespace, generation)
+        connection = self.connection(prefix)
+        if connection is None:
+            return 0
+
+        try:
+            dropped = int(
+                connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+            )
+            if grace_period:
+                expires_at = time.time() + grace_period
+                with connection:
+                    connection.execute(
+                        "UPDATE records SET expires_at = ? "
+                        "WHERE expires_at IS NULL OR expires_at > ?",
+                        (expires_at, expires_at),
+                    )
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Failed to release keys from SQLite: {e}")
+        if not grace_period:
+            self.remove_file(prefix)
+
+        logger.info(
+            "Previous generation dropped",
+            namespace=namespace,
+            generation=generation,
+            keys=dropped,
+            grace_period=grace_period,
+        )
+        return dropped
+
+    def delete_many(self, keys: Iterable[str], grace_period: int = 0) -> int:
+        """
+        Delete records from their generation files, or expire them after the grace
+        period. Expired records are no longer read, and are deleted by the sweep of
+        the next release of their namespace. Files left without records are removed.
+
+        Args:
+            keys (Iterable[str]): The keys to release.
+            grace_period (int): Seconds to keep the records before they expire.
+
+        Returns:
+            int: The number of keys released.
+        """
+        by_file: Dict[str, List[str]] = {}
+        for key in keys:
+            by_file.setdefault(generation_of(key), []).append(key)
+        for namespace in {prefix.rsplit(":", 1)[0] for prefix in by_file}:
+            self.sweep(namespace)
+
+        now = time.time()
+        released = 0
+        try:
+            for prefix, file_keys in by_file.items():
+                connection = self.connection(prefix)
+                if connection is None:
+                    continue
+
+                with connection:
+                    if grace_period:
+                        connection.executemany(
+                            "UPDATE records SET expires_at = ? WHERE key = ?",
+                            ((now + grace_period, key) for key in file_keys),
+                        )
+                    else:
+                        connection.executemany(
+                            "DELETE FROM records WHERE key = ?",
+                            ((key,) for key in file_keys),
+                        )
+                released += len(file_keys)
+
+                # Files of incremental generations whose records were all replaced
+                if (
+                    connection.execute("SELECT 1 FROM records LIMIT 1").fetchone()
+                    is None
+                ):
+                    self.remove_file(prefix)
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Failed to release keys from SQLite: {e}")
+
+        return released
+
+    def close(self):
+        """
+        Close the connections to the generation files.
+        """
+        for connection in self.connections.values():
+            connection.close()
+        self.connections.clear()
@@ -1,5 +1,65 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Tuple, Optional
+
+
+class BatchWriter:
+    """
+    Default batched writer used by storage strategies that cannot group writes.
+
+    Every added record is stored immediately through `store_parsed_data`. Storage
+    strategies able to send several records per round-trip (e.g., RedisStorage)
+    should return a specialised writer from `StorageBase.batch_writer`.
+    """
+
+    def __init__(self, storage: "StorageBase"):
+        self.storage = storage
+        self.metrics = storage.metrics
+        self.written = 0
+
+    def add(self, key: str, parsed_data: Dict[str, Any]) -> None:
+        """
+        Add a single parsed record to the batch.
+
+        Args:
+            key (str): The unique identifier for the record (e.g., KSUID).
+            parsed_data (Dict[str, Any]): A dictionary representing the columns and their values.
+        """
+        self.storage.store_parsed_data(key, parsed_data)
+        self.written += 1
+
+    def flush(self) -> None:
+        """
+        Send the pending records to the storage backend.
+        """
+        pass
+
+    def observe_flush(self, records: int, started_at: float) -> None:
+        """
+        Record the latency of a flush in the metrics of the run, if any.
+
+        Args:
+            records (int): The number of records of the flushed batch.
+            started_at (float): The `time.perf_counter()` of the start of the flush.
+        """
+        if self.metrics is not None:
+            self.metrics.observe(
+                "batch_flush", time.perf_counter() - started_at, records
+            )
+
+    def close(self) -> None:
+        """
+        Flush the remaining records and report any failure.
+        """
+        self.flush()
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Only flush on success, otherwise the original exception would be masked
+        if exc_type is None:
+            self.close()
 
 
 class StorageBase(ABC):
@@ -10,6 +70,9 @@ class StorageBase(ABC):
     and implement the required methods.
     """
 
+    # The PipelineMetrics of the run, collecting the latency of every batch flush
+    metrics = None
+
     @abstractmethod
     def store_parsed_data(self, key: str, parsed_data: Dict[str, Any]):
         """
@@ -20,3 +83,102 @@ class StorageBase(ABC):
             parsed_data (Dict[str, str]): A dictionary representing the columns and their values.
         """
         pass
+
+    def fetch_parsed_data(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single parsed record from the storage backend.
+
+        Args:
+            key (str): The unique identifier for the record (e.g., KSUID).
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the key does not exist.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support reads")
+
+    def fetch_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch several parsed records, in the order of the given keys.
+
+        Args:
+            keys (List[str]): The unique identifiers of the records.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The records, None for the keys that do not exist.
+        """
+        return [self.fetch_parsed_data(key) for key in keys]
+
+    def batch_writer(self) -> BatchWriter:
+        """
+        Create a context-managed writer that groups records before sending them to the
+        storage backend.
+
+        Returns:
+            BatchWriter: A writer that must be closed (or used as a context manager) to
+            guarantee that every record has been stored.
+        """
+        return BatchWriter(self)
+
+    def store_many(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Store several parsed records using the batched write path.
+
+        Args:
+            records (Iterable[Tuple[str, Dict[str, Any]]]): Pairs of (key, parsed_data).
+
+        Returns:
+            int: The number of records written.
+        """
+        with self.batch_writer() as writer:
+            for key, parsed_data in records:
+                writer.add(key, parsed_data)
+
+        return writer.written
+
+    def activate_generation(self, namespace: str, generation: str) -> Optional[str]:
+        """
+        Atomically make a generation the active one for a namespace.
+
+        Args:
+            namespace (str): The provider namespace (e.g., 'bin:redsys').
+            generation (str): The generation whose records have been fully written.
+
+        Returns:
+            Optional[str]: The previously active generation, if any.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support generation publishing"
+        )
+
+    def drop_generation(
+        self, namespace: str, generation: str, grace_period: int = 0
+    ) -> int:
+        """
+        Remove, or expire after a grace period, every record of a retired generation.
+
+        Args:
+            namespace (str): The provider namespace (e.g., 'bin:redsys').
+            generation (str): The retired generation.
+            grace_period (int): Seconds to keep the records for readers still using the
+                retired generation. Zero removes them straight away.
+
+        Returns:
+            int: The number of records dropped.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support generation publishing"
+        )
+
+    def delete_many(self, keys: Iterable[str], grace_period: int = 0) -> int:
+        """
+        Remove, or expire after a grace period, records that are no longer referenced.
+
+        Args:
+            keys (Iterable[str]): The keys of the records.
+            grace_period (int): Seconds to keep the records for readers still using the
+                previous index. Zero removes them straight away.
+
+        Returns:
+            int: The number of records removed.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support deletions")
@@ -1,4 +1,9 @@
+from typing import Optional
+
+from bin_lookup_indexer.storage.async_redis_storage import AsyncRedisStorage
+from bin_lookup_indexer.storage.codecs import ValueCodec
 from bin_lookup_indexer.storage.redis_storage import RedisStorage
+from bin_lookup_indexer.storage.sqlite_storage import SQLiteStorage
 
 # from bin_lookup_indexer.storage.dynamodb_storage import DynamoDBStorage
 from bin_lookup_indexer.config import Config
@@ -6,13 +11,16 @@ from bin_lookup_indexer.config import Config
 
 class StorageFactory:
     @staticmethod
-    def create_storage(storage_type: str, config: Config):
+    def create_storage(
+        storage_type: str, config: Config, codec: Optional[ValueCodec] = None
+    ):
         """
         Factory method to create a storage instance based on the given storage type.
 
         Args:
-            storage_type (str): The type of storage to use (e.g., 'Redis', 'DynamoDB').
+            storage_type (str): The type of storage to use (e.g., 'Redis', 'SQLite', 'DynamoDB').
             config (Config): The configuration object containing necessary settings for the storage.
+            codec (ValueCodec, optional): The serialization of the values, json by default.
 
         Returns:
             An instance of the selected storage strategy.
@@ -24,11 +32,23 @@ class StorageFactory:
 
         if storage_type == "redis":
             redis_config = config.get_redis_config()
+            batch_config = config.get_redis_batch_config()
             return RedisStorage(
                 host=redis_config["host"],
                 port=redis_config["port"],
                 db=redis_config["db"],
                 password=redis_config["password"],
+                batch_size=batch_config["batch_size"],
+                batch_bytes=batch_config["batch_bytes"],
+                codec=codec,
+            )
+        elif storage_type == "sqlite":
+            sqlite_config = config.get_sqlite_config()
+            return SQLiteStorage(
+                directory=sqlite_config["directory"],
+                batch_size=sqlite_config["batch_size"],
+                mmap_size=sqlite_config["mmap_size"],
+                codec=codec,
             )
         elif storage_type == "dynamodb":
             # dynamodb_config = config.get_dynamodb_config()
@@ -41,3 +61,35 @@ class StorageFactory:
             raise ValueError(f"Unsupported storage type: {storage_type}")
         else:
             raise ValueError(f"Unsupported storage type: {storage_type}")
+
+    @staticmethod
+    def create_async_storage(
+        storage_type: str, config: Config, codec: Optional[ValueCodec] = None
+    ):
+        """
+        Factory method to create an asyncio storage instance based on the given storage type.
+
+        Args:
+            storage_type (str): The type of storage to use (e.g., 'Redis').
+            config (Config): The configuration object containing necessary settings for the storage.
+            codec (ValueCodec, optional): The serialization of the values, json by default.
+
+        Returns:
+            An instance of the selected asyncio storage strategy.
+
+        Raises:
+            ValueError: If the storage type is not supported.
+        """
+        storage_type = storage_type.lower()
+
+        if storage_type == "redis":
+            redis_config = config.get_redis_config()
+            return AsyncRedisStorage(
+                host=redis_config["host"],
+                port=redis_config["port"],
+                db=redis_config["db"],
+                password=redis_config["password"],
+                codec=codec,
+            )
+        else:
+            raise ValueError(f"Unsupported async storage type: {storage_type}")
@@ -0,0 +1,126 @@
+import pytest
+
+from bin_lookup_indexer.artifact import ArtifactWriter, HEADER, LookupArtifact
+from bin_lookup_indexer.cache import LRUCache
+from bin_lookup_indexer.encoding import DictionaryEncoder
+from bin_lookup_indexer.storage.codecs import JsonCodec, ZstdCodec
+
+RANGES = [
+    (400002000000000000, 400002000999999999, "bin:redsys:gen1:a"),
+    (400002000500000000, 400002000599999999, "bin:redsys:gen1:b"),
+    (510000000000000000, 510000009999999999, "bin:redsys:gen1:c"),
+]
+
+
+def write_artifact(tmp_path, codec=None, encoder=None, metadata=None):
+    codec = codec or JsonCodec()
+    writer = ArtifactWriter(codec)
+    records = [
+        ("bin:redsys:gen1:a", {"Brand": "VISA", "Country": "ES"}),
+        ("bin:redsys:gen1:b", {"Brand": "VISA", "Country": "PT"}),
+        # Same payload as the first record, stored once
+        ("bin:redsys:gen1:c", {"Brand": "VISA", "Country": "ES"}),
+    ]
+    if encoder:
+        records = [(key, encoder.encode(data)) for key, data in records]
+    list(writer.collect(codec.prepare(records)))
+
+    file_path = tmp_path / "redsys.artifact"
+    file_path.write_bytes(
+        writer.serialize(
+            RANGES,
+            {"generation": "gen1", "codec": codec.describe(), **(metadata or {})},
+        )
+    )
+    return str(file_path)
+
+
+def test_artifact_lookup(tmp_path):
+    with LookupArtifact(write_artifact(tmp_path)) as artifact:
+        assert len(artifact) == 4
+        assert artifact.digits == 18
+        assert artifact.generation == "gen1"
+
+        assert artifact.lookup("4000 0200 0100 0000") == {
+            "Brand": "VISA",
+            "Country": "ES",
+        }
+        assert artifact.lookup("4000020005") == {"Brand": "VISA", "Country": "PT"}
+        assert artifact.lookup("51000000") == {"Brand": "VISA", "Country": "ES"}
+        assert artifact.lookup("520000") is None
+        assert artifact.lookup_many(["400002000", "39"]) == [
+            {"Brand": "VISA", "Country": "ES"},
+            None,
+        ]
+
+
+def test_artifact_deduplicates_blobs(tmp_path):
+    with LookupArtifact(write_artifact(tmp_path)) as artifact:
+        first = artifact.search(400002000000000000)
+        last = artifact.search(510000000000000000)
+        assert first[2:] == last[2:]
+
+
+def test_artifact_decodes_with_codec_and_tables(tmp_path):
+    pytest.importorskip("zstandard")
+    encoder = DictionaryEncoder(["Brand"])
+    file_path = write_artifact(
+        tmp_path,
+        codec=ZstdCodec(training_records=0),
+        encoder=encoder,
+        metadata={"dictionary": encoder.manifest_entry()},
+    )
+
+    with LookupArtifact(file_path, cache=LRUCache()) as artifact:
+        assert artifact.lookup("4000020005") == {"Brand": "VISA", "Country": "PT"}
+        assert artifact.lookup("4000020005") == {"Brand": "VISA", "Country": "PT"}
+        assert artifact.cache.hits == 1
+
+
+def test_artifact_missing_record(tmp_path):
+    writer = ArtifactWriter(JsonCodec())
+    writer.add("bin:redsys:gen1:a", {})
+
+    assert writer.missing(["bin:redsys:gen1:a", "bin:redsys:gen0:b"]) == [
+        "bin:redsys:gen0:b"
+    ]
+    with pytest.raises(ValueError, match="Missing record"):
+        writer.serialize(RANGES, {})
+
+
+def test_artifact_checksums(tmp_path):
+    file_path = write_artifact(tmp_path)
+    with open(file_path, "r+b") as file:
+        file.seek(-1, 2)
+        last = file.read(1)
+        file.seek(-1, 2)
+        file.write(bytes([last[0] ^ 0xFF]))
+
+    with pytest.raises(ValueError, match="blobs checksum mismatch"):
+        LookupArtifact(file_path)
+    with LookupArtifact(file_path, verify=False) as artifact:
+        assert artifact.lookup("520000") is None
+
+
+def test_artifact_invalid_file(tmp_path):
+    file_path = tmp_path / "redsys.index"
+    file_path.write_bytes(b"\x00" * HEADER.size)
+
+    with pytest.raises(ValueError, match="Invalid lookup artifact"):
+        LookupArtifact(str(file_path))
+
+
+def test_artifact_streamed_to_file(tmp_path):
+    writer = ArtifactWriter(JsonCodec())
+    writer.add("bin:redsys:gen1:a", {"Brand": "VISA"})
+    writer.add("bin:redsys:gen1:b", {"Brand": "MASTERCARD"})
+    writer.add("bin:redsys:gen1:c", {"Brand": "VISA"})
+
+    file_path = tmp_path / "redsys.artifact"
+    with open(file_path, "wb") as file:
+        writer.write(file, RANGES, {"generation": "gen1"})
+
+    assert file_path.read_bytes() == writer.serialize(RANGES, {"generation": "gen1"})
+    with LookupArtifact(str(file_path)) as artifact:
+        assert artifact.lookup("4000020005") == {"Brand": "MASTERCARD"}
+        assert artifact.lookup("51000000") == {"Brand": "VISA"}
@@ -0,0 +1,81 @@
+import asyncio
+
+import orjson
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from redis.exceptions import ResponseError
+
+from bin_lookup_indexer.storage.async_redis_storage import AsyncRedisStorage
+
+
+@pytest.fixture
+def async_redis_storage():
+    with patch(
+        "bin_lookup_indexer.storage.async_redis_storage.redis.asyncio.Redis"
+    ) as mock_redis:
+        storage = AsyncRedisStorage(host="localhost", port=6379)
+        storage.client = mock_redis.return_value
+        storage.client.pipeline = MagicMock()
+        storage.client.pipeline.return_value.execute = AsyncMock()
+        storage.client.mget = AsyncMock()
+        yield storage
+
+
+def test_store_many_uses_pipeline(async_redis_storage):
+    pipeline = async_redis_storage.client.pipeline.return_value
+    pipeline.execute.return_value = [True, True]
+
+    failed = asyncio.run(
+        async_redis_storage.store_many(
+            [("key1", {"Brand": "VISA"}), ("key2", {"Brand": "JCB"})]
+        )
+    )
+
+    assert failed == 0
+    async_redis_storage.client.pipeline.assert_called_once_with(transaction=False)
+    pipeline.set.assert_any_call("key1", orjson.dumps({"Brand": "VISA"}))
+
+
+def test_store_many_counts_failures(async_redis_storage):
+    pipeline = async_redis_storage.client.pipeline.return_value
+    pipeline.execute.return_value = [True, ResponseError("OOM")]
+
+    with patch(
+        "bin_lookup_indexer.storage.async_redis_storage.logger.error"
+    ) as mock_logger_error:
+        failed = asyncio.run(
+            async_redis_storage.store_many([("key1", {}), ("key2", {})])
+        )
+
+    assert failed == 1
+    assert mock_logger_error.call_args.kwargs["first_key"] == "key2"
+
+
+def test_fetch_many_uses_mget(async_redis_storage):
+    async_redis_storage.client.mget.return_value = [b'{"Brand":"VISA"}', None]
+
+    records = asyncio.run(async_redis_storage.fetch_many(["key1", "key2"]))
+
+    assert records == [{"Brand": "VISA"}, None]
+    async_redis_storage.client.mget.assert_awaited_once_with(["key1", "key2"])
+
+
+def test_hash_layout_store_and_fetch(async_redis_storage):
+    pipeline = async_redis_storage.client.pipeline.return_value
+    pipeline.execute.return_value = [1]
+
+    asyncio.run(
+        async_redis_storage.store_many([("bin:redsys:gen1:0#a", {"Brand": "VISA"})])
+    )
+    pipeline.hset.assert_called_once_with(
+        "bin:redsys:gen1:0", "a", orjson.dumps({"Brand": "VISA"})
+    )
+
+    pipeline.execute.return_value = [[b'{"Brand":"VISA"}', None]]
+    records = asyncio.run(
+        async_redis_storage.fetch_many(["bin:redsys:gen1:0#a", "bin:redsys:gen1:0#b"])
+    )
+
+    assert records == [{"Brand": "VISA"}, None]
+    pipeline.hmget.assert_called_once_with("bin:redsys:gen1:0", ["a", "b"])
+    async_redis_storage.client.mget.assert_not_awaited()
@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+import pytest
+
+from bin_lookup_indexer.indexes import binary_index
+from bin_lookup_indexer.indexes.binary_index import BinaryIndex, serialize_binary_index
+
+POINTS = [
+    1,
+    400002000100000000,
+    400002000500000000,
+    510000005000000000,
+    999999999999999999,
+]
+KEYS = [None, "bin:redsys:gen1:a", "bin:redsys:gen1:b", "bin:redsys:gen1:a", None]
+
+
+@pytest.fixture
+def index_file(tmp_path):
+    file_path = tmp_path / "redsys.index"
+    file_path.write_bytes(
+        serialize_binary_index(
+            [
+                (400002000000000000, 400002000999999999, "bin:redsys:gen1:a"),
+                (400002000500000000, 400002000599999999, "bin:redsys:gen1:b"),
+                (510000000000000000, 510000009999999999, "bin:redsys:gen1:a"),
+            ]
+        )
+    )
+    return str(file_path)
+
+
+def test_binary_index_header(index_file):
+    with BinaryIndex(index_file) as index:
+        assert len(index) == 4
+        assert index.digits == 18
+
+
+def test_binary_index_search(index_file):
+    with BinaryIndex(index_file) as index:
+        assert index.search(400002000100000000)[2] == "bin:redsys:gen1:a"
+        assert index.search(400002000500000000)[2] == "bin:redsys:gen1:b"
+        assert index.search(400002000999999999)[2] == "bin:redsys:gen1:a"
+        assert index.search(510000005000000000) == (
+            510000000000000000,
+            510000009999999999,
+            "bin:redsys:gen1:a",
+        )
+
+
+def test_binary_index_search_outside_ranges(index_file):
+    with BinaryIndex(index_file) as index:
+        assert index.search(1) is None
+        assert index.search(400002001000000000) is None
+        assert index.search(999999999999999999) is None
+
+
+def test_binary_index_search_many(index_file):
+    with BinaryIndex(index_file) as index:
+        assert index.search_many(POINTS) == KEYS
+
+
+def test_binary_index_search_many_without_numpy(index_file):
+    with patch.object(binary_index, "np", None), BinaryIndex(index_file) as index:
+        assert index.table is None
+        assert index.search_many(POINTS) == KEYS
+
+
+def test_binary_index_stores_each_key_once(index_file):
+    with open(index_file, "rb") as file:
+        assert file.read().count(b"bin:redsys:gen1:a") == 1
+
+
+def test_binary_index_empty(tmp_path):
+    file_path = tmp_path / "empty.index"
+    file_path.write_bytes(serialize_binary_index([]))
+
+    with BinaryIndex(str(file_path)) as index:
+        assert len(index) == 0
+        assert index.search(400002000100000000) is None
+        assert index.search_many([400002000100000000]) == [None]
+
+
+def test_binary_index_invalid_file(tmp_path):
+    file_path = tmp_path / "redsys.index"
+    file_path.write_bytes(b'{"root": null}' + b" " * 32)
+
+    with pytest.raises(ValueError):
+        BinaryIndex(str(file_path))
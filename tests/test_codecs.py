@@ -0,0 +1,87 @@
+import pytest
+
+from bin_lookup_indexer.storage.codecs import (
+    CodecFactory,
+    JsonCodec,
+    MsgpackCodec,
+    ZstdCodec,
+)
+
+RECORD = {
+    "LowAccountRange": 400002000000000000,
+    "HighAccountRange": 400002999999999999,
+    "Brand": "VISA",
+    "Country": {"Code": "840", "Alpha3": "USA", "Name": "United States"},
+    "Prepaid": False,
+    "ICA": "",
+}
+
+
+def records(count):
+    for i in range(count):
+        yield f"bin:redsys:gen1:{i}", {
+            **RECORD,
+            "LowAccountRange": 400000000000000000 + i * 1000000000,
+            "IssuerName": f"Issuer {i % 37}",
+            "Brand": ["VISA", "MASTERCARD", "JCB"][i % 3],
+        }
+
+
+def test_json_codec_writes_orjson_bytes():
+    codec = JsonCodec()
+    assert codec.encode({"Brand": "VISA"}) == b'{"Brand":"VISA"}'
+    assert codec.decode(codec.encode(RECORD)) == RECORD
+    assert codec.describe() == {"name": "json"}
+
+
+def test_msgpack_codec_round_trip():
+    pytest.importorskip("msgpack")
+    codec = MsgpackCodec()
+    assert codec.decode(codec.encode(RECORD)) == RECORD
+
+
+def test_zstd_codec_trains_dictionary_before_encoding():
+    pytest.importorskip("zstandard")
+    codec = ZstdCodec(dictionary_size=4096, training_records=500)
+
+    prepared = list(codec.prepare(records(1000)))
+
+    assert prepared == list(records(1000))
+    assert codec.dictionary
+    value = codec.encode(prepared[0][1])
+    assert len(value) < len(JsonCodec().encode(prepared[0][1])) / 2
+    assert codec.decode(value) == prepared[0][1]
+
+
+def test_zstd_codec_without_enough_samples():
+    pytest.importorskip("zstandard")
+    codec = ZstdCodec()
+
+    prepared = list(codec.prepare(records(1)))
+
+    assert codec.dictionary is None
+    assert codec.decode(codec.encode(prepared[0][1])) == prepared[0][1]
+
+
+def test_zstd_codec_from_manifest_keeps_dictionary():
+    pytest.importorskip("zstandard")
+    codec = ZstdCodec(level=5, dictionary_size=4096, training_records=500)
+    list(codec.prepare(records(1000)))
+    value = codec.encode(RECORD)
+
+    restored = CodecFactory.from_manifest(codec.describe())
+
+    assert restored.level == 5
+    assert restored.dictionary == codec.dictionary
+    assert restored.decode(value) == RECORD
+    # The dictionary is reused instead of being trained again
+    assert list(restored.prepare(records(2))) == list(records(2))
+    assert restored.dictionary == codec.dictionary
+
+
+def test_codec_factory():
+    assert isinstance(CodecFactory.create_codec("JSON", level=3), JsonCodec)
+    assert isinstance(CodecFactory.from_manifest(None), JsonCodec)
+    assert isinstance(CodecFactory.from_manifest({"name": "json"}), JsonCodec)
+    with pytest.raises(ValueError, match="Unsupported value codec: snappy"):
+        CodecFactory.create_codec("snappy")
@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import patch
+
+from bin_lookup_indexer.parsers.compiler import (
+    compile_fixed_width,
+    compile_mapping,
+    compile_translation,
+)
+from bin_lookup_indexer.parsers.redsys_parser import RedsysParser
+from bin_lookup_indexer.parsers.versions import redsys_v3_8
+
+
+def interpret(colspecs, translation_rules, excluded_fields, line):
+    # Reference implementation interpreting the rules for every record
+    parsed_data = {
+        column_name: line[start:end].strip() for start, end, column_name in colspecs
+    }
+    for column_name, translation in translation_rules:
+        if callable(translation):
+            parsed_data[column_name] = translation(parsed_data)
+        else:
+            parsed_data[column_name] = translation.get(
+                parsed_data[column_name], parsed_data[column_name]
+            )
+    return {k: v for k, v in parsed_data.items() if k not in excluded_fields}
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "104000020000000000004000020009999999991616010101684011C1W555401River Valley Credit Union               55540110001201400002     400002                           00840C 00",
+        "104765882100000000004765882199999999991616010101648452D1W571602                                        57160210001201711488     711488                           00484C 00",
+    ],
+)
+def test_compiled_row_matches_interpreted_rules(line):
+    build_row = compile_fixed_width(
+        redsys_v3_8.colspecs,
+        redsys_v3_8.translation_rules,
+        redsys_v3_8.excluded_fields,
+    )
+
+    expected = interpret(
+        redsys_v3_8.colspecs,
+        redsys_v3_8.translation_rules,
+        redsys_v3_8.excluded_fields,
+        line,
+    )
+
+    assert build_row(line) == expected
+    assert list(build_row(line)) == list(expected)
+
+
+def test_compiled_translation_applies_rules_in_order():
+    translate = compile_translation(
+        [
+            ("Label", lambda data: f"{data['Brand']}-label"),
+            ("Brand", {"01": "VISA"}),
+            ("Other", {"01": "VISA"}),
+        ]
+    )
+
+    data = {"Brand": "01", "Label": "", "Other": "02"}
+
+    assert translate(data) is data
+    assert data == {"Brand": "VISA", "Label": "01-label", "Other": "02"}
+
+
+def test_compiled_mapping_renames_and_excludes():
+    build_row = compile_mapping(
+        {"NAME": "IssuerName", "FROM": "LowAccountRange"},
+        [("LowAccountRange", lambda data: int(data["LowAccountRange"]))],
+        ["IssuerName"],
+    )
+
+    assert build_row({"NAME": "Issuer", "FROM": "400002", None: ["extra"]}) == {
+        "LowAccountRange": 400002
+    }
+
+
+def test_parser_recompiles_replaced_rules():
+    parser = RedsysParser()
+    build_row = parser.build_row
+
+    assert parser.build_row is build_row
+
+    with (
+        patch.object(parser, "colspecs", [(0, 2, "StructureCode")]),
+        patch.object(parser, "translation_rules", []),
+        patch.object(parser, "excluded_fields", []),
+    ):
+        assert parser.build_row("10") == {"StructureCode": "10"}
+
+    assert parser.build_row is not build_row
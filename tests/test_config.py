@@ -86,3 +86,89 @@ def test_get_redis_config_default(monkeypatch):
         "password": None,
     }
     assert config.get_redis_config() == expected_config
+
+
+# Redis Batch Tests
+def test_get_redis_batch_config_setenv(monkeypatch):
+    monkeypatch.setenv("REDIS_BATCH_SIZE", "500")
+    monkeypatch.setenv("REDIS_BATCH_BYTES", "65536")
+    config = Config()
+    assert config.get_redis_batch_config() == {
+        "batch_size": 500,
+        "batch_bytes": 65536,
+    }
+
+
+def test_get_redis_batch_config_default(monkeypatch):
+    monkeypatch.delenv("REDIS_BATCH_SIZE", raising=False)
+    monkeypatch.delenv("REDIS_BATCH_BYTES", raising=False)
+    config = Config()
+    assert config.get_redis_batch_config() == {
+        "batch_size": 1000,
+        "batch_bytes": 1048576,
+    }
+
+
+# Enrichment Tests
+def test_get_enrichment_config_setenv(monkeypatch):
+    monkeypatch.setenv("ENRICHMENT_CACHE", "/tmp/enrichment.json")
+    config = Config()
+    assert config.get_enrichment_config() == {"cache_path": "/tmp/enrichment.json"}
+
+
+def test_get_enrichment_config_default(monkeypatch):
+    monkeypatch.delenv("ENRICHMENT_CACHE", raising=False)
+    config = Config()
+    assert config.get_enrichment_config() == {"cache_path": None}
+
+
+def test_get_codec_config_setenv(monkeypatch):
+    monkeypatch.setenv("VALUE_CODEC", "zstd")
+    monkeypatch.setenv("ZSTD_LEVEL", "9")
+    monkeypatch.setenv("ZSTD_DICTIONARY_SIZE", "65536")
+    monkeypatch.setenv("ZSTD_TRAINING_RECORDS", "100")
+    config = Config()
+    assert config.get_codec_config() == {
+        "name": "zstd",
+        "options": {"level": 9, "dictionary_size": 65536, "training_records": 100},
+    }
+
+
+def test_get_codec_config_default(monkeypatch):
+    for name in (
+        "VALUE_CODEC",
+        "ZSTD_LEVEL",
+        "ZSTD_DICTIONARY_SIZE",
+        "ZSTD_TRAINING_RECORDS",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    config = Config()
+    assert config.get_codec_config() == {
+        "name": "json",
+        "options": {"level": 3, "dictionary_size": 16384, "training_records": 5000},
+    }
+
+
+def test_get_sqlite_config_setenv(monkeypatch):
+    monkeypatch.setenv("SQLITE_DIRECTORY", "/var/lib/bins")
+    monkeypatch.setenv("SQLITE_BATCH_SIZE", "500")
+    monkeypatch.setenv("SQLITE_MMAP_SIZE", "1048576")
+    config = Config()
+    assert config.get_sqlite_config() == {
+        "directory": "/var/lib/bins",
+        "batch_size": 500,
+        "mmap_size": 1048576,
+    }
+
+
+# Generation Grace Period Tests
+def test_generation_grace_period_default(monkeypatch):
+    monkeypatch.delenv("GENERATION_GRACE_PERIOD", raising=False)
+    config = Config()
+    assert config.get_publish_config()["grace_period"] == 300
+
+
+def test_generation_grace_period_setenv(monkeypatch):
+    monkeypatch.setenv("GENERATION_GRACE_PERIOD", "0")
+    config = Config()
+    assert config.get_publish_config()["grace_period"] == 0
@@ -0,0 +1,56 @@
+from bin_lookup_indexer.encoding import (
+    DictionaryEncoder,
+    decode,
+    tables_key,
+    tables_key_for_prefix,
+)
+
+
+def test_tables_key():
+    assert tables_key_for_prefix("bin:redsys:gen1") == "bin:redsys:gen1:tables"
+    assert tables_key("bin:redsys:gen1:2n9c5X") == "bin:redsys:gen1:tables"
+
+
+def test_encode_and_decode_round_trip():
+    spain = {"Code": "724", "Alpha3": "ESP", "Name": "Spain"}
+    records = [
+        {"LowAccountRange": 1, "Brand": "VISA", "Country": spain},
+        {"LowAccountRange": 2, "Brand": "JCB", "Country": dict(spain)},
+        {"LowAccountRange": 3, "Brand": "VISA"},
+    ]
+    encoder = DictionaryEncoder(["Brand", "Country"])
+
+    encoded = [encoder.encode(record) for record in records]
+
+    assert encoded == [
+        {"LowAccountRange": 1, "Brand": 0, "Country": 0},
+        {"LowAccountRange": 2, "Brand": 1, "Country": 0},
+        {"LowAccountRange": 3, "Brand": 0},
+    ]
+    assert encoder.tables == {"Brand": ["VISA", "JCB"], "Country": [spain]}
+    assert [decode(record, encoder.tables) for record in encoded] == records
+    assert records[0]["Brand"] == "VISA"
+
+
+def test_encoder_distinguishes_values_of_other_types():
+    encoder = DictionaryEncoder(["Flag"])
+
+    codes = [encoder.encode({"Flag": value})["Flag"] for value in (True, 1, "1", 1)]
+
+    assert codes == [0, 1, 2, 1]
+
+
+def test_encoder_extends_previous_tables():
+    encoder = DictionaryEncoder(["Brand"], {"Brand": ["VISA", "JCB"], "Other": ["x"]})
+
+    assert encoder.encode({"Brand": "JCB"}) == {"Brand": 1}
+    assert encoder.encode({"Brand": "AMEX"}) == {"Brand": 2}
+    assert encoder.manifest_entry() == {
+        "fields": ["Brand"],
+        "tables": {"Brand": ["VISA", "JCB", "AMEX"]},
+    }
+
+
+def test_decode_plain_records():
+    assert decode({"Brand": "VISA"}, None) == {"Brand": "VISA"}
+    assert decode(None, {"Brand": ["VISA"]}) is None
@@ -0,0 +1,70 @@
+import orjson
+import pycountry
+import pytest
+from unittest.mock import patch
+
+from bin_lookup_indexer.parsers import enrichment
+
+
+@pytest.fixture(autouse=True)
+def reset_tables():
+    tables = enrichment._tables
+    yield
+    enrichment._tables = tables
+
+
+def test_tables_match_pycountry():
+    enrichment.load_tables()
+
+    usa = pycountry.countries.get(numeric="840")
+    euro = pycountry.currencies.get(numeric="978")
+
+    assert enrichment.country_by_numeric("840") == {
+        "Code": usa.numeric,
+        "Alpha3": usa.alpha_3,
+        "Name": usa.name,
+    }
+    assert enrichment.currency_by_numeric("978") == {
+        "Code": euro.numeric,
+        "Alpha3": euro.alpha_3,
+        "Name": euro.name,
+    }
+    assert enrichment.country_by_numeric("000") is None
+
+
+def test_countries_are_interned():
+    enrichment.load_tables()
+
+    assert enrichment.country_by_alpha3("usa") is enrichment.country_by_numeric("840")
+    assert enrichment.country_by_numeric("840") is enrichment.country_by_numeric("840")
+
+
+def test_cache_file_is_written_and_reused(tmp_path):
+    cache_path = str(tmp_path / "enrichment.json")
+
+    tables = enrichment.load_tables(cache_path)
+
+    with patch.object(enrichment, "read_pycountry") as mock_read_pycountry:
+        cached_tables = enrichment.load_tables(cache_path)
+
+    mock_read_pycountry.assert_not_called()
+    assert cached_tables == tables
+
+
+def test_stale_cache_file_is_rebuilt(tmp_path):
+    cache_path = tmp_path / "enrichment.json"
+    cache_path.write_bytes(
+        orjson.dumps(
+            {
+                "format": enrichment.CACHE_FORMAT,
+                "pycountry": "0.0",
+                "countries": {},
+                "currencies": {},
+            }
+        )
+    )
+
+    enrichment.load_tables(str(cache_path))
+
+    assert enrichment.country_by_numeric("840")["Alpha3"] == "USA"
+    assert orjson.loads(cache_path.read_bytes())["pycountry"] != "0.0"
@@ -0,0 +1,70 @@
+import pytest
+
+from bin_lookup_indexer.parsers.compiler import (
+    compile_fixed_width_filter,
+    compile_mapping_filter,
+)
+from bin_lookup_indexer.parsers.filters import RecordFilter
+
+COLSPECS = [(0, 2, "StructureCode"), (2, 4, "Brand"), (4, 5, "Usage")]
+
+
+def test_from_expression():
+    record_filter = RecordFilter.from_expression("Brand= 06, 08")
+
+    assert record_filter.name == "filtered"
+    assert record_filter.column == "Brand"
+    assert record_filter.values == {"06", "08"}
+    assert record_filter.exclude
+
+
+def test_from_expression_invalid():
+    with pytest.raises(ValueError) as exc_info:
+        RecordFilter.from_expression("Brand")
+    assert (
+        str(exc_info.value)
+        == "Filter 'Brand' is invalid. It should be in the form 'Column=value1,value2'."
+    )
+
+
+@pytest.mark.parametrize("encoding", [None, "cp1252"])
+def test_fixed_width_filter_returns_first_matching_filter(encoding):
+    record_filter = compile_fixed_width_filter(
+        COLSPECS,
+        [
+            RecordFilter("atm_only", "Usage", ["2"]),
+            RecordFilter("filtered", "Brand", ["08"]),
+        ],
+        encoding=encoding,
+    )
+
+    def line(text):
+        return text.encode(encoding) if encoding else text
+
+    assert record_filter(line("10082")) == "atm_only"
+    assert record_filter(line("10081")) == "filtered"
+    assert record_filter(line("1001")) is None
+
+
+def test_fixed_width_filter_including_values():
+    record_filter = compile_fixed_width_filter(
+        COLSPECS, [RecordFilter("filtered", "Brand", ["01", "02"], exclude=False)]
+    )
+
+    assert record_filter("10011") is None
+    assert record_filter("10081") == "filtered"
+
+
+def test_fixed_width_filter_unknown_column():
+    with pytest.raises(ValueError) as exc_info:
+        compile_fixed_width_filter(COLSPECS, [RecordFilter("filtered", "Bank", ["1"])])
+    assert str(exc_info.value) == "Unknown column: Bank"
+
+
+def test_mapping_filter_uses_renamed_fields():
+    record_filter = compile_mapping_filter(
+        {"ACCEPTANCE_BRAND": "Brand"}, [RecordFilter("filtered", "Brand", ["MSS"])]
+    )
+
+    assert record_filter({"ACCEPTANCE_BRAND": "MSS"}) == "filtered"
+    assert record_filter({"ACCEPTANCE_BRAND": "DMC"}) is None
@@ -0,0 +1,52 @@
+from benchmarks.generators import generate_mastercard, generate_redsys
+from bin_lookup_indexer.keys import payload_hash
+from bin_lookup_indexer.parsers.parser_factory import ParserFactory
+
+
+def test_generate_redsys(tmp_path):
+    file_path = tmp_path / "redsys.txt"
+    assert generate_redsys(str(file_path), 300, seed=1) == 302
+
+    lines = file_path.read_text(encoding="cp1252").splitlines()
+    assert {len(line) for line in lines} == {200}
+    assert lines[0].startswith("00") and lines[-1].startswith("90")
+
+    # The totalization record matches, and ATM only ranges are dropped
+    records = list(ParserFactory.create_parser("redsys_3.8").parse(str(file_path)))
+    assert 0 < len(records) < 300
+    assert all(
+        previous["HighAccountRange"] < record["LowAccountRange"]
+        for previous, record in zip(records, records[1:])
+    )
+
+
+def test_generate_mastercard(tmp_path):
+    file_path = tmp_path / "mastercard.csv"
+    assert generate_mastercard(str(file_path), 300, seed=1) == 301
+
+    records = list(
+        ParserFactory.create_parser("mastercard_simplified").parse(str(file_path))
+    )
+    assert len(records) == 300
+    assert records[0]["Country"]["Alpha3"]
+
+
+def test_generators_draw_from_issuer_profiles(tmp_path):
+    generate_redsys(str(tmp_path / "redsys.txt"), 1000, seed=1, profiles=20)
+    generate_mastercard(str(tmp_path / "mastercard.csv"), 1000, seed=1, profiles=20)
+
+    for format_name, file_name in [
+        ("redsys_3.8", "redsys.txt"),
+        ("mastercard_simplified", "mastercard.csv"),
+    ]:
+        parser = ParserFactory.create_parser(format_name)
+        records = list(parser.parse(str(tmp_path / file_name)))
+        assert len({payload_hash(record) for record in records}) <= 20
+
+
+def test_generators_are_deterministic(tmp_path):
+    for seed, name in [(1, "first"), (1, "second"), (2, "third")]:
+        generate_redsys(str(tmp_path / name), 100, seed=seed)
+
+    assert (tmp_path / "first").read_bytes() == (tmp_path / "second").read_bytes()
+    assert (tmp_path / "first").read_bytes() != (tmp_path / "third").read_bytes()
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from bin_lookup_indexer.ingest import ingest
+from bin_lookup_indexer.storage.async_storage_base import AsyncStorageBase
+
+
+class MemoryAsyncStorage(AsyncStorageBase):
+    def __init__(self, failing_keys=()):
+        self.records = {}
+        self.batches = []
+        self.failing_keys = set(failing_keys)
+
+    async def store_many(self, records):
+        await asyncio.sleep(0)
+        self.batches.append(len(records))
+        failed = 0
+        for key, parsed_data in records:
+            if key in self.failing_keys:
+                failed += 1
+            else:
+                self.records[key] = parsed_data
+        return failed
+
+    async def fetch_many(self, keys):
+        return [self.records.get(key) for key in keys]
+
+
+def test_ingest_stores_every_record():
+    storage = MemoryAsyncStorage()
+    records = ((f"key{i}", {"Index": i}) for i in range(25))
+
+    written = asyncio.run(ingest(records, storage, writers=3, batch_size=10))
+
+    assert written == 25
+    assert len(storage.records) == 25
+    assert sorted(storage.batches) == [5, 10, 10]
+
+
+def test_ingest_reports_failed_records():
+    storage = MemoryAsyncStorage(failing_keys={"key3"})
+    records = [(f"key{i}", {"Index": i}) for i in range(5)]
+
+    with pytest.raises(RuntimeError) as exc_info:
+        asyncio.run(ingest(records, storage, writers=2, batch_size=2))
+
+    assert str(exc_info.value) == "Failed to write 1 records to the storage"
+    assert len(storage.records) == 4
+
+
+def test_ingest_propagates_parser_errors():
+    storage = MemoryAsyncStorage()
+
+    def records():
+        yield "key0", {}
+        raise ValueError("Invalid line")
+
+    with pytest.raises(ValueError):
+        asyncio.run(ingest(records(), storage, writers=2, batch_size=1))
+
+
+def test_async_store_and_fetch_single_record():
+    storage = MemoryAsyncStorage()
+
+    async def run():
+        await storage.store_parsed_data("key1", {"Brand": "VISA"})
+        return await storage.fetch_parsed_data("key1")
+
+    assert asyncio.run(run()) == {"Brand": "VISA"}
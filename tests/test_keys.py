@@ -0,0 +1,143 @@
+from bin_lookup_indexer.keys import (
+    ContentKeys,
+    IncrementalKeys,
+    KsuidKeys,
+    payload_hash,
+    payload_of,
+    split_key,
+)
+from bin_lookup_indexer.manifest import Manifest
+
+
+def make_record(low, high, brand="VISA"):
+    return {
+        "LowAccountRange": low,
+        "HighAccountRange": high,
+        "Brand": brand,
+        "Country": {"Code": "724", "Alpha3": "ESP", "Name": "Spain"},
+    }
+
+
+def test_payload_of_removes_range_bounds():
+    assert payload_of(make_record(1, 2)) == {
+        "Brand": "VISA",
+        "Country": {"Code": "724", "Alpha3": "ESP", "Name": "Spain"},
+    }
+
+
+def test_payload_hash_ignores_bounds_and_key_order():
+    record = make_record(1, 2)
+    reordered = dict(reversed(list(make_record(3, 4).items())))
+    assert payload_hash(record) == payload_hash(reordered)
+    assert payload_hash(record) != payload_hash(make_record(1, 2, brand="JCB"))
+
+
+def test_ksuid_keys_are_unique():
+    keys = KsuidKeys("bin:redsys:gen1")
+    record = make_record(1, 2)
+
+    first_key, first_data = keys.assign(record, payload_hash(record))
+    second_key, _ = keys.assign(record, payload_hash(record))
+
+    assert first_key.startswith("bin:redsys:gen1:")
+    assert first_key != second_key
+    assert first_data is record
+
+
+def test_content_keys_store_each_payload_once():
+    keys = ContentKeys("bin:redsys:gen1")
+
+    first_key, first_data = keys.assign(
+        make_record(1, 2), payload_hash(make_record(1, 2))
+    )
+    second_key, second_data = keys.assign(
+        make_record(3, 4), payload_hash(make_record(3, 4))
+    )
+    other_key, other_data = keys.assign(
+        make_record(5, 6, brand="JCB"), payload_hash(make_record(5, 6, brand="JCB"))
+    )
+
+    assert first_key == second_key
+    assert first_data == payload_of(make_record(1, 2))
+    assert second_data is None
+    assert other_key != first_key
+    assert other_data is not None
+
+
+def test_content_keys_are_idempotent_within_a_generation():
+    first_key, _ = ContentKeys("bin:redsys:gen1").assign(
+        make_record(1, 2), payload_hash(make_record(1, 2))
+    )
+    second_key, _ = ContentKeys("bin:redsys:gen1").assign(
+        make_record(1, 2), payload_hash(make_record(1, 2))
+    )
+    assert first_key == second_key
+
+
+def test_content_keys_are_scoped_to_the_generation():
+    digest = payload_hash(make_record(1, 2))
+    first_key, _ = ContentKeys("bin:redsys:gen1").assign(make_record(1, 2), digest)
+    second_key, _ = ContentKeys("bin:redsys:gen2").assign(make_record(1, 2), digest)
+
+    assert first_key == f"bin:redsys:gen1:{digest}"
+    assert second_key == f"bin:redsys:gen2:{digest}"
+
+
+def test_incremental_keys_reuse_unchanged_ranges():
+    previous = Manifest("gen1", "ksuid")
+    previous.add(1, 2, "bin:redsys:gen1:a", payload_hash(make_record(1, 2)))
+    previous.add(3, 4, "bin:redsys:gen1:b", payload_hash(make_record(3, 4)))
+    keys = IncrementalKeys(KsuidKeys("bin:redsys:gen2"), previous)
+
+    unchanged_key, unchanged_data = keys.assign(
+        make_record(1, 2), payload_hash(make_record(1, 2))
+    )
+    updated = make_record(3, 4, brand="JCB")
+    updated_key, updated_data = keys.assign(updated, payload_hash(updated))
+
+    assert (unchanged_key, unchanged_data) == ("bin:redsys:gen1:a", None)
+    assert updated_key.startswith("bin:redsys:gen2:")
+    assert updated_data is updated
+    assert keys.unchanged == 1
+    assert keys.changed == 1
+
+
+def test_incremental_keys_reuse_content_keys_of_moved_ranges():
+    previous = Manifest("gen1", "content")
+    previous.add(1, 2, "bin:redsys:gen1:digest", payload_hash(make_record(1, 2)))
+    keys = IncrementalKeys(ContentKeys("bin:redsys:gen2"), previous)
+
+    key, data = keys.assign(make_record(5, 6), payload_hash(make_record(5, 6)))
+
+    assert (key, data) == ("bin:redsys:gen1:digest", None)
+
+
+def test_keys_fill_hash_buckets_in_order():
+    keys = KsuidKeys("bin:redsys:gen1", bucket_size=2)
+
+    assigned = [keys.assign(make_record(i, i), "")[0] for i in range(5)]
+
+    buckets = [split_key(key)[0] for key in assigned]
+    assert buckets == ["bin:redsys:gen1:0"] * 2 + ["bin:redsys:gen1:1"] * 2 + [
+        "bin:redsys:gen1:2"
+    ]
+    assert len({split_key(key)[1] for key in assigned}) == 5
+
+
+def test_content_keys_in_hash_buckets_store_each_payload_once():
+    keys = ContentKeys("bin:redsys:gen1", bucket_size=1)
+    digest = payload_hash(make_record(1, 2))
+    other = payload_hash(make_record(3, 4, brand="JCB"))
+
+    first_key, _ = keys.assign(make_record(1, 2), digest)
+    other_key, _ = keys.assign(make_record(3, 4, brand="JCB"), other)
+    second_key, second_data = keys.assign(make_record(5, 6), digest)
+
+    assert first_key == f"bin:redsys:gen1:0#{digest}"
+    assert other_key == f"bin:redsys:gen1:1#{other}"
+    assert (second_key, second_data) == (first_key, None)
+
+
+def test_split_key():
+    assert split_key("bin:redsys:gen1:3#abc") == ("bin:redsys:gen1:3", "abc")
+    assert split_key("bin:redsys:gen1:abc") == ("bin:redsys:gen1:abc", None)
@@ -0,0 +1,294 @@
+import asyncio
+
+import pytest
+
+from bin_lookup_indexer import publish
+from bin_lookup_indexer.cache import LRUCache, MISSING
+from bin_lookup_indexer.indexes.avl_index import AvlIndex
+from bin_lookup_indexer.indexes.paged_index import PagedArrayIndex
+from bin_lookup_indexer.indexes.prefix_table import write_ranges_prefix_table
+from bin_lookup_indexer.indexes.sorted_array_index import SortedArrayIndex
+from bin_lookup_indexer.lookup import AsyncBinLookup, BinLookup
+from bin_lookup_indexer.storage.async_storage_base import AsyncStorageBase
+from bin_lookup_indexer.storage.storage_base import StorageBase
+
+
+class DictStorage(StorageBase):
+    def __init__(self, records):
+        self.records = records
+        self.fetches = []
+
+    def store_parsed_data(self, key, parsed_data):
+        self.records[key] = parsed_data
+
+    def fetch_parsed_data(self, key):
+        self.fetches.append([key])
+        return self.records.get(key)
+
+    def fetch_many(self, keys):
+        self.fetches.append(list(keys))
+        return [self.records.get(key) for key in keys]
+
+
+RANGES = [
+    (400002000000000000, 400002000999999999, "bin:redsys:gen1:a"),
+    (400002000500000000, 400002000599999999, "bin:redsys:gen1:b"),
+    (510000000000000000, 510000999999999999, "bin:redsys:gen1:a"),
+]
+
+
+@pytest.fixture
+def storage():
+    return DictStorage(
+        {
+            "bin:redsys:gen1:a": {"Brand": "VISA"},
+            "bin:redsys:gen1:b": {"Brand": "MASTERCARD"},
+        }
+    )
+
+
+@pytest.fixture(params=[AvlIndex, SortedArrayIndex, PagedArrayIndex])
+def index_file(request, tmp_path):
+    index = request.param()
+    for low, high, key in RANGES[::2]:
+        index.insert(low, high, key)
+    index.insert(*RANGES[1])
+
+    file_path = tmp_path / "redsys.index"
+    data = index.serialize()
+    if isinstance(data, str):
+        file_path.write_text(data)
+    else:
+        file_path.write_bytes(data)
+    return str(file_path)
+
+
+def test_normalize_pads_and_truncates(index_file, storage):
+    lookup = BinLookup(index_file, storage)
+    assert lookup.digits == 18
+    assert lookup.normalize("400002") == 400002000000000000
+    assert lookup.normalize("4000 0200 0123 4567") == 400002000123456700
+    assert lookup.normalize("4000020001234567890") == 400002000123456789
+
+
+def test_normalize_invalid_pan(index_file, storage):
+    lookup = BinLookup(index_file, storage)
+    with pytest.raises(ValueError):
+        lookup.normalize("4000-02AB")
+    with pytest.raises(ValueError):
+        lookup.normalize("")
+
+
+def test_lookup(index_file, storage):
+    lookup = BinLookup(index_file, storage)
+    assert lookup.lookup("4000020001234567") == {"Brand": "VISA"}
+    assert lookup.lookup("4000020005234567") == {"Brand": "MASTERCARD"}
+    assert lookup.lookup("51") == {"Brand": "VISA"}
+    assert lookup.lookup("4111111111111111") is None
+
+
+def test_lookup_many_fetches_distinct_keys_once(index_file, storage):
+    lookup = BinLookup(index_file, storage)
+
+    records = lookup.lookup_many(
+        ["4000020001234567", "4111111111111111", "5100000012345678", "400002000523"]
+    )
+
+    assert records == [
+        {"Brand": "VISA"},
+        None,
+        {"Brand": "VISA"},
+        {"Brand": "MASTERCARD"},
+    ]
+    assert storage.fetches == [["bin:redsys:gen1:a", "bin:redsys:gen1:b"]]
+
+
+def test_refresh_reloads_new_generation(tmp_path, storage):
+    index_file_path = str(tmp_path / "redsys.index")
+    for generation, key in (
+        ("gen1", "bin:redsys:gen1:a"),
+        ("gen2", "bin:redsys:gen1:b"),
+    ):
+        index = SortedArrayIndex()
+        index.insert(400002000000000000, 400002000999999999, key)
+        publish.write_atomic(
+            publish.generation_index_path(index_file_path, generation),
+            index.serialize(),
+        )
+
+    publish.activate_index(index_file_path, "gen1")
+    lookup = BinLookup(index_file_path, storage)
+    assert lookup.refresh() is False
+    assert lookup.lookup("400002") == {"Brand": "VISA"}
+
+    publish.activate_index(index_file_path, "gen2")
+    assert lookup.refresh() is True
+    assert lookup.generation == "gen2"
+    assert lookup.lookup("400002") == {"Brand": "MASTERCARD"}
+
+
+def test_lookup_through_prefix_table(tmp_path, storage):
+    index_file_path = str(tmp_path / "redsys.index")
+    table_path = publish.prefix_table_path(index_file_path)
+    index = SortedArrayIndex()
+    for low, high, key in RANGES:
+        index.insert(low, high, key)
+    for generation in ("gen1", "gen2"):
+        publish.write_atomic(
+            publish.generation_index_path(index_file_path, generation),
+            index.serialize(),
+        )
+    with publish.open_atomic(publish.generation_index_path(table_path, "gen1")) as file:
+        write_ranges_prefix_table(file, RANGES)
+    publish.activate_index(table_path, "gen1")
+    publish.activate_index(index_file_path, "gen1")
+
+    lookup = BinLookup(index_file_path, storage)
+    assert lookup.prefix_table is not None
+    assert lookup.lookup("5100000012345678") == {"Brand": "VISA"}
+    assert lookup.lookup_many(["4000020005234567", "39"]) == [
+        {"Brand": "MASTERCARD"},
+        None,
+    ]
+    assert BinLookup(index_file_path, storage, prefix_table=False).prefix_table is None
+
+    # The table of a previous generation is not used with the new index
+    publish.activate_index(index_file_path, "gen2")
+    assert lookup.refresh() is True
+    assert lookup.prefix_table is None
+    assert lookup.lookup("5100000012345678") == {"Brand": "VISA"}
+
+
+def test_lookup_cache_avoids_storage_round_trips(index_file, storage):
+    cache = LRUCache(maxsize=10)
+    lookup = BinLookup(index_file, storage, cache=cache)
+
+    assert lookup.lookup("4000020001234567") == {"Brand": "VISA"}
+    assert lookup.lookup("5100000012345678") == {"Brand": "VISA"}
+    assert lookup.lookup_many(["4000020001234567", "4000020005234567"]) == [
+        {"Brand": "VISA"},
+        {"Brand": "MASTERCARD"},
+    ]
+
+    assert storage.fetches == [["bin:redsys:gen1:a"], ["bin:redsys:gen1:b"]]
+    assert cache.stats()["hits"] == 2
+
+
+def test_prefix_cache_only_caches_prefixes_covered_by_one_range(tmp_path, storage):
+    index = SortedArrayIndex()
+    for low, high, key in RANGES:
+        index.insert(low, high, key)
+    file_path = tmp_path / "redsys.index"
+    file_path.write_bytes(index.serialize())
+
+    prefix_cache = LRUCache(maxsize=10)
+    lookup = BinLookup(str(file_path), storage, prefix_cache=prefix_cache)
+
+    # 510000 is entirely covered by a single range, 400002 is split in three segments
+    assert lookup.resolve("5100000012345678") == "bin:redsys:gen1:a"
+    assert lookup.resolve("4000020005234567") == "bin:redsys:gen1:b"
+    assert lookup.resolve("4000020001234567") == "bin:redsys:gen1:a"
+    assert prefix_cache.get(510000) == "bin:redsys:gen1:a"
+    assert prefix_cache.get(400002) is MISSING
+
+
+def test_generation_change_clears_cache(tmp_path, storage):
+    index_file_path = str(tmp_path / "redsys.index")
+    index = SortedArrayIndex()
+    index.insert(400002000000000000, 400002000999999999, "bin:redsys:gen1:a")
+    for generation in ("gen1", "gen2"):
+        publish.write_atomic(
+            publish.generation_index_path(index_file_path, generation),
+            index.serialize(),
+        )
+    publish.activate_index(index_file_path, "gen1")
+
+    cache = LRUCache(maxsize=10)
+    lookup = BinLookup(index_file_path, storage, cache=cache, refresh_interval=0)
+    lookup.lookup("400002")
+    assert len(cache) == 1
+
+    publish.activate_index(index_file_path, "gen2")
+    storage.records["bin:redsys:gen1:a"] = {"Brand": "JCB"}
+
+    assert lookup.lookup("400002") == {"Brand": "JCB"}
+    assert lookup.generation == "gen2"
+
+
+class AsyncDictStorage(AsyncStorageBase):
+    def __init__(self, records):
+        self.records = records
+        self.fetches = []
+
+    async def store_many(self, records):
+        self.records.update(records)
+        return 0
+
+    async def fetch_many(self, keys):
+        self.fetches.append(list(keys))
+        return [self.records.get(key) for key in keys]
+
+
+def test_async_lookup(index_file):
+    storage = AsyncDictStorage({"bin:redsys:gen1:a": {"Brand": "VISA"}})
+    lookup = AsyncBinLookup(index_file, storage, cache=LRUCache(maxsize=10))
+
+    async def run():
+        return (
+            await lookup.lookup("4000020001234567"),
+            await lookup.lookup_many(["4111111111111111", "5100000012345678"]),
+        )
+
+    assert asyncio.run(run()) == ({"Brand": "VISA"}, [None, {"Brand": "VISA"}])
+    assert storage.fetches == [["bin:redsys:gen1:a"]]
+
+
+def test_async_lookup_wraps_a_client_without_storage(index_file):
+    lookup = AsyncBinLookup(index_file, AsyncDictStorage({}))
+
+    assert not isinstance(lookup, BinLookup)
+    assert lookup.resolve("4000020001234567") == "bin:redsys:gen1:a"
+    with pytest.raises(ValueError, match="without a storage backend"):
+        lookup.client.lookup("4000020001234567")
+
+
+def test_lookup_decodes_dictionary_encoded_records(index_file):
+    storage = DictStorage(
+        {
+            "bin:redsys:gen1:a": {"Brand": 0, "Country": 1},
+            "bin:redsys:gen1:b": {"Brand": 1, "Country": 0},
+            "bin:redsys:gen1:tables": {
+                "Brand": ["VISA", "MASTERCARD"],
+                "Country": [{"Alpha3": "ESP"}, {"Alpha3": "FRA"}],
+            },
+        }
+    )
+    lookup = BinLookup(index_file, storage, dictionary=True)
+
+    assert lookup.lookup("4000020001234567") == {
+        "Brand": "VISA",
+        "Country": {"Alpha3": "FRA"},
+    }
+    assert lookup.lookup_many(["4000020005000000", "5100000012345678"]) == [
+        {"Brand": "MASTERCARD", "Country": {"Alpha3": "ESP"}},
+        {"Brand": "VISA", "Country": {"Alpha3": "FRA"}},
+    ]
+    # The tables are fetched once, with the first record of the generation
+    assert storage.fetches == [
+        ["bin:redsys:gen1:a", "bin:redsys:gen1:tables"],
+        ["bin:redsys:gen1:b", "bin:redsys:gen1:a"],
+    ]
+
+
+def test_lookup_dictionary_reads_plain_generations(index_file, storage):
+    lookup = BinLookup(index_file, storage, dictionary=True)
+
+    assert lookup.lookup_many(["4000020001234567", "4000020005000000"]) == [
+        {"Brand": "VISA"},
+        {"Brand": "MASTERCARD"},
+    ]
+    assert lookup.lookup("4000020005000000") == {"Brand": "MASTERCARD"}
+    assert storage.fetches == [
+        ["bin:redsys:gen1:a", "bin:redsys:gen1:b", "bin:redsys:gen1:tables"],
+        ["bin:redsys:gen1:b"],
+    ]
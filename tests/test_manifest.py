@@ -0,0 +1,54 @@
+from bin_lookup_indexer.manifest import Manifest, manifest_path
+
+
+def test_manifest_path():
+    assert manifest_path("/tmp/redsys.index") == "/tmp/redsys.index.manifest"
+
+
+def test_manifest_round_trip(tmp_path):
+    file_path = str(tmp_path / "redsys.index.manifest")
+    manifest = Manifest("gen1", "content")
+    manifest.add(400002000000000000, 400002000999999999, "bin:redsys:gen1:a", "h1")
+    manifest.add(400003000000000000, 400003000999999999, "bin:redsys:gen1:a", "h1")
+    manifest.save(file_path)
+
+    loaded = Manifest.load(file_path)
+
+    assert loaded.generation == "gen1"
+    assert loaded.key_mode == "content"
+    assert loaded.ranges == manifest.ranges
+    assert loaded.keys() == {"bin:redsys:gen1:a"}
+    assert loaded.encoding == {}
+
+
+def test_manifest_round_trip_encoding(tmp_path):
+    file_path = str(tmp_path / "redsys.index.manifest")
+    encoding = {"dictionary": {"fields": ["Brand"], "tables": {"Brand": ["VISA"]}}}
+    Manifest("gen1", "ksuid", encoding=encoding).save(file_path)
+
+    assert Manifest.load(file_path).encoding == encoding
+
+
+def test_manifest_load_missing(tmp_path):
+    assert Manifest.load(str(tmp_path / "missing.manifest")) is None
+
+
+def test_manifest_reusable_by():
+    plain = Manifest("gen1", "content")
+    assert plain.reusable_by("content", "json", None)
+    assert not plain.reusable_by("ksuid", "json", None)
+    assert not plain.reusable_by("content", "msgpack", None)
+    assert not plain.reusable_by("content", "json", ["Brand"])
+
+    encoded = Manifest(
+        "gen1",
+        "content",
+        encoding={
+            "codec": {"name": "msgpack"},
+            "dictionary": {"fields": ["Brand"], "tables": {"Brand": ["VISA"]}},
+        },
+    )
+    assert encoded.reusable_by("content", "msgpack", ["Brand"])
+    # Reused values are dictionary-encoded, with the tables of their fields
+    assert not encoded.reusable_by("content", "msgpack", None)
+    assert not encoded.reusable_by("content", "msgpack", ["Brand", "Country"])
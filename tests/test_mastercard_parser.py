@@ -1,4 +1,5 @@
 import pytest
+from bin_lookup_indexer.parsers.filters import RecordFilter
 from bin_lookup_indexer.parsers.mastercard_parser import MastercardParser
 from unittest.mock import patch, mock_open
 
@@ -160,3 +161,17 @@ def test_parse_with_translation(mastercard_parser):
         assert len(parsed_records) == 1  # Ensure one record was parsed
         assert parsed_records[0]["Brand"] == "Mastercard Credit"
         assert parsed_records[0]["CardName"] == "Mastercard Credit Card"
+
+
+def test_parse_drops_filtered_rows(mastercard_parser):
+    sample_content = (
+        "COMPANY_NAME,ICA,ACCOUNT_RANGE_FROM,ACCOUNT_RANGE_TO,BRAND_PRODUCT_CODE,BRAND_PRODUCT_NAME,ACCEPTANCE_BRAND,COUNTRY\n"
+        "Test Issuer,12345,4000020000000000,4000029999999999,MCC,Mastercard Credit,MCC,USA\n"
+        "Another Issuer,67890,5000020000000000,5000029999999999,DMC,Debit Mastercard,DMC,CAN\n"
+    )
+    mastercard_parser.add_filter(RecordFilter.from_expression("Brand=DMC"))
+
+    with patch("builtins.open", mock_open(read_data=sample_content)):
+        parsed_records = list(mastercard_parser.parse("fake_path"))
+
+    assert [record["IssuerName"] for record in parsed_records] == ["Test Issuer"]
@@ -0,0 +1,97 @@
+import time
+
+from bin_lookup_indexer.metrics import PipelineMetrics
+from bin_lookup_indexer.storage.sqlite_storage import SQLiteStorage
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_track_charges_every_stage_its_own_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "perf_counter", clock)
+    metrics = PipelineMetrics()
+
+    def parse():
+        for record in range(3):
+            clock.now += 2  # Parsing a record
+            yield record
+
+    def transform(records):
+        for record in records:
+            clock.now += 1  # Transforming a record
+            yield record
+
+    with metrics.stage("write"):
+        for _ in metrics.track("transform", transform(metrics.track("parse", parse()))):
+            clock.now += 0.5  # Writing a record
+
+    summary = metrics.summary()["stages"]
+    assert summary["parse"]["seconds"] == 6
+    assert summary["parse"]["records"] == 3
+    assert summary["transform"]["seconds"] == 3
+    assert summary["write"]["seconds"] == 1.5
+
+
+def test_add_time_is_subtracted_from_the_enclosing_stage(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "perf_counter", clock)
+    metrics = PipelineMetrics()
+
+    with metrics.stage("outer"):
+        clock.now += 4
+        metrics.add_time("inner", 3, records=1)
+
+    stages = metrics.summary()["stages"]
+    assert stages["outer"]["seconds"] == 1
+    assert stages["inner"]["seconds"] == 3
+    assert stages["inner"]["records"] == 1
+
+
+def test_observe_latencies():
+    metrics = PipelineMetrics()
+    metrics.observe("batch_flush", 0.2, records=10)
+    metrics.observe("batch_flush", 0.4, records=10)
+
+    assert metrics.summary()["latencies"]["batch_flush"] == {
+        "count": 2,
+        "records": 20,
+        "seconds": 0.6,
+        "mean_seconds": 0.3,
+        "max_seconds": 0.4,
+    }
+
+
+def test_write_prometheus(tmp_path):
+    metrics = PipelineMetrics({"format": "redsys_3.8"})
+    metrics.count("parse", records=5, bytes=1000)
+    metrics.observe("batch_flush", 0.5, records=5)
+    metrics.finish()
+
+    file_path = tmp_path / "bin.prom"
+    metrics.write_prometheus(str(file_path))
+    lines = file_path.read_text().splitlines()
+
+    assert "# TYPE bin_indexer_stage_records gauge" in lines
+    assert 'bin_indexer_stage_records{format="redsys_3.8",stage="parse"} 5' in lines
+    assert 'bin_indexer_stage_bytes{format="redsys_3.8",stage="parse"} 1000' in lines
+    assert "# TYPE bin_indexer_batch_flush_seconds summary" in lines
+    assert 'bin_indexer_batch_flush_seconds_count{format="redsys_3.8"} 1' in lines
+    assert 'bin_indexer_batch_flush_seconds_sum{format="redsys_3.8"} 0.5' in lines
+
+
+def test_batch_writer_observes_flushes(tmp_path):
+    storage = SQLiteStorage(str(tmp_path), batch_size=2)
+    storage.metrics = PipelineMetrics()
+
+    storage.store_many([(f"bin:redsys:gen1:{i}", {}) for i in range(5)])
+
+    flushes = storage.metrics.latencies["batch_flush"]
+    assert flushes.count == 3
+    assert flushes.records == 5
+    storage.close()
@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from bin_lookup_indexer.cache import LRUCache
+from bin_lookup_indexer.indexes.index_factory import IndexFactory
+from bin_lookup_indexer.indexes.paged_index import PagedArrayIndex, PagedIndex
+
+RANGES = [
+    (400002000000000000, 400002000999999999, "bin:redsys:gen1:a"),
+    (400002000500000000, 400002000599999999, "bin:redsys:gen1:b"),
+    # Spans the 10 BINs from 510000 to 510009
+    (510000000000000000, 510009999999999999, "bin:redsys:gen1:a"),
+    # Starts in the BIN 450000 and ends in the BIN 450001, before the next range
+    (450000000000000000, 450001000049999999, "bin:redsys:gen1:c"),
+    (450001000100000000, 450001000199999999, "bin:redsys:gen1:d"),
+]
+
+
+def write_index(tmp_path, ranges, **options):
+    index = PagedArrayIndex(**options)
+    for low, high, key in ranges:
+        index.insert(low, high, key)
+
+    file_path = tmp_path / "redsys.index"
+    with open(file_path, "wb") as file:
+        index.write(file)
+    return str(file_path), index
+
+
+@pytest.fixture
+def index_file(tmp_path):
+    return write_index(tmp_path, RANGES)[0]
+
+
+def test_paged_index_header(index_file):
+    with PagedIndex(index_file) as index:
+        assert len(index) == 6
+        assert index.digits == 18
+        assert index.prefix_digits == 6
+        assert list(index.prefixes) == [400002, 450000, 450001, 510000]
+
+
+def test_paged_index_search(index_file):
+    with PagedIndex(index_file) as index:
+        assert index.search(400002000100000000)[2] == "bin:redsys:gen1:a"
+        assert index.search(400002000500000000)[2] == "bin:redsys:gen1:b"
+        assert index.search(510005000000000000) == (
+            510000000000000000,
+            510009999999999999,
+            "bin:redsys:gen1:a",
+        )
+        # Covered by the last range of the previous block
+        assert index.search(450001000010000000)[2] == "bin:redsys:gen1:c"
+        assert index.search(450001000150000000)[2] == "bin:redsys:gen1:d"
+
+
+def test_paged_index_search_outside_ranges(index_file):
+    with PagedIndex(index_file) as index:
+        assert index.search(1) is None
+        assert index.search(400002001000000000) is None
+        assert index.search(450001000070000000) is None
+        assert index.search(999999999999999999) is None
+
+
+def test_paged_index_reads_blocks_on_demand(index_file):
+    cache = LRUCache(maxsize=1)
+    with PagedIndex(index_file, cache) as index:
+        assert len(cache) == 0
+
+        index.search(400002000100000000)
+        index.search(400002000500000000)
+        assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+        index.search(510005000000000000)
+        assert cache.evictions == 1
+
+
+def test_paged_index_matches_sorted_array_index(tmp_path):
+    rng = random.Random(0)
+    ranges = []
+    for position in range(2000):
+        low = rng.randrange(10**15, 10**16)
+        ranges.append((low, low + rng.randrange(10**9, 10**12), f"key{position}"))
+
+    file_path, written = write_index(tmp_path, ranges, prefix_digits=4)
+    points = [rng.randrange(10**15, 10**16) for _ in range(2000)] + [
+        low for low, _, _ in ranges
+    ]
+    with IndexFactory.load_index(file_path, LRUCache(maxsize=8)) as index:
+        assert isinstance(index, PagedIndex)
+        assert list(index.ranges()) == written.segments()
+        assert index.search_many(points) == written.search_many(points)
+
+
+def test_paged_index_empty(tmp_path):
+    file_path, _ = write_index(tmp_path, [])
+
+    with PagedIndex(file_path) as index:
+        assert len(index) == 0
+        assert index.search(400002000100000000) is None
+
+
+def test_paged_index_invalid_file(tmp_path):
+    file_path = tmp_path / "redsys.index"
+    file_path.write_bytes(b"{}")
+
+    with pytest.raises(ValueError, match="Invalid paged index"):
+        PagedIndex(str(file_path))
+    with pytest.raises(ValueError, match="Invalid prefix digits"):
+        PagedArrayIndex(prefix_digits=10)
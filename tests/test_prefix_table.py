@@ -0,0 +1,86 @@
+import io
+import random
+
+import pytest
+
+from bin_lookup_indexer.indexes.prefix_table import (
+    KEY,
+    OVERFLOW,
+    TABLE,
+    TAG_SHIFT,
+    PrefixTable,
+    write_ranges_prefix_table,
+)
+from bin_lookup_indexer.indexes.sorted_array_index import SortedArrayIndex
+
+RANGES = [
+    # Covers the BINs 400002 to 400004
+    (400002000000000000, 400004999999999999, "bin:redsys:gen1:a"),
+    # Split in two ranges at 45000050
+    (450000000000000000, 450000499999999999, "bin:redsys:gen1:b"),
+    (450000500000000000, 450000999999999999, "bin:redsys:gen1:c"),
+    # Covers part of 51000000
+    (510000000000000000, 510000000999999999, "bin:redsys:gen1:d"),
+]
+
+
+def write_table(tmp_path, ranges, split_digits=None):
+    file_path = tmp_path / "redsys.index.prefixes"
+    with open(file_path, "wb") as file:
+        write_ranges_prefix_table(file, ranges, split_digits=split_digits)
+    return str(file_path)
+
+
+@pytest.mark.parametrize("split_digits", [None, 8])
+def test_prefix_table_resolve(tmp_path, split_digits):
+    with PrefixTable(write_table(tmp_path, RANGES, split_digits)) as table:
+        assert table.digits == 18
+        assert table.resolve(400003123456789012) == "bin:redsys:gen1:a"
+        assert table.resolve(450000400000000000) == "bin:redsys:gen1:b"
+        assert table.resolve(450000500000000000) == "bin:redsys:gen1:c"
+        assert table.resolve(510000000500000000) == "bin:redsys:gen1:d"
+        assert table.resolve(510000001000000000) is None
+        assert table.resolve(400005000000000000) is None
+        assert table.search_many([1, 400002000000000000]) == [
+            None,
+            "bin:redsys:gen1:a",
+        ]
+
+
+def test_prefix_table_slots(tmp_path):
+    with PrefixTable(write_table(tmp_path, RANGES, 8)) as table:
+        assert [table.slots[prefix] >> TAG_SHIFT for prefix in (400003, 450000)] == [
+            KEY,
+            TABLE,
+        ]
+        # 45000050 starts the second range, 51000000 is only partly covered
+        assert table.tables[table.fanout - 1] >> TAG_SHIFT == KEY
+        assert table.slots[510000] >> TAG_SHIFT == TABLE
+        assert len(table.overflow) == 2
+        assert table.tables[table.fanout] >> TAG_SHIFT == OVERFLOW
+
+
+def test_prefix_table_matches_sorted_array_index(tmp_path):
+    rng = random.Random(0)
+    index = SortedArrayIndex()
+    ranges = []
+    for position in range(3000):
+        low = rng.randrange(10**15, 10**16)
+        ranges.append((low, low + rng.randrange(10**7, 10**11), f"key{position}"))
+        index.insert(*ranges[-1])
+
+    points = [rng.randrange(10**15, 10**16) for _ in range(3000)]
+    points += [low for low, _, _ in ranges] + [high + 1 for _, high, _ in ranges]
+    for split_digits in (None, 8):
+        with PrefixTable(write_table(tmp_path, ranges, split_digits)) as table:
+            assert table.search_many(points) == index.search_many(points)
+
+
+def test_prefix_table_invalid(tmp_path):
+    with pytest.raises(ValueError, match="Invalid prefix digits"):
+        write_ranges_prefix_table(io.BytesIO(), RANGES, split_digits=6)
+
+    file_path = tmp_path / "redsys.index.prefixes"
+    file_path.write_bytes(b"{}")
+    with pytest.raises(ValueError, match="Invalid prefix table"):
+        PrefixTable(str(file_path))
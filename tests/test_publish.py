@@ -0,0 +1,82 @@
+import gzip
+import os
+
+import pytest
+
+from bin_lookup_indexer import publish
+
+
+def test_namespace_for():
+    assert publish.namespace_for("bin", "redsys.index") == "bin:redsys"
+
+
+def test_generation_prefix():
+    assert publish.generation_prefix("bin:redsys", "gen1") == "bin:redsys:gen1"
+
+
+def test_new_generation_is_sortable():
+    first = publish.new_generation()
+    second = publish.new_generation()
+    assert first != second
+    assert len(first) == 27
+
+
+def test_write_atomic(tmp_path):
+    file_path = str(tmp_path / "redsys.index")
+    publish.write_atomic(file_path, '{"root":null}')
+
+    with open(file_path) as file:
+        assert file.read() == '{"root":null}'
+    assert not os.path.exists(f"{file_path}.tmp")
+
+
+def test_open_atomic_removes_partial_file(tmp_path):
+    file_path = str(tmp_path / "redsys.index")
+    publish.write_atomic(file_path, "previous")
+
+    with pytest.raises(RuntimeError):
+        with publish.open_atomic(file_path) as file:
+            file.write(b'{"root":')
+            raise RuntimeError("Serialization failed")
+
+    with open(file_path) as file:
+        assert file.read() == "previous"
+    assert not os.path.exists(f"{file_path}.tmp")
+
+
+def test_open_atomic_compression(tmp_path):
+    file_path = str(tmp_path / "redsys.index")
+    with publish.open_atomic(file_path, "gzip") as file:
+        file.write(b'{"root":null}')
+
+    with gzip.open(file_path) as file:
+        assert file.read() == b'{"root":null}'
+
+    with pytest.raises(ValueError, match="Unsupported index compression"):
+        with publish.open_atomic(file_path, "lz4"):
+            pass
+
+
+def test_activate_index(tmp_path):
+    index_file_path = str(tmp_path / "redsys.index")
+
+    publish.write_atomic(publish.generation_index_path(index_file_path, "gen1"), "1")
+    assert publish.activate_index(index_file_path, "gen1") is None
+    assert publish.read_active_generation(index_file_path) == "gen1"
+
+    publish.write_atomic(publish.generation_index_path(index_file_path, "gen2"), "2")
+    assert publish.activate_index(index_file_path, "gen2") == "gen1"
+    assert publish.read_active_generation(index_file_path) == "gen2"
+
+    with open(index_file_path) as file:
+        assert file.read() == "2"
+
+
+def test_remove_generation_index(tmp_path):
+    index_file_path = str(tmp_path / "redsys.index")
+    publish.write_atomic(publish.generation_index_path(index_file_path, "gen1"), "1")
+
+    publish.remove_generation_index(index_file_path, "gen1")
+    publish.remove_generation_index(index_file_path, "gen1")  # Already removed
+
+    assert not os.path.exists(publish.generation_index_path(index_file_path, "gen1"))
@@ -0,0 +1,225 @@
+import orjson
+import pytest
+from unittest.mock import patch, MagicMock
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+
+from bin_lookup_indexer.storage.codecs import MsgpackCodec
+from bin_lookup_indexer.storage.redis_storage import RedisStorage
+
+
+@pytest.fixture
+def redis_storage():
+    with patch("bin_lookup_indexer.storage.redis_storage.redis.Redis") as mock_redis:
+        storage = RedisStorage(host="localhost", port=6379, batch_size=2)
+        storage.client = mock_redis.return_value
+        yield storage
+
+
+def test_store_parsed_data(redis_storage):
+    redis_storage.store_parsed_data("key1", {"Brand": "VISA"})
+    redis_storage.client.set.assert_called_once_with("key1", b'{"Brand":"VISA"}')
+
+
+def test_storage_uses_codec(redis_storage):
+    msgpack = pytest.importorskip("msgpack")
+    redis_storage.codec = MsgpackCodec()
+    redis_storage.store_parsed_data("key1", {"Brand": "VISA"})
+    value = redis_storage.client.set.call_args.args[1]
+    redis_storage.client.mget.return_value = [value, None]
+
+    assert value == msgpack.packb({"Brand": "VISA"})
+    assert redis_storage.fetch_many(["key1", "key2"]) == [{"Brand": "VISA"}, None]
+
+
+def test_batch_writer_flushes_by_record_count(redis_storage):
+    pipeline = redis_storage.client.pipeline.return_value
+    pipeline.execute.return_value = [True, True]
+
+    with redis_storage.batch_writer() as writer:
+        writer.add("key1", {"Brand": "VISA"})
+        writer.add("key2", {"Brand": "MASTERCARD"})
+        writer.add("key3", {"Brand": "JCB"})
+
+    redis_storage.client.pipeline.assert_called_with(transaction=False)
+    assert pipeline.execute.call_count == 2
+    assert pipeline.set.call_args_list[0].args == (
+        "key1",
+        orjson.dumps({"Brand": "VISA"}),
+    )
+    assert writer.batches == 2
+    assert writer.written == 3
+
+
+def test_batch_writer_flushes_by_byte_size(redis_storage):
+    redis_storage.batch_size = 100
+    redis_storage.batch_bytes = 10
+    pipeline = redis_storage.client.pipeline.return_value
+    pipeline.execute.return_value = [True]
+
+    with redis_storage.batch_writer() as writer:
+        writer.add("key1", {"IssuerName": "River Valley Credit Union"})
+        assert pipeline.execute.call_count == 1
+
+    assert writer.written == 1
+
+
+def test_batch_writer_reports_failed_commands(redis_storage):
+    pipeline = redis_storage.client.pipeline.return_value
+    pipeline.execute.side_effect = [
+        [True, ResponseError("OOM command not allowed")],
+        [True],
+    ]
+
+    with patch(
+        "bin_lookup_indexer.storage.redis_storage.logger.error"
+    ) as mock_logger_error:
+        with pytest.raises(RuntimeError) as exc_info:
+            redis_storage.store_many([("key1", {}), ("key2", {}), ("key3", {})])
+
+    assert str(exc_info.value) == "Failed to write 1 records to Redis in 1 batches"
+    mock_logger_error.assert_called_once()
+    assert mock_logger_error.call_args.kwargs["first_key"] == "key2"
+    assert mock_logger_error.call_args.kwargs["batch"] == 1
+
+
+def test_batch_writer_continues_after_failed_flush(redis_storage):
+    pipeline = redis_storage.client.pipeline.return_value
+    pipeline.execute.side_effect = [RedisConnectionError("Connection reset"), [True]]
+
+    writer = redis_storage.batch_writer()
+    writer.add("key1", {})
+    writer.add("key2", {})
+    writer.add("key3", {})
+
+    with pytest.raises(RuntimeError):
+        writer.close()
+
+    assert writer.failed == 2
+    assert writer.written == 1
+
+
+def test_activate_generation(redis_storage):
+    redis_storage.client.set.return_value = b"gen1"
+
+    assert redis_storage.activate_generation("bin:redsys", "gen2") == "gen1"
+    redis_storage.client.set.assert_called_once_with(
+        "bin:redsys:active", "gen2", get=True
+    )
+
+
+def test_activate_generation_with_decoded_responses(redis_storage):
+    redis_storage.client.set.return_value = "gen1"
+    assert redis_storage.activate_generation("bin:redsys", "gen2") == "gen1"
+
+
+def test_fetch_with_decoded_responses(redis_storage):
+    redis_storage.client.get.return_value = '{"Brand":"VISA"}'
+    assert redis_storage.fetch_parsed_data("key1") == {"Brand": "VISA"}
+
+
+def test_activate_first_generation(redis_storage):
+    redis_storage.client.set.return_value = None
+    assert redis_storage.activate_generation("bin:redsys", "gen1") is None
+
+
+def test_drop_generation_unlinks_keys(redis_storage):
+    redis_storage.client.scan_iter.return_value = iter(
+        [b"bin:redsys:gen1:a", b"bin:redsys:gen1:b", b"bin:redsys:gen1:c"]
+    )
+    pipeline = redis_storage.client.pipeline.return_value
+
+    assert redis_storage.drop_generation("bin:redsys", "gen1") == 3
+    redis_storage.client.scan_iter.assert_called_once_with(
+        match="bin:redsys:gen1:*", count=2
+    )
+    assert pipeline.unlink.call_count == 3
+    assert pipeline.execute.call_count == 2
+
+
+def test_drop_generation_with_grace_period(redis_storage):
+    redis_storage.client.scan_iter.return_value = iter([b"bin:redsys:gen1:a"])
+    pipeline = redis_storage.client.pipeline.return_value
+
+    redis_storage.drop_generation("bin:redsys", "gen1", grace_period=60)
+    pipeline.expire.assert_called_once_with(b"bin:redsys:gen1:a", 60)
+    pipeline.unlink.assert_not_called()
+
+
+def test_fetch_parsed_data(redis_storage):
+    redis_storage.client.get.return_value = b'{"Brand":"VISA"}'
+    assert redis_storage.fetch_parsed_data("key1") == {"Brand": "VISA"}
+
+    redis_storage.client.get.return_value = None
+    assert redis_storage.fetch_parsed_data("key2") is None
+
+
+def test_fetch_many_uses_mget(redis_storage):
+    redis_storage.client.mget.return_value = [b'{"Brand":"VISA"}', None]
+
+    assert redis_storage.fetch_many(["key1", "key2"]) == [{"Brand": "VISA"}, None]
+    redis_storage.client.mget.assert_called_once_with(["key1", "key2"])
+
+
+def test_hash_layout_writes_bucket_fields(redis_storage):
+    pipeline = redis_storage.client.pipeline.return_value
+    pipeline.execute.return_value = [1, True]
+
+    with redis_storage.batch_writer() as writer:
+        writer.add("bin:redsys:gen1:0#a", {"Brand": "VISA"})
+        writer.add("bin:redsys:gen1:tables", {"Brand": ["VISA"]})
+
+    pipeline.hset.assert_called_once_with(
+        "bin:redsys:gen1:0", "a", orjson.dumps({"Brand": "VISA"})
+    )
+    pipeline.set.assert_called_once_with(
+        "bin:redsys:gen1:tables", orjson.dumps({"Brand": ["VISA"]})
+    )
+
+
+def test_hash_layout_fetches_in_one_pipeline(redis_storage):
+    pipeline = redis_storage.client.pipeline.return_value
+    pipeline.execute.return_value = [
+        [b'{"Brand":["VISA"]}'],
+        [b'{"Brand":"JCB"}'],
+        [b'{"Brand":"VISA"}', None],
+    ]
+    keys = [
+        "bin:redsys:gen1:1#c",
+        "bin:redsys:gen1:0#a",
+        "bin:redsys:gen1:tables",
+        "bin:redsys:gen1:0#b",
+    ]
+
+    assert redis_storage.fetch_many(keys) == [
+        {"Brand": "JCB"},
+        {"Brand": "VISA"},
+        {"Brand": ["VISA"]},
+        None,
+    ]
+    pipeline.mget.assert_called_once_with(["bin:redsys:gen1:tables"])
+    assert [call.args for call in pipeline.hmget.call_args_list] == [
+        ("bin:redsys:gen1:1", ["c"]),
+        ("bin:redsys:gen1:0", ["a", "b"]),
+    ]
+    assert pipeline.execute.call_count == 1
+    redis_storage.client.mget.assert_not_called()
+
+
+def test_hash_layout_fetch_parsed_data(redis_storage):
+    redis_storage.client.hget.return_value = b'{"Brand":"VISA"}'
+
+    assert redis_storage.fetch_parsed_data("bin:redsys:gen1:0#a") == {"Brand": "VISA"}
+    redis_storage.client.hget.assert_called_once_with("bin:redsys:gen1:0", "a")
+
+
+def test_hash_layout_releases_fields(redis_storage):
+    pipeline = redis_storage.client.pipeline.return_value
+
+    redis_storage.delete_many(["bin:redsys:gen1:0#a", "bin:redsys:gen1:b"])
+    pipeline.hdel.assert_called_once_with("bin:redsys:gen1:0", "a")
+    pipeline.unlink.assert_called_once_with("bin:redsys:gen1:b")
+
+    redis_storage.delete_many(["bin:redsys:gen1:0#c"], grace_period=60)
+    pipeline.execute_command.assert_called_once_with(
+        "HEXPIRE", "bin:redsys:gen1:0", 60, "FIELDS", 1, "c"
+    )
@@ -1,5 +1,6 @@
 import pytest
-from bin_lookup_indexer.parsers.redsys_parser import RedsysParser
+from bin_lookup_indexer.parsers.filters import RecordFilter
+from bin_lookup_indexer.parsers.redsys_parser import RedsysParser, chunk_offsets
 from unittest.mock import patch, mock_open
 
 
@@ -127,7 +128,7 @@ def test_parse_totalization_record(redsys_parser):
         patch("builtins.open", mock_open(read_data=sample_content)),
         patch.object(
             redsys_parser,
-            "apply_translation",
+            "build_row",
             return_value={
                 "LowAccountRange": "400002000000000000",
                 "HighAccountRange": "400002000999999999",
@@ -163,7 +164,7 @@ def test_parse_with_missing_records(redsys_parser):
         patch("builtins.open", mock_open(read_data=sample_content)),
         patch.object(
             redsys_parser,
-            "apply_translation",
+            "build_row",
             return_value={
                 "LowAccountRange": "400002000000000000",
                 "HighAccountRange": "400002000999999999",
@@ -181,3 +182,127 @@ def test_parse_with_missing_records(redsys_parser):
         mock_logger_error.assert_called_with(
             "Some records could not be processed", records=2, processed=1
         )
+
+
+def redsys_line(low, high, usage="1"):
+    line = (
+        "10"
+        + low
+        + high
+        + "161601010168401"
+        + usage
+        + "C1W555401River Valley Credit Union               55540110001201400002     400002                           00840C 00"
+    )
+    return line + " " * (200 - len(line)) + "\n"
+
+
+@pytest.fixture
+def redsys_file(tmp_path):
+    lines = ["00" + " " * 198 + "\n"]
+    for i in range(40):
+        usage = "2" if i % 10 == 0 else "1"
+        low = f"4{i:05d}000000000000"
+        lines.append(redsys_line(low, low[:6] + "999999999999", usage))
+    lines.append("90" + " " * 26 + f"{len(lines) + 1:010d}" + " " * 162 + "\n")
+
+    path = tmp_path / "redsys.txt"
+    path.write_text("".join(lines), encoding="cp1252")
+    return str(path)
+
+
+def test_chunk_offsets_are_line_aligned(redsys_file):
+    with open(redsys_file, "rb") as file:
+        data = file.read()
+
+    offsets = chunk_offsets(redsys_file, 500)
+
+    assert offsets[0][0] == 0
+    assert offsets[-1][1] == len(data)
+    for (_, end), (start, _) in zip(offsets, offsets[1:]):
+        assert end == start
+        assert data[end - 1 : end] == b"\n"
+
+
+def test_parse_parallel_matches_sequential_parse(redsys_parser, redsys_file):
+    sequential = list(redsys_parser.parse(redsys_file))
+
+    with patch(
+        "bin_lookup_indexer.parsers.redsys_parser.logger.info"
+    ) as mock_logger_info:
+        parallel = list(
+            redsys_parser.parse_parallel(redsys_file, processes=2, chunk_size=1000)
+        )
+
+    assert len(sequential) == 36
+    assert parallel == sequential
+    mock_logger_info.assert_called_with(
+        "All records have been processed successfully",
+        processed=40,
+        atm_only=4,
+        stored=36,
+    )
+
+
+def test_parse_mapped_matches_sequential_parse(redsys_parser, tmp_path):
+    lines = [
+        "00" + " " * 198,
+        redsys_line("400000000000000000", "400000999999999999").replace(
+            "River Valley Credit Union", "Caja Rural de León".ljust(25)
+        ),
+        redsys_line("400001000000000000", "400001999999999999", usage="2"),
+        redsys_line("400002000000000000", "400002999999999999")[:120],
+        "90" + " " * 26 + "0000000005" + " " * 162,
+    ]
+    path = tmp_path / "redsys.txt"
+    path.write_bytes("\r\n".join(line.rstrip("\n") for line in lines).encode("cp1252"))
+
+    sequential = list(redsys_parser.parse(str(path)))
+
+    with patch(
+        "bin_lookup_indexer.parsers.redsys_parser.logger.info"
+    ) as mock_logger_info:
+        mapped = list(redsys_parser.parse_mapped(str(path)))
+
+    assert len(mapped) == 2
+    assert mapped == sequential
+    assert mapped[0]["Issuer"]["Name"] == "Caja Rural de León"
+    mock_logger_info.assert_called_with(
+        "All records have been processed successfully",
+        processed=3,
+        atm_only=1,
+        stored=2,
+    )
+
+
+def test_parse_mapped_empty_file(redsys_parser, tmp_path):
+    path = tmp_path / "redsys.txt"
+    path.write_bytes(b"")
+
+    assert list(redsys_parser.parse_mapped(str(path))) == []
+
+
+@pytest.mark.parametrize("method", ["parse", "parse_mapped", "parse_parallel"])
+def test_parse_drops_filtered_brands(redsys_parser, redsys_file, method):
+    redsys_parser.add_filter(RecordFilter.from_expression("Brand=01"))
+
+    with patch(
+        "bin_lookup_indexer.parsers.redsys_parser.logger.info"
+    ) as mock_logger_info:
+        parsed_records = list(getattr(redsys_parser, method)(redsys_file))
+
+    assert parsed_records == []
+    mock_logger_info.assert_called_with(
+        "All records have been processed successfully",
+        processed=40,
+        atm_only=4,
+        filtered=36,
+        stored=0,
+    )
+
+
+def test_parse_keeps_included_brands(redsys_parser, redsys_file):
+    redsys_parser.add_filter(
+        RecordFilter.from_expression("Brand=01", exclude=False, name="unrouted")
+    )
+
+    assert len(list(redsys_parser.parse(redsys_file))) == 36
@@ -0,0 +1,34 @@
+from bin_lookup_indexer.indexes.segments import flatten_ranges
+
+
+def test_flatten_disjoint_ranges():
+    ranges = [(30, 39, "c"), (10, 19, "a"), (20, 29, "b")]
+    assert flatten_ranges(ranges) == [(10, 19, "a"), (20, 29, "b"), (30, 39, "c")]
+
+
+def test_flatten_nested_range_keeps_smallest():
+    ranges = [(0, 99, "wide"), (40, 49, "narrow")]
+    assert flatten_ranges(ranges) == [
+        (0, 39, "wide"),
+        (40, 49, "narrow"),
+        (50, 99, "wide"),
+    ]
+
+
+def test_flatten_partial_overlap():
+    ranges = [(0, 59, "a"), (50, 79, "b")]
+    assert flatten_ranges(ranges) == [(0, 49, "a"), (50, 79, "b")]
+
+
+def test_flatten_same_size_keeps_first_inserted():
+    ranges = [(0, 9, "first"), (0, 9, "second")]
+    assert flatten_ranges(ranges) == [(0, 9, "first")]
+
+
+def test_flatten_merges_adjacent_segments_with_same_key():
+    ranges = [(0, 9, "a"), (10, 19, "a"), (30, 39, "a")]
+    assert flatten_ranges(ranges) == [(0, 19, "a"), (30, 39, "a")]
+
+
+def test_flatten_empty():
+    assert flatten_ranges([]) == []
@@ -0,0 +1,148 @@
+import io
+
+import pytest
+from unittest.mock import patch
+
+from bin_lookup_indexer import publish
+from bin_lookup_indexer.indexes import sorted_array_index
+from bin_lookup_indexer.indexes.avl_index import AvlIndex
+from bin_lookup_indexer.indexes.binary_index import serialize_segments
+from bin_lookup_indexer.indexes.index_factory import IndexFactory
+from bin_lookup_indexer.indexes.sorted_array_index import SortedArrayIndex
+
+RANGES = [
+    (400002000000000000, 400002000999999999, "a"),
+    (400002000500000000, 400002000599999999, "b"),
+    (510000000000000000, 510000009999999999, "c"),
+]
+
+POINTS = [
+    1,
+    400002000100000000,
+    400002000500000000,
+    400002000700000000,
+    400002001000000000,
+    510000005000000000,
+]
+
+
+@pytest.fixture
+def sorted_index():
+    index = SortedArrayIndex()
+    for low, high, key in RANGES:
+        index.insert(low, high, key)
+    return index
+
+
+@pytest.fixture
+def avl_index():
+    index = AvlIndex()
+    for low, high, key in RANGES:
+        index.insert(low, high, key)
+    return index
+
+
+def test_search_keeps_smallest_containing_range(sorted_index):
+    for point in POINTS:
+        containing = [
+            (high - low, key) for low, high, key in RANGES if low <= point <= high
+        ]
+        found = sorted_index.search(point)
+        assert (found[2] if found else None) == (
+            min(containing)[1] if containing else None
+        )
+
+
+def test_search_matches_avl_index_on_disjoint_ranges():
+    index = SortedArrayIndex()
+    for low, high, key in RANGES[::2]:
+        index.insert(low, high, key)
+    disjoint = AvlIndex()
+    for low, high, key in RANGES[::2]:
+        disjoint.insert(low, high, key)
+
+    for point in POINTS:
+        assert index.search(point) == disjoint.search(point)
+
+
+def test_search_many(sorted_index):
+    assert sorted_index.search_many(POINTS) == [None, "a", "b", "a", None, "c"]
+
+
+def test_search_many_without_numpy(sorted_index):
+    with patch.object(sorted_array_index, "np", None):
+        assert sorted_index.search_many(POINTS) == [None, "a", "b", "a", None, "c"]
+
+
+def test_search_many_empty_index():
+    assert SortedArrayIndex().search_many([1, 2]) == [None, None]
+
+
+def test_insert_after_search_rebuilds(sorted_index):
+    assert sorted_index.search(600000000000000000) is None
+    sorted_index.insert(600000000000000000, 600000000999999999, "d")
+    assert sorted_index.search(600000000000000000)[2] == "d"
+    assert len(sorted_index) == 4
+
+
+def test_binary_round_trip(sorted_index, tmp_path):
+    file_path = tmp_path / "redsys.index"
+    file_path.write_bytes(sorted_index.serialize())
+
+    loaded = SortedArrayIndex.from_binary(str(file_path))
+
+    assert loaded.segments() == sorted_index.segments()
+    assert loaded.search_many(POINTS) == sorted_index.search_many(POINTS)
+
+
+def test_avl_index_round_trip(avl_index):
+    loaded = AvlIndex.deserialize(avl_index.serialize())
+    assert len(loaded) == 3
+    assert loaded.search(510000005000000000)[2] == "c"
+
+
+def test_avl_index_write_streams_serialization(avl_index):
+    avl_index.insert(300000000000000000, 300000000999999999, 'd"\u00e9')
+    buffer = io.BytesIO()
+    avl_index.write(buffer)
+    assert buffer.getvalue() == avl_index.serialize().encode("utf-8")
+
+    empty = io.BytesIO()
+    AvlIndex().write(empty)
+    assert empty.getvalue() == b'{"root":null}'
+
+
+def test_sorted_array_index_write(sorted_index):
+    buffer = io.BytesIO()
+    sorted_index.write(buffer)
+    assert buffer.getvalue() == serialize_segments(sorted_index.segments())
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_load_compressed_index(avl_index, tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    file_path = str(tmp_path / "redsys.index")
+    with publish.open_atomic(file_path, compression) as file:
+        avl_index.write(file)
+
+    loaded = IndexFactory.load_index(file_path)
+    assert len(loaded) == 3
+    assert loaded.search(510000005000000000)[2] == "c"
+
+
+def test_load_compressed_binary_index(sorted_index, tmp_path):
+    file_path = str(tmp_path / "redsys.index")
+    with publish.open_atomic(file_path, "gzip") as file:
+        sorted_index.write(file)
+
+    with pytest.raises(ValueError, match="Compressed binary indexes"):
+        IndexFactory.load_index(file_path)
+
+
+def test_index_factory():
+    assert isinstance(IndexFactory.create_index("json"), AvlIndex)
+    assert isinstance(IndexFactory.create_index("binary"), SortedArrayIndex)
+    with pytest.raises(ValueError) as exc_info:
+        IndexFactory.create_index("xml")
+    assert str(exc_info.value) == "Unsupported index format: xml"
@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from bin_lookup_indexer.storage.codecs import MsgpackCodec
+from bin_lookup_indexer.storage.sqlite_storage import SQLiteStorage, generation_of
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path), batch_size=2)
+    yield storage
+    storage.close()
+
+
+def test_generation_of():
+    assert generation_of("bin:redsys:gen1:2n9c5X") == "bin:redsys:gen1"
+    assert generation_of("bin:redsys:gen1:3#2n9c5X") == "bin:redsys:gen1"
+
+
+def test_store_many_writes_a_file_per_generation(storage, tmp_path):
+    written = storage.store_many(
+        [
+            ("bin:redsys:gen1:a", {"Brand": "VISA"}),
+            ("bin:redsys:gen1:b", {"Brand": "MASTERCARD"}),
+            ("bin:redsys:gen2:a", {"Brand": "JCB"}),
+        ]
+    )
+
+    assert written == 3
+    assert sorted(os.listdir(tmp_path)) == ["bin.redsys.gen1.db", "bin.redsys.gen2.db"]
+    assert storage.fetch_many(
+        ["bin:redsys:gen2:a", "bin:redsys:gen1:b", "bin:redsys:gen1:c", "bin:other:x:y"]
+    ) == [{"Brand": "JCB"}, {"Brand": "MASTERCARD"}, None, None]
+
+
+def test_records_can_be_read_by_another_process(storage, tmp_path):
+    storage.store_parsed_data("bin:redsys:gen1:a", {"Brand": "VISA"})
+
+    reader = SQLiteStorage(str(tmp_path))
+    assert reader.fetch_parsed_data("bin:redsys:gen1:a") == {"Brand": "VISA"}
+    reader.close()
+
+
+def test_storage_uses_codec(tmp_path):
+    pytest.importorskip("msgpack")
+    storage = SQLiteStorage(str(tmp_path), codec=MsgpackCodec())
+    storage.store_parsed_data("bin:redsys:gen1:a", {"Brand": "VISA"})
+
+    (value,) = (
+        storage.connection("bin:redsys:gen1")
+        .execute("SELECT value FROM records")
+        .fetchone()
+    )
+    assert value == MsgpackCodec().encode({"Brand": "VISA"})
+    assert storage.fetch_parsed_data("bin:redsys:gen1:a") == {"Brand": "VISA"}
+    storage.close()
+
+
+def test_activate_and_drop_generation(storage, tmp_path):
+    storage.store_parsed_data("bin:redsys:gen1:a", {"Brand": "VISA"})
+
+    assert storage.activate_generation("bin:redsys", "gen1") is None
+    assert storage.activate_generation("bin:redsys", "gen2") == "gen1"
+    assert (tmp_path / "bin.redsys.active").read_text() == "gen2"
+
+    assert storage.drop_generation("bin:redsys", "gen1") == 1
+    assert not (tmp_path / "bin.redsys.gen1.db").exists()
+    assert storage.fetch_parsed_data("bin:redsys:gen1:a") is None
+    assert storage.drop_generation("bin:redsys", "gen1") == 0
+
+
+def test_delete_many(storage, tmp_path):
+    storage.store_many(
+        [("bin:redsys:gen1:a", {"Brand": "VISA"}), ("bin:redsys:gen1:b", {})]
+    )
+
+    assert storage.delete_many(["bin:redsys:gen1:a", "bin:redsys:gen9:a"]) == 1
+    assert storage.fetch_many(["bin:redsys:gen1:a", "bin:redsys:gen1:b"]) == [None, {}]
+
+    storage.delete_many(["bin:redsys:gen1:b"])
+    assert not (tmp_path / "bin.redsys.gen1.db").exists()
+
+
+def test_delete_many_with_grace_period(storage, monkeypatch):
+    storage.store_many(
+        [("bin:redsys:gen1:a", {"Brand": "VISA"}), ("bin:redsys:gen1:b", {})]
+    )
+    now = time.time()
+
+    storage.delete_many(["bin:redsys:gen1:a"], grace_period=60)
+    assert storage.fetch_parsed_data("bin:redsys:gen1:a") == {"Brand": "VISA"}
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert storage.fetch_parsed_data("bin:redsys:gen1:a") is None
+
+    # Expired records are deleted by the next release
+    storage.delete_many(["bin:redsys:gen1:c"])
+    (count,) = (
+        storage.connection("bin:redsys:gen1")
+        .execute("SELECT COUNT(*) FROM records")
+        .fetchone()
+    )
+    assert count == 1
+
+
+def test_drop_generation_with_grace_period(storage, tmp_path, monkeypatch):
+    storage.store_many(
+        [("bin:redsys:gen1:a", {"Brand": "VISA"}), ("bin:redsys:gen2:a", {})]
+    )
+    now = time.time()
+
+    assert storage.drop_generation("bin:redsys", "gen1", grace_period=60) == 1
+    assert (tmp_path / "bin.redsys.gen1.db").exists()
+    assert storage.fetch_parsed_data("bin:redsys:gen1:a") == {"Brand": "VISA"}
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert storage.fetch_parsed_data("bin:redsys:gen1:a") is None
+
+    # The file is removed by the sweep of a later release
+    storage.drop_generation("bin:redsys", "gen0")
+    assert not (tmp_path / "bin.redsys.gen1.db").exists()
+    assert (tmp_path / "bin.redsys.gen2.db").exists()
+
+
+def test_sweep_files_of_earlier_runs(tmp_path, monkeypatch):
+    earlier = SQLiteStorage(str(tmp_path))
+    earlier.store_many(
+        [
+            ("bin:redsys:gen1:a", {"Brand": "VISA"}),
+            ("bin:redsys:gen2:a", {}),
+            ("bin:visa:gen1:a", {}),
+        ]
+    )
+    earlier.drop_generation("bin:redsys", "gen1", grace_period=60)
+    earlier.delete_many(["bin:redsys:gen2:a", "bin:visa:gen1:a"], grace_period=60)
+    earlier.close()
+    now = time.time()
+
+    storage = SQLiteStorage(str(tmp_path))
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert storage.generations("bin:redsys") == ["gen1", "gen2"]
+    assert storage.sweep("bin:redsys") == 2
+    assert [path.name for path in tmp_path.glob("*.db")] == ["bin.visa.gen1.db"]
+    storage.close()
+
+
+def test_sweep_leaves_foreign_files_alone(storage, tmp_path, monkeypatch):
+    with sqlite3.connect(tmp_path / "app.db") as connection:
+        connection.execute("CREATE TABLE records (key TEXT, expires_at REAL)")
+        connection.execute("INSERT INTO records VALUES ('a', 0)")
+    with sqlite3.connect(tmp_path / "other.db") as connection:
+        connection.execute("CREATE TABLE users (name TEXT)")
+    storage.store_parsed_data("bin:redsys:gen1:a", {})
+    storage.delete_many(["bin:redsys:gen1:a"], grace_period=60)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    storage.drop_generation("bin:redsys", "gen1")
+
+    assert not (tmp_path / "bin.redsys.gen1.db").exists()
+    with sqlite3.connect(tmp_path / "app.db") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM records").fetchone() == (1,)
+    assert (tmp_path / "other.db").exists()